@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Atualização incremental entre duas versões do jogo
+
+Quando sai a v1.1 chega uma cópia nova e inteira da árvore criptografada.
+Em vez de descriptografar tudo de novo, este script compara a versão
+antiga (já descriptografada) com a nova, arquivo criptografado por arquivo
+criptografado:
+  - tamanho diferente             -> alterado
+  - mesmo tamanho e mesmo mtime   -> igual (sem ler nada)
+  - mesmo tamanho, mtime diferente -> hash parcial (início + fim do arquivo)
+
+Depois:
+  - iguais: a saída descriptografada da versão antiga vai para a nova
+    por hardlink (cópia se estiverem em sistemas de arquivos diferentes)
+  - novos e alterados: descriptografados normalmente
+  - removidos: a saída que tiver sobrado no destino é apagada
+
+O tempo fica proporcional ao tamanho do patch, não ao do jogo.
+As origens movidas para _backup_encrypted/ na versão antiga também contam.
+"""
+
+import os
+import sys
+import shutil
+import hashlib
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+from rpgmaker_decrypter_FINAL import RPGMakerDecrypter
+from backup_encrypted import BACKUP_FOLDER
+
+# Bytes lidos do início e do fim de cada arquivo no hash parcial
+PARTIAL_BLOCK = 64 * 1024
+
+
+def encrypted_sources(decrypter, include_backup=False):
+    """{caminho relativo: arquivo criptografado} (+ os do backup, na versão antiga)"""
+    sources = {
+        file_path.relative_to(decrypter.game_folder).as_posix(): file_path
+        for file_path in decrypter.find_encrypted_files()
+    }
+
+    backup_folder = decrypter.game_folder / BACKUP_FOLDER
+    if include_backup and backup_folder.is_dir():
+        for root, dirs, files in os.walk(backup_folder):
+            for file in files:
+                file_path = Path(root) / file
+                if file_path.suffix in decrypter.encrypted_extensions:
+                    sources.setdefault(file_path.relative_to(backup_folder).as_posix(), file_path)
+
+    return sources
+
+
+def partial_hash(path, size):
+    """Hash de tamanho + primeiro e último bloco (o arquivo inteiro se for pequeno)"""
+    digest = hashlib.blake2b(str(size).encode('ascii'), digest_size=16)
+    with open(path, 'rb') as f:
+        digest.update(f.read(PARTIAL_BLOCK))
+        if size > 2 * PARTIAL_BLOCK:
+            f.seek(size - PARTIAL_BLOCK)
+        digest.update(f.read(PARTIAL_BLOCK))
+    return digest.digest()
+
+
+def same_asset(old_path, new_path):
+    """Tamanho, depois mtime, e só então o hash parcial"""
+    old_stat = old_path.stat()
+    new_stat = new_path.stat()
+    if old_stat.st_size != new_stat.st_size:
+        return False
+    if old_stat.st_mtime_ns == new_stat.st_mtime_ns:
+        return True
+    return partial_hash(old_path, old_stat.st_size) == partial_hash(new_path, new_stat.st_size)
+
+
+def compare_versions(old_sources, new_sources, workers=8):
+    """-> {'added', 'changed', 'unchanged', 'removed'}: listas de caminhos relativos"""
+    result = {'added': [], 'changed': [], 'unchanged': [], 'removed': []}
+
+    common = []
+    for relative in new_sources:
+        if relative in old_sources:
+            common.append(relative)
+        else:
+            result['added'].append(relative)
+    result['removed'] = [r for r in old_sources if r not in new_sources]
+
+    def compare(relative):
+        try:
+            return relative, same_asset(old_sources[relative], new_sources[relative])
+        except OSError:
+            return relative, False
+
+    # Hashes parciais em paralelo: a maior parte do tempo é espera de I/O
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for relative, same in pool.map(compare, common):
+            result['unchanged' if same else 'changed'].append(relative)
+
+    for names in result.values():
+        names.sort()
+    return result
+
+
+def carry_over(source, destination):
+    """
+    Leva a saída antiga para a versão nova -> 'mesmo', 'link' ou 'copia'
+
+    Um destino existente é removido antes: sobrescrever com open('wb') um
+    arquivo linkado alteraria também a versão antiga.
+    """
+    if destination.exists():
+        if os.path.samefile(source, destination):
+            return 'mesmo'
+        destination.unlink()
+
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        os.link(source, destination)
+        return 'link'
+    except OSError:
+        shutil.copy2(source, destination)
+        return 'copia'
+
+
+def update_version(old_folder, new_folder, output_root=None, workers=8):
+    old = RPGMakerDecrypter(old_folder)
+    new = RPGMakerDecrypter(new_folder)
+    new.output_root = output_root
+
+    print("="*70)
+    print("  ATUALIZAÇÃO INCREMENTAL ENTRE VERSÕES")
+    print("="*70)
+    print(f"\n📁 Versão antiga: {old.game_folder}")
+    print(f"📁 Versão nova:   {new.game_folder}")
+    if output_root is not None:
+        print(f"📤 Saída: {output_root}")
+    print()
+
+    if not new.load_encryption_key():
+        return False
+
+    print("\n🔍 Comparando as duas versões...")
+    old_sources = encrypted_sources(old, include_backup=True)
+    new_sources = encrypted_sources(new)
+    diff = compare_versions(old_sources, new_sources, workers)
+
+    print(f"   ➕ Novos:      {len(diff['added'])}")
+    print(f"   ✏️  Alterados:  {len(diff['changed'])}")
+    print(f"   ＝ Iguais:     {len(diff['unchanged'])}")
+    print(f"   ➖ Removidos:  {len(diff['removed'])}")
+
+    # Iguais: a saída já descriptografada da versão antiga vai por hardlink
+    to_decrypt = diff['added'] + diff['changed']
+    carried = {'mesmo': 0, 'link': 0, 'copia': 0}
+    for relative in diff['unchanged']:
+        old_output = old.output_path_for(old_sources[relative], Path(relative))
+        new_output = new.output_path_for(new_sources[relative], Path(relative))
+        if not old_output.exists():
+            # A versão antiga não tinha essa saída: descriptografa
+            to_decrypt.append(relative)
+            continue
+        try:
+            carried[carry_over(old_output, new_output)] += 1
+        except OSError as e:
+            print(f"  ⚠️  {relative}: {e} - será descriptografado")
+            to_decrypt.append(relative)
+
+    print(f"\n🔗 Saídas reaproveitadas: {carried['link']} hardlinks, {carried['copia']} cópias, "
+          f"{carried['mesmo']} já no lugar")
+
+    # Removidos: saídas que sobraram no destino
+    deleted = 0
+    for relative in diff['removed']:
+        output = new.output_path_for(new.game_folder / relative, Path(relative))
+        if output.exists():
+            output.unlink()
+            deleted += 1
+    if deleted:
+        print(f"🗑️  Saídas de arquivos removidos apagadas: {deleted}")
+
+    # Novos e alterados: só eles passam pelo motor
+    files = [new_sources[relative] for relative in sorted(to_decrypt)]
+    for file_path in files:
+        output = new.output_path_for(file_path)
+        if output.exists():
+            output.unlink()
+
+    if files:
+        completed = new.decrypt_all(files)
+        if completed is False:
+            return False
+    else:
+        print("\n✅ Nada para descriptografar")
+
+    print()
+    if output_root is not None:
+        new.copy_system_json()
+    new.disable_encryption()
+    new.write_state()
+    return new.stats['failed'] == 0
+
+
+def main():
+    options = [a for a in sys.argv[1:] if a.startswith('--')]
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+
+    if len(args) < 2:
+        print("❌ Uso: python atualizar_versao.py /jogo_antigo /jogo_novo [--saida=PASTA]")
+        print("\n  /jogo_antigo    versão anterior, já descriptografada")
+        print("  /jogo_novo      cópia nova (criptografada) que vai receber as saídas")
+        print("  --saida=PASTA   grava as saídas em outra pasta (mesmo layout do jogo)")
+        sys.exit(1)
+
+    old_folder, new_folder = args[0], args[1]
+
+    for folder in (old_folder, new_folder):
+        if not os.path.isdir(folder):
+            print(f"❌ Pasta não encontrada: {folder}")
+            sys.exit(1)
+
+    output_root = None
+    for option in options:
+        if option.startswith(('--saida=', '--output-root=')):
+            output_root = Path(option.split('=', 1)[1]).expanduser()
+
+    success = update_version(old_folder, new_folder, output_root)
+    sys.exit(0 if success else 1)
+
+
+if __name__ == "__main__":
+    main()
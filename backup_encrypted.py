@@ -1,85 +1,303 @@
 #!/usr/bin/env python3
 """
 Move arquivos .png_ e .ogg_ para pasta de backup
+
+Modos:
+  (padrão)       move os arquivos para _backup_encrypted/
+  --hardlink     cria hardlinks em _backup_encrypted/ e mantém o jogo intacto
+                 (instantâneo, sem espaço extra no mesmo sistema de arquivos)
+  --compactado   grava um único ZIP sem compressão e remove os originais
+                 (bem mais rápido no /sdcard do que milhares de arquivos pequenos)
+  --restaurar    devolve os originais (de qualquer modo) em paralelo
 """
 
 import os
 import sys
 import shutil
+import zipfile
+import threading
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+# Pastas do próprio toolkit, nunca varridas
+from nucleo import TOOLKIT_FOLDERS
+
+BACKUP_FOLDER = '_backup_encrypted'
+BACKUP_ARCHIVE = 'backup_encrypted.zip'
+
+ENCRYPTED_EXTENSIONS = ('.png_', '.ogg_', '.m4a_', '.rpgmvp', '.rpgmvo', '.rpgmvm')
+
+def walk_game_files(game_folder, excluded=TOOLKIT_FOLDERS):
+    """Percorre o jogo uma vez -> (pasta, nome do arquivo), ignorando pastas do toolkit"""
+    game_folder = Path(game_folder)
+
+    for root, dirs, files in os.walk(game_folder):
+        # Poda as pastas ignoradas antes de descer nelas
+        dirs[:] = [d for d in dirs if d not in excluded]
+
+        root_path = Path(root)
+        for file in files:
+            yield root_path, file
 
-def backup_encrypted_files(game_folder):
+def find_encrypted_files(game_folder):
+    """Uma única passada pela árvore -> caminhos relativos dos arquivos criptografados"""
     game_folder = Path(game_folder)
-    backup_folder = game_folder / '_backup_encrypted'
-    
+    return [
+        (root_path / file).relative_to(game_folder)
+        for root_path, file in walk_game_files(game_folder)
+        if file.endswith(ENCRYPTED_EXTENSIONS)
+    ]
+
+def link_or_copy(source, destination):
+    """Hardlink; se o sistema de arquivos não suportar (FAT, outro disco), copia"""
+    try:
+        os.link(source, destination)
+        return True
+    except OSError:
+        shutil.copy2(source, destination)
+        return False
+
+def backup_to_folder(game_folder, backup_folder, files, mode, workers):
+    """Modos mover/hardlink -> (processados, erros, copiados em vez de linkados)"""
+    # Cria cada subpasta uma vez só, antes de disparar as threads
+    for parent in sorted({relative.parent for relative in files}):
+        (backup_folder / parent).mkdir(parents=True, exist_ok=True)
+
+    def backup_one(relative):
+        source = game_folder / relative
+        destination = backup_folder / relative
+        try:
+            if mode == 'hardlink':
+                if destination.exists():
+                    return relative, None, False
+                return relative, None, not link_or_copy(source, destination)
+
+            # Mesmo sistema de arquivos: rename direto, sem cópia
+            shutil.move(str(source), str(destination))
+            return relative, None, False
+        except Exception as e:
+            return relative, e, False
+
+    done = 0
+    errors = 0
+    copied = 0
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for relative, error, was_copied in pool.map(backup_one, files):
+            if error:
+                print(f"  ❌ {relative} - Erro: {error}")
+                errors += 1
+                continue
+            done += 1
+            copied += was_copied
+            if done % 500 == 0:
+                print(f"   ⏳ {done}/{len(files)}")
+
+    return done, errors, copied
+
+def backup_to_archive(game_folder, backup_folder, files):
+    """Modo compactado: ZIP sem compressão, originais removidos só depois de fechado"""
+    archive_path = backup_folder / BACKUP_ARCHIVE
+    tmp_path = archive_path.with_name(archive_path.name + '.tmp')
+
+    # Um backup compactado anterior é mantido: os novos arquivos entram junto
+    existing = set()
+    if archive_path.exists():
+        shutil.copy2(archive_path, tmp_path)
+        with zipfile.ZipFile(tmp_path) as zf:
+            existing = set(zf.namelist())
+
+    packed = []
+    errors = 0
+    with zipfile.ZipFile(tmp_path, 'a', compression=zipfile.ZIP_STORED, allowZip64=True) as zf:
+        for i, relative in enumerate(files, 1):
+            name = relative.as_posix()
+            try:
+                if name not in existing:
+                    zf.write(game_folder / relative, name)
+                packed.append(relative)
+            except Exception as e:
+                print(f"  ❌ {relative} - Erro: {e}")
+                errors += 1
+            if i % 500 == 0:
+                print(f"   ⏳ {i}/{len(files)}")
+
+    os.replace(tmp_path, archive_path)
+
+    # Só remove o original depois que o ZIP foi gravado por completo
+    for relative in packed:
+        try:
+            os.remove(game_folder / relative)
+        except OSError as e:
+            print(f"  ⚠️  {relative} - não removido: {e}")
+
+    return len(packed), errors, 0
+
+def backup_encrypted_files(game_folder, mode='mover', workers=8):
+    game_folder = Path(game_folder)
+    backup_folder = game_folder / BACKUP_FOLDER
+
     print("="*60)
     print("  Backup de Arquivos Criptografados")
     print("="*60)
     print(f"\n📁 Jogo: {game_folder}")
-    print(f"💾 Backup: {backup_folder}\n")
-    
+    print(f"💾 Backup: {backup_folder}")
+    print(f"⚙️  Modo: {mode}\n")
+
     # Cria pasta de backup
     backup_folder.mkdir(exist_ok=True)
-    
-    moved_count = 0
-    
-    # Procura arquivos criptografados
-    extensions = ['.png_', '.ogg_', '.rpgmvp', '.rpgmvo', '.rpgmvm']
-    
-    for ext in extensions:
-        print(f"\n🔍 Procurando arquivos {ext}...")
-        
-        for root, dirs, files in os.walk(game_folder):
-            root_path = Path(root)
-            
-            # Não procurar na pasta de backup
-            if '_backup_encrypted' in root_path.parts:
-                continue
-            
-            for file in files:
-                if file.endswith(ext):
-                    source = root_path / file
-                    
-                    # Mantém estrutura de pastas no backup
-                    relative = source.relative_to(game_folder)
-                    destination = backup_folder / relative
-                    
-                    # Cria subpastas se necessário
-                    destination.parent.mkdir(parents=True, exist_ok=True)
-                    
-                    # Move o arquivo
-                    try:
-                        shutil.move(str(source), str(destination))
-                        print(f"  ✅ {relative}")
-                        moved_count += 1
-                    except Exception as e:
-                        print(f"  ❌ {relative} - Erro: {e}")
-    
+
+    # Procura arquivos criptografados (não procura na pasta de backup
+    # nem nas demais pastas do toolkit)
+    print("🔍 Procurando arquivos criptografados...")
+    files = find_encrypted_files(game_folder)
+    print(f"📦 Encontrados: {len(files)} arquivos")
+
+    if mode == 'compactado':
+        done, errors, copied = backup_to_archive(game_folder, backup_folder, files)
+    else:
+        done, errors, copied = backup_to_folder(game_folder, backup_folder, files, mode, workers)
+
+    verb = {'mover': 'movidos', 'hardlink': 'linkados', 'compactado': 'compactados'}[mode]
+
     print(f"\n{'='*60}")
-    print(f"📦 Total de arquivos movidos: {moved_count}")
+    print(f"📦 Total de arquivos {verb}: {done}")
+    if copied:
+        print(f"⚠️  Copiados (hardlink não suportado aqui): {copied}")
+    if errors:
+        print(f"❌ Erros: {errors}")
     print(f"💾 Backup salvo em: {backup_folder}")
     print(f"{'='*60}")
-    
-    if moved_count > 0:
+
+    if done > 0:
         print(f"\n✅ Backup concluído!")
-        print(f"🎮 Agora você pode testar o jogo no JoiPlay")
+        if mode != 'hardlink':
+            print(f"🎮 Agora você pode testar o jogo no JoiPlay")
         print(f"\n💡 Se precisar restaurar os arquivos originais:")
-        print(f"   cp -r '{backup_folder}'/* '{game_folder}'/")
+        print(f"   python backup_encrypted.py '{game_folder}' --restaurar")
     else:
         print(f"\n⚠️  Nenhum arquivo criptografado encontrado")
 
+    return done
+
+def restore_backup(game_folder, workers=8):
+    """Devolve os originais da pasta de backup e/ou do ZIP compactado, em paralelo"""
+    game_folder = Path(game_folder)
+    backup_folder = game_folder / BACKUP_FOLDER
+    archive_path = backup_folder / BACKUP_ARCHIVE
+
+    if not backup_folder.exists():
+        print("❌ Nenhum backup encontrado")
+        return 0
+
+    restored = 0
+    errors = 0
+
+    # Arquivos soltos (modos mover e hardlink)
+    loose = [
+        (root_path / file).relative_to(backup_folder)
+        for root_path, file in walk_game_files(backup_folder, excluded=[])
+        if file.endswith(ENCRYPTED_EXTENSIONS)
+    ]
+
+    for parent in sorted({relative.parent for relative in loose}):
+        (game_folder / parent).mkdir(parents=True, exist_ok=True)
+
+    def restore_loose(relative):
+        source = backup_folder / relative
+        destination = game_folder / relative
+        try:
+            # Hardlink do original ainda no lugar: basta descartar o link
+            if destination.exists() and os.path.samefile(source, destination):
+                os.remove(source)
+            else:
+                shutil.move(str(source), str(destination))
+            return relative, None
+        except Exception as e:
+            return relative, e
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for relative, error in pool.map(restore_loose, loose):
+            if error:
+                print(f"  ❌ {relative} - Erro: {error}")
+                errors += 1
+            else:
+                restored += 1
+
+    # ZIP compactado: um handle por thread, membros sem compressão
+    if archive_path.exists():
+        local = threading.local()
+        handles = []
+
+        def archive_handle():
+            if not hasattr(local, 'zf'):
+                local.zf = zipfile.ZipFile(archive_path)
+                handles.append(local.zf)
+            return local.zf
+
+        with zipfile.ZipFile(archive_path) as zf:
+            members = [info.filename for info in zf.infolist() if not info.is_dir()]
+
+        for parent in sorted({Path(name).parent for name in members}):
+            (game_folder / parent).mkdir(parents=True, exist_ok=True)
+
+        def restore_member(name):
+            try:
+                with archive_handle().open(name) as src, open(game_folder / name, 'wb') as dst:
+                    shutil.copyfileobj(src, dst, 1024 * 1024)
+                return name, None
+            except Exception as e:
+                return name, e
+
+        archive_errors = 0
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for name, error in pool.map(restore_member, members):
+                if error:
+                    print(f"  ❌ {name} - Erro: {error}")
+                    archive_errors += 1
+                else:
+                    restored += 1
+
+        for handle in handles:
+            handle.close()
+
+        errors += archive_errors
+        if not archive_errors:
+            os.remove(archive_path)
+
+    if not errors:
+        shutil.rmtree(backup_folder, ignore_errors=True)
+
+    print(f"\n✅ Restaurados: {restored} arquivos")
+    if errors:
+        print(f"❌ Erros: {errors} (o backup foi mantido)")
+
+    return restored
+
 def main():
-    if len(sys.argv) < 2:
-        print("❌ Uso: python backup_encrypted.py /caminho/jogo")
+    options = [a for a in sys.argv[1:] if a.startswith('--')]
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+
+    if not args:
+        print("❌ Uso: python backup_encrypted.py /caminho/jogo [--hardlink | --compactado | --restaurar]")
         sys.exit(1)
-    
-    game_folder = sys.argv[1]
-    
+
+    game_folder = args[0]
+
     if not os.path.isdir(game_folder):
         print(f"❌ Pasta não encontrada: {game_folder}")
         sys.exit(1)
-    
-    backup_encrypted_files(game_folder)
+
+    if '--restaurar' in options:
+        restore_backup(game_folder)
+        return
+
+    mode = 'mover'
+    if '--hardlink' in options:
+        mode = 'hardlink'
+    elif '--compactado' in options:
+        mode = 'compactado'
+
+    backup_encrypted_files(game_folder, mode)
 
 if __name__ == "__main__":
     main()
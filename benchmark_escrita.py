@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Benchmark do gravador do rpgmaker_decrypter_FINAL.py em muitos arquivos pequenos
+
+Gera um jogo sintético (padrão: 10.000 arquivos de 1 KB em 100 pastas) e
+descriptografa duas vezes, cada vez numa cópia nova:
+  caminhos   um mkdir por arquivo e open() pelo caminho completo
+  dir_fd     pasta de saída criada uma vez, origem e saída abertas pelo
+             nome relativo ao descritor da pasta
+
+As chamadas são contadas por um audit hook do Python (eventos 'open' e
+'os.mkdir') e, como stat não gera evento de auditoria, por um os.stat
+instrumentado (Path.stat/exists passam por ele). Junto vai o total de
+componentes de caminho que o kernel precisa resolver - é esse custo que o
+FUSE do /sdcard cobra a cada chamada.
+
+Uso:
+    python benchmark_escrita.py [arquivos] [pastas] [--pasta=/sdcard/tmp]
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+from pathlib import Path
+from contextlib import redirect_stdout
+
+from rpgmaker_decrypter_FINAL import RPGMakerDecrypter, STANDARD_HEADER, DIR_FD_SUPPORTED
+
+KEY = '00112233445566778899aabbccddeeff'
+FILE_SIZE = 1024
+
+# Contadores do audit hook (só contam enquanto 'active' for True)
+calls = {'active': False, 'open': 0, 'mkdir': 0, 'stat': 0, 'components': 0}
+
+real_stat = os.stat
+
+
+def audit(event, args):
+    if not calls['active'] or event not in ('open', 'os.mkdir'):
+        return
+
+    path = args[0]
+    if isinstance(path, int):
+        return
+
+    # open() com opener gera dois eventos: o do open() (modo 'rb'/'wb') e o
+    # do os.open() relativo (modo None) - conta só o primeiro
+    if event == 'open' and args[1] is None and not os.path.isabs(path):
+        return
+
+    calls['open' if event == 'open' else 'mkdir'] += 1
+    calls['components'] += len(Path(os.fsdecode(path)).parts)
+
+
+def counted_stat(path, *args, **kwargs):
+    if calls['active'] and not isinstance(path, int):
+        calls['stat'] += 1
+        calls['components'] += len(Path(os.fsdecode(path)).parts)
+    return real_stat(path, *args, **kwargs)
+
+
+def build_game(game_folder, files, folders):
+    """Jogo MV mínimo: System.json e PNGs criptografados espalhados nas pastas"""
+    (game_folder / 'data').mkdir(parents=True)
+    with open(game_folder / 'data' / 'System.json', 'w', encoding='utf-8') as f:
+        json.dump({'encryptionKey': KEY, 'hasEncryptedImages': True, 'hasEncryptedAudio': True}, f)
+
+    key = bytes.fromhex(KEY)
+    png = b'\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR' + bytes(FILE_SIZE - 16)
+    encrypted = STANDARD_HEADER + bytes(a ^ b for a, b in zip(png[:16], key)) + png[16:]
+
+    for i in range(files):
+        folder = game_folder / 'img' / 'pictures' / f'p{i % folders:03d}'
+        if i < folders:
+            folder.mkdir(parents=True)
+        with open(folder / f'f{i:05d}.rpgmvp', 'wb') as f:
+            f.write(encrypted)
+
+
+def run(game_folder, use_dir_fd):
+    decrypter = RPGMakerDecrypter(game_folder)
+    decrypter.encryption_key = KEY
+    decrypter.forced_offset = 16
+    decrypter.use_dir_fd = use_dir_fd
+    encrypted_files = decrypter.find_encrypted_files()
+
+    for name in ('open', 'mkdir', 'stat', 'components'):
+        calls[name] = 0
+
+    calls['active'] = True
+    start = time.perf_counter()
+    with redirect_stdout(io.StringIO()):
+        decrypter.decrypt_all(encrypted_files)
+    elapsed = time.perf_counter() - start
+    calls['active'] = False
+
+    return {
+        'success': decrypter.stats['success'],
+        'open': calls['open'],
+        'mkdir': calls['mkdir'],
+        'stat': calls['stat'],
+        'components': calls['components'],
+        'seconds': elapsed,
+    }
+
+
+def main():
+    options = [a for a in sys.argv[1:] if a.startswith('--')]
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+
+    files = int(args[0]) if args else 10000
+    folders = int(args[1]) if len(args) > 1 else 100
+
+    base = None
+    for option in options:
+        if option.startswith('--pasta='):
+            base = option.split('=', 1)[1]
+
+    sys.addaudithook(audit)
+    os.stat = counted_stat
+
+    print("="*70)
+    print("  BENCHMARK DO GRAVADOR (muitos arquivos pequenos)")
+    print("="*70)
+    print(f"\n📦 {files} arquivos de {FILE_SIZE} bytes em {folders} pastas")
+    if not DIR_FD_SUPPORTED:
+        print("⚠️  dir_fd não suportado neste sistema: os dois modos usam caminhos")
+
+    work = Path(tempfile.mkdtemp(prefix='rpgmtk_bench_', dir=base))
+    results = {}
+    try:
+        for mode, use_dir_fd in (('caminhos', False), ('dir_fd', True)):
+            game_folder = work / mode
+            build_game(game_folder, files, folders)
+            results[mode] = run(game_folder, use_dir_fd)
+            shutil.rmtree(game_folder)
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+    print(f"\n   {'modo':10s} {'open':>8s} {'mkdir':>8s} {'stat':>8s} {'total':>8s} {'componentes':>12s} {'tempo':>9s}")
+    for mode, result in results.items():
+        total = result['open'] + result['mkdir'] + result['stat']
+        print(f"   {mode:10s} {result['open']:8d} {result['mkdir']:8d} {result['stat']:8d} {total:8d} "
+              f"{result['components']:12d} {result['seconds']:8.2f}s")
+
+    before = results['caminhos']
+    after = results['dir_fd']
+    if before['components']:
+        saved = 100 - after['components'] * 100 / before['components']
+        print(f"\n✅ Componentes de caminho resolvidos: -{saved:.0f}%")
+    print(f"✅ mkdir: {before['mkdir']} -> {after['mkdir']}")
+    print(f"✅ Chamadas (open + mkdir + stat): {before['open'] + before['mkdir'] + before['stat']} -> "
+          f"{after['open'] + after['mkdir'] + after['stat']}")
+
+
+if __name__ == "__main__":
+    main()
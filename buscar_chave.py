@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Busca da chave de criptografia quando o System.json não tem encryptionKey
+
+A chave costuma estar fixa no código: js/plugins/*.js, rpg_core.js,
+rmmz_core.js ou main.js (às vezes em plugins.js ou no próprio System.json
+com outro nome). Este script:
+  1. lê esses arquivos com mmap e extrai, numa única regex compilada,
+     todo literal de 32 caracteres hexadecimais
+  2. lê só os bytes 16-31 de alguns arquivos criptografados por pasta
+  3. testa cada candidata contra todas as amostras de uma vez (um único
+     XOR de inteiro grande sobre as amostras empacotadas)
+  4. devolve a chave que valida mais assinaturas
+
+As amostras PNG também geram candidatas por texto conhecido: os primeiros
+16 bytes de todo PNG são fixos (assinatura + tamanho e tipo do IHDR).
+"""
+
+import os
+import re
+import sys
+import json
+import mmap
+import shutil
+from pathlib import Path
+
+from catalogo_assets import ENCRYPTED_EXTENSIONS
+from grafo_referencias import find_www_root
+
+KEY_PATTERN = re.compile(rb'(?<![0-9A-Fa-f])[0-9A-Fa-f]{32}(?![0-9A-Fa-f])')
+
+# Bytes conhecidos no início do arquivo descriptografado -> (valor, máscara)
+PNG_HEADER = bytes.fromhex('89504e470d0a1a0a0000000d49484452')
+KNOWN_PLAINTEXT = {
+    '.png': (PNG_HEADER, b'\xff' * 16),
+    '.ogg': (b'OggS\x00' + bytes(11), b'\xff' * 5 + bytes(11)),
+    '.m4a': (bytes(4) + b'ftyp' + bytes(8), bytes(4) + b'\xff' * 4 + bytes(8)),
+}
+
+SAMPLES_PER_FOLDER = 2
+MAX_SAMPLES = 64
+
+
+def key_sources(game_folder):
+    """Arquivos onde a chave costuma estar fixa"""
+    www_root = find_www_root(game_folder)
+    js_folder = www_root / 'js'
+
+    sources = []
+    for name in ('rpg_core.js', 'rmmz_core.js', 'main.js', 'plugins.js'):
+        if (js_folder / name).exists():
+            sources.append(js_folder / name)
+    if (js_folder / 'plugins').exists():
+        sources.extend(sorted((js_folder / 'plugins').glob('*.js')))
+    if (www_root / 'data' / 'System.json').exists():
+        sources.append(www_root / 'data' / 'System.json')
+
+    return sources
+
+
+def scan_key_literals(sources):
+    """Literais de 32 hex em todos os arquivos -> {candidata: [arquivos]}"""
+    candidates = {}
+    for path in sources:
+        try:
+            with open(path, 'rb') as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    continue
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    literals = {m.lower() for m in KEY_PATTERN.findall(mm)}
+        except (OSError, ValueError):
+            continue
+
+        for literal in literals:
+            candidates.setdefault(literal.decode('ascii'), []).append(path.name)
+
+    return candidates
+
+
+def sample_headers(game_folder, per_folder=SAMPLES_PER_FOLDER, limit=MAX_SAMPLES):
+    """
+    Bytes 16-31 de alguns arquivos criptografados de cada pasta
+    Retorna [(bloco criptografado, texto conhecido, máscara)]
+    """
+    www_root = find_www_root(game_folder)
+    samples = []
+
+    for folder_name in ('img', 'audio'):
+        for root, dirs, files in os.walk(www_root / folder_name):
+            dirs.sort()
+            taken = 0
+            for file in sorted(files):
+                if taken >= per_folder or len(samples) >= limit:
+                    break
+                ext = os.path.splitext(file)[1].lower()
+                if ext not in ENCRYPTED_EXTENSIONS:
+                    continue
+                try:
+                    with open(os.path.join(root, file), 'rb') as f:
+                        head = f.read(32)
+                except OSError:
+                    continue
+                if len(head) < 32:
+                    continue
+                known, mask = KNOWN_PLAINTEXT[ENCRYPTED_EXTENSIONS[ext]]
+                samples.append((head[16:32], known, mask))
+                taken += 1
+
+    return samples
+
+
+def png_derived_keys(samples):
+    """Texto conhecido: bloco PNG criptografado XOR cabeçalho fixo = chave"""
+    keys = set()
+    for block, known, mask in samples:
+        if known == PNG_HEADER:
+            keys.add(bytes(a ^ b for a, b in zip(block, known)).hex())
+    return keys
+
+
+def ordered_candidates(literals, derived):
+    """Literais dos scripts primeiro: no empate, ganham das derivadas de PNG"""
+    return sorted(literals) + sorted(derived - set(literals))
+
+
+def score_keys(candidates, samples):
+    """
+    Quantas amostras cada candidata valida -> [(chave, acertos)] do maior para o menor
+
+    As amostras são empacotadas num único inteiro (16 bytes por amostra);
+    a chave é repetida no mesmo formato, então cada candidata custa um XOR,
+    um AND e uma comparação por amostra nos bytes do resultado.
+    """
+    if not samples:
+        return []
+
+    n = len(samples)
+    packed = int.from_bytes(b''.join(block for block, _, _ in samples), 'big')
+    expected = int.from_bytes(b''.join(known for _, known, _ in samples), 'big')
+    mask = int.from_bytes(b''.join(m for _, _, m in samples), 'big')
+
+    # 0x...0001 0000...0001: multiplica a chave para repeti-la em cada amostra
+    repeat = int.from_bytes((b'\x00' * 15 + b'\x01') * n, 'big')
+
+    zero_lane = bytes(16)
+    scores = []
+    for key in candidates:
+        key_int = int.from_bytes(bytes.fromhex(key), 'big')
+        diff = ((packed ^ (key_int * repeat)) ^ expected) & mask
+        lanes = diff.to_bytes(16 * n, 'big')
+        hits = sum(1 for i in range(0, 16 * n, 16) if lanes[i:i + 16] == zero_lane)
+        scores.append((key, hits))
+
+    # Ordenação estável: no empate vale a ordem das candidatas
+    scores.sort(key=lambda item: -item[1])
+    return scores
+
+
+def find_encryption_key(game_folder, verbose=True):
+    """
+    Procura a chave -> (chave, acertos, amostras) ou None
+    """
+    samples = sample_headers(game_folder)
+    if not samples:
+        if verbose:
+            print("   ⚠️  Nenhum arquivo criptografado para testar as candidatas")
+        return None
+
+    literals = scan_key_literals(key_sources(game_folder))
+    derived = png_derived_keys(samples)
+    candidates = ordered_candidates(literals, derived)
+
+    if verbose:
+        print(f"   🔎 Literais de 32 hex: {len(literals)} | derivadas de PNG: {len(derived)} | amostras: {len(samples)}")
+
+    scores = score_keys(candidates, samples)
+    if not scores or scores[0][1] == 0:
+        return None
+
+    key, hits = scores[0]
+    if verbose:
+        origin = ', '.join(literals.get(key, [])) or 'cabeçalho PNG'
+        print(f"   🔑 Melhor candidata: {key} ({hits}/{len(samples)} assinaturas, origem: {origin})")
+    return key, hits, len(samples)
+
+
+def save_key(game_folder, key):
+    """Grava a chave no System.json (com backup)"""
+    system_path = find_www_root(game_folder) / 'data' / 'System.json'
+
+    with open(system_path, 'r', encoding='utf-8') as f:
+        system_data = json.load(f)
+
+    backup_path = system_path.with_suffix('.json.backup')
+    if not backup_path.exists():
+        shutil.copy2(system_path, backup_path)
+
+    system_data['encryptionKey'] = key
+    with open(system_path, 'w', encoding='utf-8') as f:
+        json.dump(system_data, f, ensure_ascii=False, indent=2)
+
+
+def main():
+    options = [a for a in sys.argv[1:] if a.startswith('--')]
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+
+    if not args:
+        print("❌ Uso: python buscar_chave.py /caminho/jogo [--gravar]")
+        print("\n  --gravar   salva a chave encontrada no System.json (com backup)")
+        sys.exit(1)
+
+    game_folder = Path(args[0])
+
+    if not game_folder.is_dir():
+        print(f"❌ Pasta não encontrada: {game_folder}")
+        sys.exit(1)
+
+    print("="*70)
+    print("  BUSCA DE CHAVE DE CRIPTOGRAFIA")
+    print("="*70)
+    print(f"\n📁 Jogo: {game_folder}\n")
+
+    samples = sample_headers(game_folder)
+    literals = scan_key_literals(key_sources(game_folder))
+    candidates = ordered_candidates(literals, png_derived_keys(samples))
+    scores = score_keys(candidates, samples)
+
+    print(f"🧪 Amostras: {len(samples)}")
+    print(f"🔎 Candidatas: {len(candidates)}\n")
+    for key, hits in scores[:10]:
+        origin = ', '.join(literals.get(key, [])) or 'cabeçalho PNG'
+        print(f"   {key}  {hits:3d}/{len(samples)}  ({origin})")
+
+    print(f"\n{'='*70}")
+    if not scores or scores[0][1] == 0:
+        print("❌ Nenhuma candidata validou as amostras")
+        sys.exit(1)
+
+    key = scores[0][0]
+    print(f"✅ Chave: {key}")
+
+    if '--gravar' in options:
+        save_key(game_folder, key)
+        print("💾 Chave salva no System.json")
+    print(f"{'='*70}")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,9 @@ import os
 import sys
 from pathlib import Path
 
+from catalogo_assets import AssetCatalog
+from grafo_referencias import ReferenceGraph
+
 def find_live2d_files(game_folder):
     game_folder = Path(game_folder)
     
@@ -14,61 +17,27 @@ def find_live2d_files(game_folder):
     print("  BUSCA COMPLETA DE ARQUIVOS LIVE2D")
     print("="*70)
     
-    # Extensões para procurar
-    extensions = [
-        '.model3.json', '.json', '.json_',
-        '.moc3', '.moc3_',
-        '.physics3.json', '.physics3.json_',
-        '.cdi3.json', '.cdi3.json_',
-        '.userdata3.json', '.userdata3.json_',
-        '.motion3.json', '.motion3.json_',
-        '.exp3.json', '.exp3.json_',
-        '.png', '.png_'
-    ]
-    
-    print("\n🔍 Procurando em todas as pastas...")
+    print("\n🔍 Atualizando catálogo de assets...")
     
     results = {}
     
-    # Procura em todo o jogo
-    for root, dirs, files in os.walk(game_folder):
-        root_path = Path(root)
+    # Catálogo incremental: só arquivos novos/alterados são relidos,
+    # e os arquivos Live2D saem de uma consulta indexada
+    with AssetCatalog(game_folder) as catalog:
+        added, updated, removed = catalog.update()
+        print(f"   Novos: {added} | Alterados: {updated} | Removidos: {removed}")
         
-        # Ignora algumas pastas
-        if any(x in root_path.parts for x in ['node_modules', '__pycache__', '_backup']):
-            continue
-        
-        for file in files:
-            file_path = root_path / file
-            ext = ''.join(file_path.suffixes)  # Pega todas as extensões
-            
-            # Verifica se é arquivo Live2D
-            is_live2d = False
+        for row in catalog.live2d_files():
+            category = str(Path(row['folder']))
             
-            # Por extensão
-            if any(file.endswith(e) for e in extensions):
-                is_live2d = True
+            if category not in results:
+                results[category] = []
             
-            # Por palavra-chave no nome
-            if any(kw in file.lower() for kw in ['live2d', 'model3', '.moc3', 'motion']):
-                is_live2d = True
-            
-            # Por estar na pasta live2d
-            if 'live2d' in str(file_path).lower():
-                is_live2d = True
-            
-            if is_live2d:
-                relative = file_path.relative_to(game_folder)
-                category = str(relative.parent)
-                
-                if category not in results:
-                    results[category] = []
-                
-                results[category].append({
-                    'name': file,
-                    'size': file_path.stat().st_size,
-                    'path': relative
-                })
+            results[category].append({
+                'name': row['name'],
+                'size': row['size'],
+                'path': Path(row['path'])
+            })
     
     # Mostra resultados
     if not results:
@@ -159,6 +128,19 @@ def check_plugin_config(game_folder):
                     print(f"      - {path}")
             else:
                 print(f"   ⚠️  Nenhum caminho .model3.json encontrado no código")
+    
+    # Modelos referenciados por eventos e parâmetros de plugins (grafo de referências)
+    with ReferenceGraph(game_folder) as graph:
+        graph.update()
+        existing = graph.existing_assets()
+        models = sorted(a for a in graph.referenced_assets() if a.lower().endswith('.model3.json'))
+        
+        if models:
+            print(f"\n🔗 Modelos referenciados pelo jogo: {len(models)}")
+            for model in models:
+                status = "✅" if model in existing else "❌ faltando"
+                users = graph.users_of(model)
+                print(f"   {status} {model} ({len(users)} referências)")
 
 if __name__ == "__main__":
     if len(sys.argv) < 2:
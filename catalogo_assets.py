@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+"""
+Catálogo persistente (SQLite) de todos os arquivos do jogo
+
+Cada arquivo é registrado com tipo, tamanho, mtime, estado de criptografia,
+dimensões do PNG (lidas do chunk IHDR) e duração do Ogg (lida da última
+granule position) - tudo a partir dos cabeçalhos, sem decodificar nada.
+
+A atualização é incremental: só arquivos novos ou com tamanho/mtime
+diferentes têm os cabeçalhos relidos. A busca de Live2D e a verificação
+de status passam a ser consultas indexadas.
+"""
+
+import os
+import sys
+import sqlite3
+from pathlib import Path
+
+from nucleo import TOOLKIT_DIR, TOOLKIT_FOLDERS, ENCRYPTED_EXTENSIONS, file_extension
+
+CATALOG_NAME = 'catalogo.db'
+
+KINDS = {
+    'image': ['.png', '.jpg', '.jpeg', '.webp', '.gif', '.bmp'],
+    'audio': ['.ogg', '.m4a', '.mp3', '.wav'],
+    'video': ['.webm', '.mp4'],
+    'data': ['.json'],
+    'script': ['.js'],
+    'font': ['.ttf', '.otf', '.woff', '.woff2'],
+}
+
+# Mesmos critérios de buscar_live2d.py
+LIVE2D_EXTENSIONS = [
+    '.model3.json', '.json', '.json_',
+    '.moc3', '.moc3_',
+    '.physics3.json', '.physics3.json_',
+    '.cdi3.json', '.cdi3.json_',
+    '.userdata3.json', '.userdata3.json_',
+    '.motion3.json', '.motion3.json_',
+    '.exp3.json', '.exp3.json_',
+    '.png', '.png_'
+]
+LIVE2D_KEYWORDS = ['live2d', 'model3', '.moc3', 'motion']
+LIVE2D_IGNORED_FOLDERS = ['node_modules', '__pycache__', '_backup']
+
+PNG_SIGNATURE = b'\x89\x50\x4E\x47\x0D\x0A\x1A\x0A'
+RPGMV_HEADER_SIZE = 16
+OGG_MAX_PAGE = 65307
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS assets (
+    path      TEXT PRIMARY KEY,
+    folder    TEXT NOT NULL,
+    name      TEXT NOT NULL,
+    ext       TEXT NOT NULL,
+    kind      TEXT NOT NULL,
+    size      INTEGER NOT NULL,
+    mtime_ns  INTEGER NOT NULL,
+    encrypted INTEGER NOT NULL,
+    live2d    INTEGER NOT NULL,
+    width     INTEGER,
+    height    INTEGER,
+    duration  REAL
+);
+CREATE INDEX IF NOT EXISTS idx_assets_kind ON assets(kind, encrypted);
+CREATE INDEX IF NOT EXISTS idx_assets_folder ON assets(folder);
+CREATE INDEX IF NOT EXISTS idx_assets_live2d ON assets(live2d) WHERE live2d = 1;
+"""
+
+
+def classify(name):
+    """Retorna (tipo, criptografado) a partir do nome do arquivo"""
+    ext = file_extension(name)
+    encrypted = ext in ENCRYPTED_EXTENSIONS or ext.endswith('_')
+
+    plain_ext = ENCRYPTED_EXTENSIONS.get(ext, ext.rstrip('_'))
+
+    if '.moc3' in name.lower() or '.model3.json' in name.lower():
+        return 'live2d', encrypted
+
+    for kind, extensions in KINDS.items():
+        if plain_ext in extensions:
+            return kind, encrypted
+
+    return 'other', encrypted
+
+
+def is_live2d(name, relative_path):
+    """Critério de arquivo Live2D (extensão, palavra-chave ou pasta live2d)"""
+    parts = Path(relative_path).parts[:-1]
+    if any(x in parts for x in LIVE2D_IGNORED_FOLDERS):
+        return False
+
+    if any(name.endswith(e) for e in LIVE2D_EXTENSIONS):
+        return True
+
+    if any(kw in name.lower() for kw in LIVE2D_KEYWORDS):
+        return True
+
+    return 'live2d' in str(relative_path).lower()
+
+
+def read_png_size(f):
+    """Largura e altura do IHDR (funciona com PNG criptografado)"""
+    head = f.read(RPGMV_HEADER_SIZE + 24)
+
+    if head[:5] == b'RPGMV':
+        # Bytes 16-31 (assinatura + início do IHDR) estão criptografados,
+        # mas largura/altura ficam logo depois, em texto puro
+        data = head[RPGMV_HEADER_SIZE:]
+        encrypted = True
+    else:
+        if not head.startswith(PNG_SIGNATURE) or head[12:16] != b'IHDR':
+            return None, None, False
+        data = head
+        encrypted = False
+
+    if len(data) < 24:
+        return None, None, encrypted
+
+    width = int.from_bytes(data[16:20], 'big')
+    height = int.from_bytes(data[20:24], 'big')
+    return width, height, encrypted
+
+
+def read_ogg_duration(f, size):
+    """Duração do Ogg: última granule position / taxa de amostragem"""
+    head = f.read(RPGMV_HEADER_SIZE + 512)
+    encrypted = head[:5] == b'RPGMV'
+
+    rate = None
+    granule_offset = 0
+
+    pos = head.find(b'\x01vorbis')
+    if pos >= 0 and pos + 16 <= len(head):
+        rate = int.from_bytes(head[pos + 12:pos + 16], 'little')
+    else:
+        pos = head.find(b'OpusHead')
+        if pos >= 0 and pos + 12 <= len(head):
+            # Opus sempre usa granule a 48 kHz, descontando o pre-skip
+            rate = 48000
+            granule_offset = int.from_bytes(head[pos + 10:pos + 12], 'little')
+
+    if not rate:
+        return None, encrypted
+
+    f.seek(max(0, size - OGG_MAX_PAGE))
+    tail = f.read()
+
+    end = len(tail)
+    while True:
+        pos = tail.rfind(b'OggS', 0, end)
+        if pos < 0 or pos + 14 > len(tail):
+            return None, encrypted
+
+        granule = int.from_bytes(tail[pos + 6:pos + 14], 'little', signed=True)
+        if granule >= 0:
+            return max(0, granule - granule_offset) / rate, encrypted
+        end = pos
+
+
+def read_header_info(path, kind, ext, size):
+    """Lê só os cabeçalhos necessários -> (largura, altura, duração, criptografado)"""
+    plain_ext = ENCRYPTED_EXTENSIONS.get(ext, ext)
+
+    try:
+        with open(path, 'rb') as f:
+            if plain_ext == '.png':
+                width, height, encrypted = read_png_size(f)
+                return width, height, None, encrypted
+            if plain_ext == '.ogg':
+                duration, encrypted = read_ogg_duration(f, size)
+                return None, None, duration, encrypted
+    except OSError:
+        pass
+
+    return None, None, None, None
+
+
+class AssetCatalog:
+    def __init__(self, game_folder, db_path=None):
+        self.game_folder = Path(game_folder)
+        self.db_path = Path(db_path) if db_path else self.game_folder / TOOLKIT_DIR / CATALOG_NAME
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        self.conn = sqlite3.connect(str(self.db_path))
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def scan_tree(self):
+        """Percorre o jogo com scandir -> {caminho relativo: DirEntry}"""
+        entries = {}
+        stack = [self.game_folder]
+
+        while stack:
+            folder = stack.pop()
+            try:
+                with os.scandir(folder) as it:
+                    for entry in it:
+                        if entry.is_dir(follow_symlinks=False):
+                            if entry.name != TOOLKIT_DIR:
+                                stack.append(entry.path)
+                        elif entry.is_file():
+                            relative = os.path.relpath(entry.path, self.game_folder)
+                            entries[relative.replace(os.sep, '/')] = entry
+            except OSError:
+                continue
+
+        return entries
+
+    def update(self):
+        """
+        Atualização incremental do catálogo
+        Retorna (adicionados, atualizados, removidos)
+        """
+        known = {
+            row['path']: (row['size'], row['mtime_ns'])
+            for row in self.conn.execute("SELECT path, size, mtime_ns FROM assets")
+        }
+
+        entries = self.scan_tree()
+
+        added = 0
+        updated = 0
+        rows = []
+
+        for relative, entry in entries.items():
+            try:
+                st = entry.stat()
+            except OSError:
+                continue
+
+            previous = known.get(relative)
+            if previous == (st.st_size, st.st_mtime_ns):
+                continue
+
+            if previous is None:
+                added += 1
+            else:
+                updated += 1
+
+            name = entry.name
+            ext = file_extension(name)
+            kind, encrypted = classify(name)
+            width, height, duration, header_encrypted = read_header_info(entry.path, kind, ext, st.st_size)
+            if header_encrypted is not None:
+                encrypted = header_encrypted
+
+            folder = relative.rsplit('/', 1)[0] if '/' in relative else '.'
+
+            rows.append((
+                relative, folder, name, ext, kind, st.st_size, st.st_mtime_ns,
+                int(encrypted), int(is_live2d(name, relative)), width, height, duration
+            ))
+
+        removed = [(path,) for path in known if path not in entries]
+
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO assets VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows
+            )
+            self.conn.executemany("DELETE FROM assets WHERE path = ?", removed)
+
+        return added, updated, len(removed)
+
+    def query(self, sql, params=()):
+        return self.conn.execute(sql, params).fetchall()
+
+    def live2d_files(self):
+        return self.query(
+            "SELECT path, folder, name, size FROM assets WHERE live2d = 1 ORDER BY folder, name"
+        )
+
+    def media_counts(self):
+        """
+        Contagem de mídia criptografada e descriptografada (img/ e audio/)
+        Backup e quarentena (TOOLKIT_FOLDERS) ficam de fora, como em scan_state
+        """
+        encrypted_exts = tuple(ENCRYPTED_EXTENSIONS)
+        placeholders = ', '.join('?' * len(encrypted_exts))
+
+        # Primeira pasta do caminho fora das pastas do toolkit
+        toolkit = tuple(TOOLKIT_FOLDERS)
+        outside_toolkit = (
+            "substr(path, 1, instr(path, '/') - 1) NOT IN "
+            f"({', '.join('?' * len(toolkit))})"
+        )
+
+        encrypted = self.query(
+            f"SELECT COUNT(*) AS n FROM assets WHERE ext IN ({placeholders}) AND {outside_toolkit}",
+            encrypted_exts + toolkit
+        )[0]['n']
+        decrypted = self.query(
+            "SELECT COUNT(*) AS n FROM assets WHERE ext IN ('.png', '.ogg', '.m4a') "
+            "AND ('/' || path LIKE '%/img/%' OR '/' || path LIKE '%/audio/%') "
+            f"AND {outside_toolkit}",
+            toolkit
+        )[0]['n']
+
+        return {'encrypted': encrypted, 'decrypted': decrypted}
+
+    def summary(self):
+        return self.query(
+            "SELECT kind, encrypted, COUNT(*) AS n, SUM(size) AS total FROM assets "
+            "GROUP BY kind, encrypted ORDER BY total DESC"
+        )
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("❌ Uso: python catalogo_assets.py /caminho/jogo")
+        sys.exit(1)
+
+    game_folder = sys.argv[1]
+
+    if not os.path.isdir(game_folder):
+        print(f"❌ Pasta não encontrada: {game_folder}")
+        sys.exit(1)
+
+    print("="*70)
+    print("  CATÁLOGO DE ASSETS")
+    print("="*70)
+    print(f"\n📁 Jogo: {game_folder}")
+
+    import time
+    start_time = time.time()
+
+    with AssetCatalog(game_folder) as catalog:
+        added, updated, removed = catalog.update()
+        elapsed = time.time() - start_time
+
+        print(f"💾 Catálogo: {catalog.db_path}")
+        print(f"\n🔄 Atualização ({elapsed:.2f}s):")
+        print(f"   Novos: {added}")
+        print(f"   Alterados: {updated}")
+        print(f"   Removidos: {removed}")
+
+        print(f"\n📊 Resumo por tipo:")
+        for row in catalog.summary():
+            state = "🔒" if row['encrypted'] else "  "
+            size_mb = (row['total'] or 0) / 1024 / 1024
+            print(f"   {state} {row['kind']:10s}: {row['n']:6d} arquivos ({size_mb:9.1f} MB)")
+
+        largest = catalog.query(
+            "SELECT path, width, height FROM assets WHERE width IS NOT NULL "
+            "ORDER BY width * height DESC LIMIT 5"
+        )
+        if largest:
+            print(f"\n🖼️  Maiores imagens:")
+            for row in largest:
+                print(f"   {row['width']:5d}x{row['height']:<5d} {row['path']}")
+
+        audio = catalog.query("SELECT COUNT(*) AS n, SUM(duration) AS total FROM assets WHERE duration IS NOT NULL")[0]
+        if audio['n']:
+            print(f"\n🎵 Áudio Ogg: {audio['n']} arquivos, {audio['total'] / 60:.1f} min no total")
+
+    print(f"\n{'='*70}")
+
+
+if __name__ == "__main__":
+    main()
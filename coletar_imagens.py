@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+ETAPA 1: Coleta as imagens do jogo para tradução em lote
+
+Versão Python (multiplataforma) do collectImages.ps1: copia as imagens
+para uma pasta plana e grava o mesmo translation_config.json com o
+mapeamento "arquivo coletado -> caminho original".
+
+As imagens são agrupadas pelo hash do conteúdo (calculado em paralelo):
+cada imagem única é exportada uma única vez, e as cópias idênticas em
+outras pastas ficam em "duplicates" para que a restauração devolva a
+tradução a todos os caminhos originais.
+
+O hash de cada imagem coletada também é salvo no config para que o
+restaurar_imagens.py só devolva as imagens que realmente foram alteradas.
+"""
+
+import os
+import sys
+import json
+import shutil
+import hashlib
+from datetime import datetime
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+CONFIG_NAME = 'translation_config.json'
+
+IMAGE_EXTENSIONS = ['.png', '.jpg', '.jpeg', '.bmp', '.gif', '.webp', '.tiff']
+
+DEFAULT_EXCLUSIONS = ['particles', 'parallaxes', 'tilesets', 'characters', 'actors']
+
+
+def file_hash(path):
+    """SHA-256 do arquivo (leitura em blocos)"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def find_images(source_dir, excluded_dirs):
+    """Imagens do diretório, ignorando as subpastas excluídas -> (todas, filtradas)"""
+    all_images = []
+    images = []
+
+    for root, dirs, files in os.walk(source_dir):
+        dirs.sort()
+        root_path = Path(root)
+        is_excluded = any(part in excluded_dirs for part in root_path.relative_to(source_dir).parts)
+
+        for file in sorted(files):
+            if Path(file).suffix.lower() not in IMAGE_EXTENSIONS:
+                continue
+            all_images.append(root_path / file)
+            if not is_excluded:
+                images.append(root_path / file)
+
+    return all_images, images
+
+
+def unique_name(image, mapping):
+    """Mesmo esquema de nomes do collectImages.ps1 para colisões"""
+    dest_name = image.name
+    if dest_name not in mapping:
+        return dest_name
+
+    parent_folder = image.parent.name
+    base_name = image.stem
+    extension = image.suffix
+
+    dest_name = f"{base_name}_{parent_folder}{extension}"
+    suffix = 1
+    while dest_name in mapping:
+        dest_name = f"{base_name}_{parent_folder}_{suffix}{extension}"
+        suffix += 1
+
+    return dest_name
+
+
+def copy_image(args):
+    source, destination = args
+    shutil.copy2(source, destination)
+
+
+def collect_images(source_dir, output_dir, excluded_dirs=DEFAULT_EXCLUSIONS, workers=8):
+    source_dir = Path(source_dir).resolve()
+    output_dir = Path(output_dir).resolve()
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    print("\n=== CONFIGURAÇÃO ===")
+    print(f"Origem: {source_dir}")
+    print(f"Destino: {output_dir}")
+    print(f"Pastas excluídas: {', '.join(excluded_dirs) if excluded_dirs else 'Nenhuma'}")
+
+    print("\n=== COLETANDO IMAGENS ===")
+    all_images, images = find_images(source_dir, excluded_dirs)
+    excluded_count = len(all_images) - len(images)
+
+    print(f"Total de imagens encontradas: {len(all_images)}")
+    print(f"Imagens excluídas (pastas filtradas): {excluded_count}")
+    print(f"Imagens a serem coletadas: {len(images)}")
+
+    if not images:
+        print("\n✗ Nenhuma imagem para coletar após aplicar filtros!")
+        return False
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        # Hash do conteúdo em paralelo para agrupar imagens idênticas
+        image_hashes = list(pool.map(file_hash, images))
+
+        # Nomes decididos em ordem (determinístico): só a primeira imagem
+        # de cada grupo é exportada, as demais viram duplicatas
+        mapping = {}
+        duplicates = {}
+        hashes = {}
+        exported_by_hash = {}
+        jobs = []
+        for image, digest in zip(images, image_hashes):
+            relative = str(image.relative_to(source_dir))
+
+            if digest in exported_by_hash:
+                duplicates.setdefault(exported_by_hash[digest], []).append(relative)
+                continue
+
+            dest_name = unique_name(image, mapping)
+            mapping[dest_name] = relative
+            hashes[dest_name] = digest
+            exported_by_hash[digest] = dest_name
+            jobs.append((image, output_dir / dest_name))
+
+        for i, _ in enumerate(pool.map(copy_image, jobs), 1):
+            if i % 100 == 0:
+                print(f"   ⏳ {i}/{len(jobs)}")
+
+    duplicate_count = sum(len(paths) for paths in duplicates.values())
+
+    config = {
+        'sourceDirectory': str(source_dir),
+        'outputDirectory': str(output_dir),
+        'collectionDate': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'totalImages': len(mapping),
+        'excludedDirectories': list(excluded_dirs),
+        'excludedImagesCount': excluded_count,
+        'duplicateImagesCount': duplicate_count,
+        'mapping': mapping,
+        'duplicates': duplicates,
+        'hashes': hashes,
+    }
+
+    config_file = output_dir / CONFIG_NAME
+    with open(config_file, 'w', encoding='utf-8') as f:
+        json.dump(config, f, ensure_ascii=False, indent=2)
+
+    print("\n=== CONCLUÍDO ===")
+    print(f"✓ Coletadas: {len(mapping)} imagens únicas")
+    print(f"✓ Duplicatas agrupadas: {duplicate_count} imagens")
+    print(f"✓ Excluídas: {excluded_count} imagens")
+    print(f"✓ Diretório de saída: {output_dir}")
+    print(f"✓ Configuração salva em: {config_file}")
+
+    print("\n=== PRÓXIMOS PASSOS ===")
+    print(f"1. Faça o batch translation das imagens em: {output_dir}")
+    print(f"2. Se o serviço criar uma pasta 'translated', mantenha-a dentro de: {output_dir}")
+    print(f"3. Execute restaurar_imagens.py para restaurar as imagens traduzidas")
+    return True
+
+
+def main():
+    options = [a for a in sys.argv[1:] if a.startswith('--')]
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+
+    if len(args) < 2:
+        print("❌ Uso: python coletar_imagens.py <pasta_img_do_jogo> <pasta_saida> [--excluir=a,b,c]")
+        print("\nExemplo:")
+        print("  python coletar_imagens.py /sdcard/joiplay/mygame/www/img ~/traducao")
+        print(f"\nPastas excluídas por padrão: {', '.join(DEFAULT_EXCLUSIONS)}")
+        print("Use --excluir= (vazio) para não excluir nenhuma")
+        sys.exit(1)
+
+    source_dir, output_dir = args[0], args[1]
+
+    if not os.path.isdir(source_dir):
+        print(f"❌ Pasta não encontrada: {source_dir}")
+        sys.exit(1)
+
+    excluded_dirs = DEFAULT_EXCLUSIONS
+    for option in options:
+        if option.startswith('--excluir='):
+            value = option.split('=', 1)[1]
+            excluded_dirs = [d.strip() for d in value.split(',') if d.strip()]
+
+    print("=== COLETOR DE IMAGENS PARA BATCH TRANSLATION ===")
+
+    success = collect_images(source_dir, output_dir, excluded_dirs)
+    sys.exit(0 if success else 1)
+
+
+if __name__ == "__main__":
+    main()
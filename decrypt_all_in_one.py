@@ -7,10 +7,21 @@ Diagnóstico + Descriptografia + Verificação em um único comando
 import os
 import sys
 import json
+import time
 from pathlib import Path
 from collections import Counter
 import math
 
+from metricas import Metrics
+from backup_encrypted import walk_game_files
+from nucleo import (
+    TOOLKIT_DIR, ENCRYPTED_EXTENSIONS, SIGNATURES,
+    system_json_paths, signature_ok, xor_header,
+)
+
+# Arquivos sorteados por pasta/extensão no pré-voo
+PREFLIGHT_SAMPLES = 3
+
 class Color:
     """Cores ANSI para terminal"""
     HEADER = '\033[95m'
@@ -29,23 +40,18 @@ class RPGMakerDecrypterAllInOne:
         self.stats = {
             'success': 0,
             'failed': 0,
-            'corrupted': 0
+            'corrupted': 0,
+            'skipped': 0
         }
+        self.started = None
+        self.finished = None
         
-        self.encrypted_extensions = {
-            '.rpgmvp': '.png',
-            '.png_': '.png',
-            '.rpgmvo': '.ogg',
-            '.ogg_': '.ogg',
-            '.rpgmvm': '.m4a',
-            '.m4a_': '.m4a',
-        }
+        # Tempo, bytes e latência por fase (metricas.py)
+        self.metrics = Metrics()
         
-        self.signatures = {
-            '.png': b'\x89\x50\x4E\x47\x0D\x0A\x1A\x0A',
-            '.ogg': b'OggS',
-            '.m4a': b'\x00\x00\x00\x20\x66\x74\x79\x70'
-        }
+        # Extensões e assinaturas (nucleo.py)
+        self.encrypted_extensions = ENCRYPTED_EXTENSIONS
+        self.signatures = SIGNATURES
     
     def print_header(self, title):
         """Imprime cabeçalho formatado"""
@@ -69,14 +75,9 @@ class RPGMakerDecrypterAllInOne:
         """Fase 1: Diagnóstico do System.json"""
         self.print_header("FASE 1: DIAGNÓSTICO")
         
-        system_paths = [
-            self.game_folder / 'data' / 'System.json',
-            self.game_folder / 'www' / 'data' / 'System.json'
-        ]
-        
         print("🔍 Procurando System.json...")
         
-        for system_path in system_paths:
+        for system_path in system_json_paths(self.game_folder):
             if system_path.exists():
                 self.print_success(f"Encontrado: {system_path.relative_to(self.game_folder)}")
                 
@@ -92,6 +93,13 @@ class RPGMakerDecrypterAllInOne:
                     print(f"   Imagens criptografadas: {has_encrypted_images}")
                     print(f"   Áudio criptografado: {has_encrypted_audio}")
                     
+                    if not self.encryption_key:
+                        self.print_warning("encryptionKey ausente: procurando nos scripts do jogo...")
+                        from buscar_chave import find_encryption_key
+                        found = find_encryption_key(self.game_folder)
+                        if found:
+                            self.encryption_key = found[0]
+                    
                     if self.encryption_key:
                         self.print_success(f"Chave encontrada: {self.encryption_key}")
                         print(f"   Tamanho: {len(self.encryption_key)} chars ({len(self.encryption_key)//2} bytes)")
@@ -107,83 +115,98 @@ class RPGMakerDecrypterAllInOne:
         self.print_error("System.json não encontrado!")
         return False
     
-    def diagnose_sample_file(self):
-        """Analisa um arquivo de exemplo"""
-        print("\n🔍 Procurando arquivo de exemplo...")
-        
-        # Procura arquivo .png_ ou .rpgmvp
-        search_paths = [
-            'img/system/*.png_',
-            'img/system/*.rpgmvp',
-            'img/pictures/*.png_',
-            'img/pictures/*.rpgmvp'
+    def find_encrypted_files(self):
+        """
+        Uma única passada pela árvore -> arquivos criptografados
+        
+        Não desce em _backup_encrypted, _quarentena nem _toolkit: as cópias
+        do backup e da quarentena não são do jogo em uso.
+        """
+        extensions = tuple(self.encrypted_extensions)
+        return [
+            root_path / file
+            for root_path, file in walk_game_files(self.game_folder)
+            if file.endswith(extensions)
         ]
+    
+    def signature_ok(self, output_ext, data):
+        """Confere a assinatura do arquivo descriptografado"""
+        return signature_ok(output_ext, data)
+    
+    def check_sample(self, file_path):
+        """Testa header, XOR e assinatura lendo só os primeiros 32 bytes"""
+        try:
+            with open(file_path, 'rb') as f:
+                data = f.read(32)
+        except OSError as e:
+            return False, str(e)
+        
+        if len(data) < 32:
+            return False, "muito pequeno"
+        if data[:5] != b'RPGMV':
+            return False, f"sem header RPGMV ({data[:16].hex()})"
+        
+        decrypted_header = xor_header(data, bytes.fromhex(self.encryption_key))
+        output_ext = self.encrypted_extensions[file_path.suffix]
+        
+        if not self.signature_ok(output_ext, decrypted_header):
+            return False, f"XOR não produziu assinatura {output_ext} ({decrypted_header[:8].hex()})"
+        return True, None
+    
+    def diagnose_samples(self, encrypted_files, samples_per_group=PREFLIGHT_SAMPLES):
+        """
+        Pré-voo: sorteia alguns arquivos de cada pasta/extensão e testa em paralelo
+        
+        Retorna o conjunto de grupos (pasta, extensão) reprovados, ou None
+        se nenhum grupo passou (a execução completa não adiantaria).
+        """
+        import random
+        from concurrent.futures import ThreadPoolExecutor
+        
+        print("\n🧪 Pré-voo: amostragem por pasta e extensão...")
+        
+        groups = {}
+        for file_path in encrypted_files:
+            groups.setdefault((file_path.parent, file_path.suffix), []).append(file_path)
+        
+        sampled = []
+        for group, files in groups.items():
+            for file_path in random.sample(files, min(samples_per_group, len(files))):
+                sampled.append((group, file_path))
+        
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(lambda item: self.check_sample(item[1]), sampled))
+        
+        failures = {}
+        for (group, file_path), (ok, reason) in zip(sampled, results):
+            if not ok:
+                failures.setdefault(group, []).append((file_path, reason))
+        
+        print(f"   Grupos: {len(groups)} | Amostras: {len(sampled)}")
+        
+        for (folder, ext), problems in sorted(failures.items()):
+            relative_folder = folder.relative_to(self.game_folder)
+            total = len(groups[(folder, ext)])
+            self.print_error(f"{relative_folder}/*{ext} ({total} arquivos)")
+            for file_path, reason in problems[:2]:
+                print(f"      {file_path.name}: {reason}")
+        
+        if len(failures) == len(groups):
+            return None
+        
+        if failures:
+            skipped = sum(len(groups[g]) for g in failures)
+            self.print_warning(f"{len(failures)} grupos reprovados: {skipped} arquivos ficam de fora")
+            print(f"   💡 Verifique com: python diagnostico_avancado.py <arquivo>")
+        else:
+            self.print_success("Todas as amostras passaram (header, XOR e assinatura)")
         
-        from glob import glob
-        
-        for pattern in search_paths:
-            matches = glob(str(self.game_folder / pattern))
-            if matches:
-                sample_file = Path(matches[0])
-                self.print_success(f"Arquivo de exemplo: {sample_file.name}")
-                
-                with open(sample_file, 'rb') as f:
-                    data = f.read()
-                
-                print(f"\n📊 Análise:")
-                print(f"   Tamanho: {len(data)} bytes")
-                print(f"   Primeiros 16 bytes: {data[:16].hex()}")
-                
-                # Verifica header RPGMV
-                if data[:5] == b'RPGMV':
-                    self.print_success("Header RPGMV detectado")
-                    
-                    standard_header = bytes.fromhex("5250474d56000000000301000000000000")
-                    if data[:16] == standard_header:
-                        self.print_success("Header PADRÃO (comum)")
-                    else:
-                        self.print_warning("Header CUSTOMIZADO")
-                        print(f"   Esperado: {standard_header.hex()}")
-                        print(f"   Atual:    {data[:16].hex()}")
-                else:
-                    self.print_error("Header RPGMV não encontrado!")
-                
-                # Testa XOR
-                if self.encryption_key:
-                    key_bytes = bytes.fromhex(self.encryption_key)
-                    encrypted_header = data[16:32]
-                    decrypted_header = bytes([encrypted_header[i] ^ key_bytes[i] for i in range(16)])
-                    
-                    print(f"\n🧪 Teste de XOR:")
-                    print(f"   Criptografado:     {encrypted_header.hex()}")
-                    print(f"   Descriptografado:  {decrypted_header.hex()}")
-                    
-                    # Verifica se deu certo
-                    if decrypted_header.startswith(self.signatures['.png']):
-                        self.print_success("XOR funcionou! Assinatura PNG válida")
-                        return True
-                    else:
-                        self.print_error("XOR não produziu assinatura válida")
-                        return False
-                
-                return True
-        
-        self.print_warning("Nenhum arquivo de exemplo encontrado")
-        return True
+        return set(failures)
     
-    def decrypt_all_files(self):
+    def decrypt_all_files(self, encrypted_files):
         """Fase 2: Descriptografia"""
         self.print_header("FASE 2: DESCRIPTOGRAFIA")
         
-        print("🔍 Procurando arquivos criptografados...")
-        
-        encrypted_files = []
-        for ext in self.encrypted_extensions:
-            for root, dirs, files in os.walk(self.game_folder):
-                for file in files:
-                    if file.endswith(ext):
-                        encrypted_files.append(Path(root) / file)
-        
         if not encrypted_files:
             self.print_warning("Nenhum arquivo criptografado encontrado!")
             return
@@ -195,10 +218,11 @@ class RPGMakerDecrypterAllInOne:
         print(f"   Método: XOR apenas nos bytes 16-31")
         print(f"   Chave: {self.encryption_key[:16]}...\n")
         
-        import time
         start_time = time.time()
+        self.started = time.strftime('%Y-%m-%dT%H:%M:%S')
         
         key_bytes = bytes.fromhex(self.encryption_key)
+        metrics = self.metrics
         
         for i, file_path in enumerate(encrypted_files, 1):
             progress = (i / total) * 100
@@ -206,8 +230,10 @@ class RPGMakerDecrypterAllInOne:
             
             try:
                 # Lê arquivo
+                start = time.perf_counter()
                 with open(file_path, 'rb') as f:
                     data = f.read()
+                metrics.record('leitura', time.perf_counter() - start, len(data))
                 
                 if len(data) < 32:
                     self.print_error("muito pequeno")
@@ -222,27 +248,28 @@ class RPGMakerDecrypterAllInOne:
                 
                 # DESCRIPTOGRAFIA CORRETA:
                 # XOR apenas nos bytes 16-31
-                encrypted_header = data[16:32]
-                unencrypted_body = data[32:]
-                
-                decrypted_header = bytes([encrypted_header[i] ^ key_bytes[i] for i in range(16)])
-                
-                # Arquivo final
-                final_data = decrypted_header + unencrypted_body
+                start = time.perf_counter()
+                final_data = xor_header(data, key_bytes)
+                metrics.record('xor', time.perf_counter() - start, len(final_data))
                 
                 # Verifica assinatura
                 output_ext = self.encrypted_extensions[file_path.suffix]
-                expected_sig = self.signatures.get(output_ext)
                 
-                if expected_sig and not final_data.startswith(expected_sig):
+                start = time.perf_counter()
+                signature_ok = self.signature_ok(output_ext, final_data)
+                metrics.record('assinatura', time.perf_counter() - start)
+                
+                if not signature_ok:
                     self.print_error(f"assinatura inválida")
                     self.stats['failed'] += 1
                     continue
                 
                 # Salva
                 output_path = file_path.with_suffix(output_ext)
+                start = time.perf_counter()
                 with open(output_path, 'wb') as f:
                     f.write(final_data)
+                metrics.record('escrita', time.perf_counter() - start, len(final_data))
                 
                 self.print_success(f"{len(final_data)} bytes")
                 self.stats['success'] += 1
@@ -252,6 +279,7 @@ class RPGMakerDecrypterAllInOne:
                 self.stats['failed'] += 1
         
         elapsed = time.time() - start_time
+        self.finished = time.strftime('%Y-%m-%dT%H:%M:%S')
         
         print(f"\n{'─'*70}")
         print(f"⏱️  Tempo: {elapsed:.2f}s ({elapsed/60:.1f} min)")
@@ -324,12 +352,7 @@ class RPGMakerDecrypterAllInOne:
         """Desativa criptografia no System.json"""
         print("\n🔧 Desativando flags de criptografia...")
         
-        system_paths = [
-            self.game_folder / 'data' / 'System.json',
-            self.game_folder / 'www' / 'data' / 'System.json'
-        ]
-        
-        for system_path in system_paths:
+        for system_path in system_json_paths(self.game_folder):
             if system_path.exists():
                 try:
                     with open(system_path, 'r', encoding='utf-8') as f:
@@ -360,23 +383,62 @@ class RPGMakerDecrypterAllInOne:
         
         print(f"📁 Jogo: {self.game_folder}\n")
         
+        metrics = self.metrics
+        
         # Fase 1: Diagnóstico
-        if not self.diagnose_system_json():
+        with metrics.phase('chave'):
+            key_found = self.diagnose_system_json()
+        
+        if not key_found:
             print(f"\n{Color.RED}{'='*70}{Color.ENDC}")
             print(f"{Color.RED}❌ ERRO: Não foi possível encontrar a chave de criptografia{Color.ENDC}")
             print(f"{Color.RED}{'='*70}{Color.ENDC}")
             return False
         
-        self.diagnose_sample_file()
+        print("\n🔍 Procurando arquivos criptografados...")
+        with metrics.phase('descoberta'):
+            encrypted_files = self.find_encrypted_files()
+        
+        # Pré-voo: aborta ou deixa de fora os grupos que falhariam
+        if encrypted_files:
+            with metrics.phase('pre_voo'):
+                failed_groups = self.diagnose_samples(encrypted_files)
+            
+            if failed_groups is None:
+                print(f"\n{Color.RED}{'='*70}{Color.ENDC}")
+                print(f"{Color.RED}❌ ERRO: Nenhum grupo passou no pré-voo - descriptografia cancelada{Color.ENDC}")
+                print(f"{Color.RED}{'='*70}{Color.ENDC}")
+                print(f"\n💡 Header customizado ou chave incorreta: use diagnostico_avancado.py")
+                return False
+            
+            kept = [f for f in encrypted_files if (f.parent, f.suffix) not in failed_groups]
+            self.stats['skipped'] = len(encrypted_files) - len(kept)
+            encrypted_files = kept
         
         # Fase 2: Descriptografia
-        self.decrypt_all_files()
+        self.decrypt_all_files(encrypted_files)
         
         # Fase 3: Verificação
-        self.verify_integrity()
+        with metrics.phase('verificacao'):
+            self.verify_integrity()
         
         # Desativa criptografia
-        self.disable_encryption()
+        with metrics.phase('system_json'):
+            self.disable_encryption()
+        
+        # Estado para o teste_rapido.py (depois de tudo que altera o disco)
+        from estado_jogo import write_state
+        with metrics.phase('estado'):
+            write_state(
+                self.game_folder,
+                engine='decrypt_all_in_one',
+                encryption_key=self.encryption_key,
+                started=self.started,
+                finished=self.finished,
+                success=self.stats['success'],
+                failed=self.stats['failed'],
+                corrupted=self.stats['corrupted'],
+            )
         
         # Resumo final
         self.print_header("RESUMO FINAL")
@@ -390,9 +452,12 @@ class RPGMakerDecrypterAllInOne:
         if self.stats['corrupted'] > 0:
             self.print_error(f"Corrompidos: {self.stats['corrupted']}")
         
+        if self.stats['skipped'] > 0:
+            self.print_warning(f"Deixados de fora (pré-voo): {self.stats['skipped']}")
+        
         print(f"\n{'='*70}")
         
-        if self.stats['failed'] == 0 and self.stats['corrupted'] == 0:
+        if self.stats['failed'] == 0 and self.stats['corrupted'] == 0 and self.stats['skipped'] == 0:
             self.print_success("✨ SUCESSO TOTAL! ✨")
             print(f"\n{Color.GREEN}🎮 Agora você pode testar o jogo no JoiPlay!{Color.ENDC}")
             return True
@@ -403,20 +468,39 @@ class RPGMakerDecrypterAllInOne:
 
 
 def main():
-    if len(sys.argv) < 2:
-        print("❌ Uso: python decrypt_all_in_one.py /caminho/para/jogo")
+    options = [a for a in sys.argv[1:] if a.startswith('--')]
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    
+    if not args:
+        print("❌ Uso: python decrypt_all_in_one.py /caminho/para/jogo [--metricas] [--metrics-json=ARQ] [--profile]")
         print("\nExemplo:")
         print("  python decrypt_all_in_one.py /sdcard/joiplay/deathzone")
         sys.exit(1)
     
-    game_folder = sys.argv[1]
+    game_folder = args[0]
     
     if not os.path.isdir(game_folder):
         print(f"❌ Pasta não encontrada: {game_folder}")
         sys.exit(1)
     
+    metrics_json = None
+    for option in options:
+        if option.startswith('--metrics-json='):
+            metrics_json = option.split('=', 1)[1]
+    
     decrypter = RPGMakerDecrypterAllInOne(game_folder)
-    success = decrypter.run()
+    
+    if '--profile' in options:
+        from metricas import run_profiled, PROFILE_NAME
+        success = run_profiled(decrypter.run, decrypter.game_folder / TOOLKIT_DIR / PROFILE_NAME)
+    else:
+        success = decrypter.run()
+    
+    if '--metricas' in options or '--profile' in options:
+        decrypter.metrics.report()
+    if metrics_json:
+        decrypter.metrics.dump_json(metrics_json)
+        print(f"💾 Métricas salvas em: {metrics_json}")
     
     sys.exit(0 if success else 1)
 
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Arquivo de estado do jogo (<jogo>/_toolkit/estado.json)
+
+Gravado pelos motores de descriptografia ao terminar: chave usada,
+contagens, horários, mtime de cada pasta, uma amostra de arquivos por
+pasta/extensão e o digest do manifesto das saídas.
+
+A verificação de status (teste_rapido.py) lê esse arquivo e só confirma:
+  1. a chave do System.json e o mtime do System.json
+  2. o mtime de cada pasta (criar, apagar ou renomear arquivos muda o
+     mtime da pasta) - um stat por pasta, não por arquivo
+  3. alguns arquivos sorteados de cada pasta/extensão (tamanho e assinatura)
+
+A varredura completa só é necessária quando o estado não existe ou
+não confere mais com o disco.
+"""
+
+import os
+import sys
+import json
+import random
+from pathlib import Path
+
+from nucleo import (
+    TOOLKIT_DIR, TOOLKIT_FOLDERS, ENCRYPTED_EXTENSIONS, file_extension, find_system_json, signature_ok,
+)
+
+STATE_NAME = 'estado.json'
+STATE_VERSION = 1
+
+# Amostras guardadas por pasta/extensão e quantas são conferidas na verificação
+STORED_SAMPLES = 8
+CHECKED_SAMPLES = 2
+
+DECRYPTED_EXTENSIONS = ('.png', '.ogg', '.m4a')
+MEDIA_FOLDERS = ('img', 'audio')
+
+
+def state_path(game_folder):
+    return Path(game_folder) / TOOLKIT_DIR / STATE_NAME
+
+
+def is_media(relative_folder):
+    """Mesmo critério do catálogo: caminho dentro de img/ ou audio/"""
+    return any(part in MEDIA_FOLDERS for part in relative_folder.split('/'))
+
+
+def scan_state(game_folder):
+    """
+    Varredura completa (scandir) -> pastas, contagens e digest do manifesto
+
+    Contagens seguem a mesma regra do AssetCatalog.media_counts(). As pastas
+    do toolkit (backup, quarentena) ficam de fora: um backup recém-feito não
+    pode fazer o jogo parecer criptografado.
+    """
+    # hashlib e datetime só na gravação: a verificação de status não paga por eles
+    import hashlib
+
+    game_folder = Path(game_folder)
+    folders = {}
+    manifest = []
+    counts = {'encrypted': 0, 'decrypted': 0}
+
+    stack = ['']
+    while stack:
+        relative_folder = stack.pop()
+        folder_path = game_folder / relative_folder if relative_folder else game_folder
+        groups = {}
+
+        try:
+            folder_mtime = folder_path.stat().st_mtime_ns
+            with os.scandir(folder_path) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in TOOLKIT_FOLDERS:
+                            stack.append(f"{relative_folder}/{entry.name}".lstrip('/'))
+                        continue
+                    if not entry.is_file():
+                        continue
+
+                    ext = file_extension(entry.name)
+                    if ext in ENCRYPTED_EXTENSIONS:
+                        counts['encrypted'] += 1
+                    elif ext in DECRYPTED_EXTENSIONS and is_media(relative_folder):
+                        counts['decrypted'] += 1
+                        size = entry.stat().st_size
+                        manifest.append(f"{relative_folder}/{entry.name}\t{size}".lstrip('/'))
+                    else:
+                        continue
+
+                    groups.setdefault(ext, []).append(entry.name)
+        except OSError:
+            continue
+
+        # Só entram na amostra arquivos que passam na conferência agora
+        samples = {}
+        for ext, names in groups.items():
+            chosen = random.sample(names, min(STORED_SAMPLES, len(names)))
+            sizes = {name: (folder_path / name).stat().st_size for name in chosen}
+            samples[ext] = {
+                name: size for name, size in sizes.items()
+                if check_sample(folder_path / name, ext, size)
+            }
+
+        folders[relative_folder] = {'mtime_ns': folder_mtime, 'samples': samples}
+
+    digest = hashlib.sha256('\n'.join(sorted(manifest)).encode('utf-8')).hexdigest()
+    return folders, counts, digest
+
+
+def load_state(game_folder):
+    try:
+        with open(state_path(game_folder), 'r', encoding='utf-8') as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if state.get('version') != STATE_VERSION:
+        return None
+    return state
+
+
+def write_state(game_folder, **decryption):
+    """
+    Grava o estado atual do jogo
+
+    Campos de descriptografia (engine, encryption_key, started, finished,
+    success, failed) vêm do motor; numa atualização feita pela verificação
+    de status os campos anteriores são mantidos.
+    """
+    from datetime import datetime
+
+    game_folder = Path(game_folder)
+    previous = load_state(game_folder) or {}
+
+    # Cria _toolkit antes da varredura para não alterar o mtime da raiz depois
+    path = state_path(game_folder)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    folders, counts, digest = scan_state(game_folder)
+
+    system_path = find_system_json(game_folder)
+    system_json = None
+    if system_path:
+        system_json = {
+            'path': system_path.relative_to(game_folder).as_posix(),
+            'mtime_ns': system_path.stat().st_mtime_ns,
+        }
+
+    state = {
+        'version': STATE_VERSION,
+        'decryption': {**previous.get('decryption', {}), **decryption},
+        'written': datetime.now().isoformat(timespec='seconds'),
+        'system_json': system_json,
+        'counts': counts,
+        'manifest_digest': digest,
+        'folders': folders,
+    }
+
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+    return state
+
+
+def check_sample(path, ext, size):
+    """Confere tamanho e assinatura de um arquivo sorteado"""
+    try:
+        if path.stat().st_size != size:
+            return False
+        with open(path, 'rb') as f:
+            head = f.read(16)
+    except OSError:
+        return False
+
+    if ext in ENCRYPTED_EXTENSIONS:
+        return head[:5] == b'RPGMV'
+    return signature_ok(ext, head)
+
+
+def verify_state(game_folder, state, encryption_key=None, samples=CHECKED_SAMPLES):
+    """
+    Confirma o estado salvo contra o disco
+    Retorna (motivo, arquivos conferidos) - motivo None quando o estado é válido
+    """
+    game_folder = Path(game_folder)
+
+    system_path = find_system_json(game_folder)
+    system_json = state.get('system_json')
+    if system_path is None or not system_json:
+        return "System.json não confere", 0
+    if system_path.relative_to(game_folder).as_posix() != system_json['path']:
+        return "System.json mudou de lugar", 0
+    if system_path.stat().st_mtime_ns != system_json['mtime_ns']:
+        return "System.json alterado", 0
+
+    saved_key = state.get('decryption', {}).get('encryption_key')
+    if encryption_key and saved_key and saved_key != encryption_key:
+        return "chave diferente", 0
+
+    checked = 0
+    for relative_folder, info in state['folders'].items():
+        folder_path = game_folder / relative_folder if relative_folder else game_folder
+        try:
+            if folder_path.stat().st_mtime_ns != info['mtime_ns']:
+                return f"pasta alterada: {relative_folder or '.'}", checked
+        except OSError:
+            return f"pasta removida: {relative_folder}", checked
+
+        # Amostra estratificada: alguns arquivos de cada extensão da pasta
+        for ext, stored in info['samples'].items():
+            for name in random.sample(sorted(stored), min(samples, len(stored))):
+                checked += 1
+                if not check_sample(folder_path / name, ext, stored[name]):
+                    return f"arquivo alterado: {relative_folder}/{name}", checked
+
+    return None, checked
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("❌ Uso: python estado_jogo.py /caminho/jogo")
+        sys.exit(1)
+
+    game_folder = sys.argv[1]
+
+    if not os.path.isdir(game_folder):
+        print(f"❌ Pasta não encontrada: {game_folder}")
+        sys.exit(1)
+
+    state = load_state(game_folder)
+    if state is None:
+        print("❌ Nenhum estado salvo (execute a descriptografia)")
+        sys.exit(1)
+
+    reason, checked = verify_state(game_folder, state)
+    print(json.dumps({k: v for k, v in state.items() if k != 'folders'}, indent=2, ensure_ascii=False))
+    print(f"\n📂 Pastas: {len(state['folders'])}")
+    print(f"🧪 Amostras conferidas: {checked}")
+    if reason:
+        print(f"⚠️  Estado desatualizado: {reason}")
+    else:
+        print("✅ Estado confere com o disco")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,589 @@
+#!/usr/bin/env python3
+"""
+Grafo de referências de assets do jogo
+
+Lê todos os data/*.json (mapas, eventos comuns, atores, tropas, System...)
+e os parâmetros de js/plugins.js, e registra qual evento, comando ou
+plugin usa cada asset (pictures, faces, BGM, SE, modelos Live2D...).
+
+O grafo fica guardado no catálogo SQLite (tabela refs, indexada pelo asset)
+e é atualizado de forma incremental: só arquivos de dados alterados são
+relidos. As consultas "assets faltando" e "quem usa este asset" são
+respondidas direto do índice.
+"""
+
+import os
+import re
+import sys
+import json
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+from catalogo_assets import AssetCatalog, ENCRYPTED_EXTENSIONS
+
+REFS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ref_sources (
+    path      TEXT PRIMARY KEY,
+    size      INTEGER NOT NULL,
+    mtime_ns  INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS refs (
+    source_file TEXT NOT NULL,
+    source      TEXT NOT NULL,
+    asset       TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_refs_asset ON refs(asset);
+CREATE INDEX IF NOT EXISTS idx_refs_source_file ON refs(source_file);
+CREATE TABLE IF NOT EXISTS name_refs (
+    source_file TEXT NOT NULL,
+    source      TEXT NOT NULL,
+    name        TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_name_refs_source_file ON name_refs(source_file);
+"""
+
+# Versão das regras de extração: ao mudar, todos os arquivos de dados são relidos
+REFS_VERSION = 2
+
+# Extensões removidas ao normalizar um asset (RPG Maker referencia sem extensão)
+MEDIA_EXTENSIONS = ['.png', '.ogg', '.m4a', '.webm', '.mp4', '.efkefc'] + list(ENCRYPTED_EXTENSIONS)
+
+# Campos diretos dos arquivos de banco de dados -> pasta do asset
+DATABASE_FIELDS = {
+    'characterName': 'img/characters',
+    'faceName': 'img/faces',
+    'battlerName': None,  # depende do arquivo (sv_actors / enemies)
+    'parallaxName': 'img/parallaxes',
+    'battleback1Name': 'img/battlebacks1',
+    'battleback2Name': 'img/battlebacks2',
+    'title1Name': 'img/titles1',
+    'title2Name': 'img/titles2',
+    'animation1Name': 'img/animations',
+    'animation2Name': 'img/animations',
+    'effectName': 'effects',
+}
+
+# Campos de áudio ({"name": ...}) -> pasta
+AUDIO_FIELDS = {
+    'bgm': 'audio/bgm',
+    'bgs': 'audio/bgs',
+    'titleBgm': 'audio/bgm',
+    'battleBgm': 'audio/bgm',
+    'victoryMe': 'audio/me',
+    'defeatMe': 'audio/me',
+    'gameoverMe': 'audio/me',
+}
+
+ASSET_PATH_PATTERN = re.compile(r'^(?:img|audio|movies|effects|fonts)/[^\s"\'<>|]+$', re.IGNORECASE)
+LIVE2D_PATTERN = re.compile(r'[^\s"\'<>|]*\.model3\.json', re.IGNORECASE)
+
+# Nome de arquivo sem pasta (parâmetro @type file com @dir): resolvido
+# contra os assets existentes, não vira "asset faltando"
+BARE_NAME_PATTERN = re.compile(r'^[^\s"\'<>|:*?\\{}\[\]][^"\'<>|:*?\\{}\[\]\r\n]{0,199}$')
+NOT_NAMES = {'true', 'false', 'null', 'undefined', 'none'}
+
+# Strings literais de código JS (plugins, comandos Script e rotas com Script)
+STRING_LITERAL = re.compile(r'["\']([^"\'\r\n]{1,200})["\']')
+
+
+def find_www_root(game_folder):
+    """Raiz dos dados do jogo: a própria pasta ou www/ (MV publicado)"""
+    game_folder = Path(game_folder)
+    if not (game_folder / 'data').exists() and (game_folder / 'www' / 'data').exists():
+        return game_folder / 'www'
+    return game_folder
+
+
+def asset_key(path):
+    """Normaliza um caminho de asset: sem extensão de mídia, com '/'"""
+    path = str(path).replace('\\', '/')
+    while path.startswith('./') or path.startswith('/'):
+        path = path[2:] if path.startswith('./') else path[1:]
+    lower = path.lower()
+    for ext in MEDIA_EXTENSIONS:
+        if lower.endswith(ext):
+            return path[:-len(ext)]
+    return path.rstrip('_')
+
+
+def asset_alternatives(asset):
+    """Caminhos que satisfazem uma referência (inimigos: enemies ou sv_enemies)"""
+    if asset.startswith('img/enemies/'):
+        return [asset, 'img/sv_enemies/' + asset[len('img/enemies/'):]]
+    return [asset]
+
+
+def strings_in(value):
+    """Todas as strings de uma estrutura JSON, abrindo JSON aninhado em strings"""
+    if isinstance(value, str):
+        yield value
+        stripped = value.strip()
+        if stripped[:1] in ('{', '[', '"'):
+            try:
+                yield from strings_in(json.loads(stripped))
+            except ValueError:
+                pass
+    elif isinstance(value, dict):
+        for v in value.values():
+            yield from strings_in(v)
+    elif isinstance(value, list):
+        for v in value:
+            yield from strings_in(v)
+
+
+def refs_from_strings(source, value):
+    """Referências por heurística: caminhos img/..., audio/... e modelos Live2D"""
+    refs = []
+    for text in strings_in(value):
+        if ASSET_PATH_PATTERN.match(text):
+            refs.append((source, asset_key(text)))
+        else:
+            for match in LIVE2D_PATTERN.findall(text):
+                refs.append((source, asset_key(match)))
+    return refs
+
+
+def bare_names_from_strings(value):
+    """Strings que podem ser nomes de arquivo sem pasta (Actor1, sub/Actor1, Actor1.png)"""
+    names = set()
+    for text in strings_in(value):
+        text = text.strip()
+        if not BARE_NAME_PATTERN.match(text) or ASSET_PATH_PATTERN.match(text):
+            continue
+        if text.lower() in NOT_NAMES or text.replace('.', '', 1).lstrip('-').isdigit():
+            continue
+        names.add(asset_key(text))
+    return names
+
+
+def refs_from_commands(source, commands):
+    """
+    Referências de uma lista de comandos de evento -> (caminhos, nomes sem pasta)
+
+    Scripts (355/655 e Script na rota de movimento) passam pela mesma
+    heurística dos plugins: os literais do código viram caminhos ou nomes
+    ($gameScreen.showPicture(1, "Boss", ...) protege img/*/Boss).
+    """
+    refs = []
+    names = []
+
+    def add(folder, name):
+        if isinstance(name, str) and name:
+            refs.append((source, f"{folder}/{name}"))
+
+    def audio(folder, param):
+        if isinstance(param, dict):
+            add(folder, param.get('name'))
+
+    def script(text):
+        if isinstance(text, str):
+            literals = STRING_LITERAL.findall(text)
+            refs.extend(refs_from_strings(source, literals))
+            names.extend((source, name) for name in sorted(bare_names_from_strings(literals)))
+
+    for command in commands or []:
+        code = command.get('code')
+        params = command.get('parameters') or []
+
+        if not params:
+            continue
+
+        if code == 101:                     # Mostrar texto (face)
+            add('img/faces', params[0])
+        elif code == 231:                   # Mostrar imagem
+            add('img/pictures', params[1] if len(params) > 1 else None)
+        elif code in (132, 241):            # BGM de batalha / Tocar BGM
+            audio('audio/bgm', params[0])
+        elif code == 245:                   # Tocar BGS
+            audio('audio/bgs', params[0])
+        elif code in (133, 139, 249):       # ME de vitória / derrota / Tocar ME
+            audio('audio/me', params[0])
+        elif code == 250:                   # Tocar SE
+            audio('audio/se', params[0])
+        elif code == 140:                   # BGM de veículo
+            audio('audio/bgm', params[1] if len(params) > 1 else None)
+        elif code == 261:                   # Reproduzir vídeo
+            add('movies', params[0])
+        elif code == 283:                   # Mudar fundo de batalha
+            add('img/battlebacks1', params[0])
+            add('img/battlebacks2', params[1] if len(params) > 1 else None)
+        elif code == 284:                   # Mudar parallax
+            add('img/parallaxes', params[0])
+        elif code == 322:                   # Mudar imagens do ator
+            add('img/characters', params[1] if len(params) > 1 else None)
+            add('img/faces', params[3] if len(params) > 3 else None)
+            add('img/sv_actors', params[5] if len(params) > 5 else None)
+        elif code == 323:                   # Mudar imagem do veículo
+            add('img/characters', params[1] if len(params) > 1 else None)
+        elif code == 205:                   # Rota de movimento
+            route = params[1] if len(params) > 1 and isinstance(params[1], dict) else {}
+            for move in route.get('list', []):
+                move_params = move.get('parameters') or []
+                if move.get('code') == 41 and move_params:      # Mudar imagem
+                    add('img/characters', move_params[0])
+                elif move.get('code') == 44 and move_params:    # Tocar SE
+                    audio('audio/se', move_params[0])
+                elif move.get('code') == 45 and move_params:    # Script
+                    script(move_params[0])
+        elif code in (355, 655):            # Script (primeira linha / continuação)
+            script(params[0])
+        elif code in (356, 357):            # Comando de plugin (MV texto / MZ args)
+            refs.extend(refs_from_strings(source, params))
+
+    return refs, names
+
+
+def refs_from_record(source, record, battler_folder):
+    """Campos diretos de um registro (ator, inimigo, mapa, System...)"""
+    refs = []
+
+    for field, folder in DATABASE_FIELDS.items():
+        name = record.get(field)
+        if field == 'battlerName':
+            folder = battler_folder
+        if folder and isinstance(name, str) and name:
+            refs.append((source, f"{folder}/{name}"))
+
+    for field, folder in AUDIO_FIELDS.items():
+        value = record.get(field)
+        if isinstance(value, dict) and value.get('name'):
+            refs.append((source, f"{folder}/{value['name']}"))
+
+    return refs
+
+
+def extract_data_refs(path, relative):
+    """
+    Extrai as referências de um arquivo data/*.json
+    -> ([(origem, asset)], [(origem, nome sem pasta)])
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    name = Path(relative).stem
+    refs = []
+    names = []
+
+    def commands(source, command_list):
+        command_refs, command_names = refs_from_commands(source, command_list)
+        refs.extend(command_refs)
+        names.extend(command_names)
+
+    if name.startswith('Map') and isinstance(data, dict):
+        refs.extend(refs_from_record(f"{relative}", data, None))
+        for event in data.get('events') or []:
+            if not event:
+                continue
+            for page_index, page in enumerate(event.get('pages') or [], 1):
+                source = f"{relative}#evento {event.get('id')} ({event.get('name', '')}) página {page_index}"
+                image = page.get('image') or {}
+                if image.get('characterName'):
+                    refs.append((source, f"img/characters/{image['characterName']}"))
+                commands(source, page.get('list'))
+
+    elif name == 'System' and isinstance(data, dict):
+        refs.extend(refs_from_record(relative, data, None))
+        for vehicle in ('boat', 'ship', 'airship'):
+            record = data.get(vehicle) or {}
+            refs.extend(refs_from_record(f"{relative}#{vehicle}", record, None))
+        for index, sound in enumerate(data.get('sounds') or []):
+            if isinstance(sound, dict) and sound.get('name'):
+                refs.append((f"{relative}#sounds[{index}]", f"audio/se/{sound['name']}"))
+
+    elif isinstance(data, list):
+        battler_folder = 'img/sv_actors' if name == 'Actors' else None
+        if name == 'Enemies':
+            battler_folder = 'img/enemies'
+
+        for record in data:
+            if not isinstance(record, dict):
+                continue
+            source = f"{relative}#{record.get('id')} ({record.get('name', '')})"
+            refs.extend(refs_from_record(source, record, battler_folder))
+
+            for tileset in record.get('tilesetNames') or []:    # Tilesets
+                if isinstance(tileset, str) and tileset:
+                    refs.append((source, f"img/tilesets/{tileset}"))
+            for timing in record.get('timings') or []:          # Animações (SE)
+                se = timing.get('se') if isinstance(timing, dict) else None
+                if isinstance(se, dict) and se.get('name'):
+                    refs.append((source, f"audio/se/{se['name']}"))
+
+            if 'list' in record:                        # Eventos comuns
+                commands(source, record.get('list'))
+            for page_index, page in enumerate(record.get('pages') or [], 1):
+                if isinstance(page, dict):              # Tropas
+                    commands(f"{source} página {page_index}", page.get('list'))
+
+    return [(source, asset_key(asset)) for source, asset in refs], names
+
+
+def load_plugins(path):
+    """Plugins ativos de js/plugins.js -> [(nome, parâmetros)]"""
+    with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+        content = f.read()
+
+    start = content.find('[')
+    end = content.rfind(']')
+    if start < 0 or end < start:
+        return []
+
+    return [
+        (plugin.get('name', ''), plugin.get('parameters') or {})
+        for plugin in json.loads(content[start:end + 1])
+        if isinstance(plugin, dict) and plugin.get('status', True)
+    ]
+
+
+def extract_plugin_refs(path, relative):
+    """
+    Extrai referências dos parâmetros de js/plugins.js
+    -> (caminhos completos, nomes sem pasta)
+
+    Parâmetros @type file guardam só o nome (a pasta vem do @dir, que não
+    fica no plugins.js): esses nomes são resolvidos depois, pelo nome,
+    contra os assets que existem.
+    """
+    refs = []
+    names = []
+    for name, parameters in load_plugins(path):
+        source = f"{relative}#{name}"
+        refs.extend(refs_from_strings(source, parameters))
+        names.extend((source, bare) for bare in sorted(bare_names_from_strings(parameters)))
+
+    return refs, names
+
+
+def extract_refs(args):
+    """Worker do pool: (caminho, relativo) -> (relativo, referências, nomes sem pasta, erro)"""
+    path, relative = args
+    try:
+        if relative.endswith('plugins.js'):
+            refs, names = extract_plugin_refs(path, relative)
+            return relative, refs, names, None
+        refs, names = extract_data_refs(path, relative)
+        return relative, refs, names, None
+    except (OSError, ValueError) as e:
+        return relative, [], [], str(e)
+
+
+class ReferenceGraph:
+    def __init__(self, game_folder):
+        self.game_folder = Path(game_folder)
+        self.www_root = find_www_root(game_folder)
+        self.prefix = os.path.relpath(self.www_root, self.game_folder).replace(os.sep, '/')
+        self.prefix = '' if self.prefix == '.' else self.prefix + '/'
+
+        self.catalog = AssetCatalog(game_folder)
+        self.conn = self.catalog.conn
+        self.conn.executescript(REFS_SCHEMA)
+        if self.conn.execute("PRAGMA user_version").fetchone()[0] < REFS_VERSION:
+            # Grafo de regras antigas (sem nomes sem pasta / scripts): relê tudo uma vez
+            with self.conn:
+                self.conn.execute("DELETE FROM ref_sources")
+            self.conn.execute(f"PRAGMA user_version = {REFS_VERSION}")
+        self.errors = []
+
+    def close(self):
+        self.catalog.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def source_files(self):
+        """Arquivos de dados e plugins.js -> {relativo: stat}"""
+        sources = {}
+        data_folder = self.www_root / 'data'
+        candidates = sorted(data_folder.glob('*.json')) if data_folder.exists() else []
+        candidates.append(self.www_root / 'js' / 'plugins.js')
+
+        for path in candidates:
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            relative = path.relative_to(self.game_folder).as_posix()
+            sources[relative] = st
+
+        return sources
+
+    def update(self, workers=None):
+        """
+        Atualização incremental do grafo (e do catálogo)
+        Retorna o número de arquivos de dados relidos
+        """
+        self.catalog.update()
+
+        known = {
+            row['path']: (row['size'], row['mtime_ns'])
+            for row in self.catalog.query("SELECT path, size, mtime_ns FROM ref_sources")
+        }
+        sources = self.source_files()
+
+        changed = [
+            (str(self.game_folder / relative), relative)
+            for relative, st in sources.items()
+            if known.get(relative) != (st.st_size, st.st_mtime_ns)
+        ]
+        removed = [(relative,) for relative in known if relative not in sources]
+
+        if len(changed) > 4:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(extract_refs, changed, chunksize=4))
+        else:
+            results = [extract_refs(item) for item in changed]
+
+        self.errors = [(relative, error) for relative, _, _, error in results if error]
+
+        with self.conn:
+            for relative, refs, names, error in results:
+                self.conn.execute("DELETE FROM refs WHERE source_file = ?", (relative,))
+                self.conn.execute("DELETE FROM name_refs WHERE source_file = ?", (relative,))
+                self.conn.executemany(
+                    "INSERT INTO refs VALUES (?, ?, ?)",
+                    [(relative, source, asset) for source, asset in set(refs)]
+                )
+                self.conn.executemany(
+                    "INSERT INTO name_refs VALUES (?, ?, ?)",
+                    [(relative, source, name) for source, name in names]
+                )
+                if error:
+                    continue
+                st = sources[relative]
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO ref_sources VALUES (?, ?, ?)",
+                    (relative, st.st_size, st.st_mtime_ns)
+                )
+            self.conn.executemany("DELETE FROM refs WHERE source_file = ?", removed)
+            self.conn.executemany("DELETE FROM name_refs WHERE source_file = ?", removed)
+            self.conn.executemany("DELETE FROM ref_sources WHERE path = ?", removed)
+
+        return len(changed)
+
+    def existing_assets(self):
+        """Chaves de todos os assets presentes no disco (criptografados ou não)"""
+        keys = set()
+        for row in self.catalog.query("SELECT path FROM assets"):
+            path = row['path']
+            if self.prefix and path.startswith(self.prefix):
+                path = path[len(self.prefix):]
+            keys.add(asset_key(path))
+        return keys
+
+    def name_references(self, existing=None):
+        """
+        Nomes sem pasta (parâmetros de plugin e literais de scripts) resolvidos
+        contra os assets existentes -> {asset: [(arquivo, origem)]}
+
+        'Actor1' casa com qualquer img/*/Actor1; 'sub/Actor1' só com assets
+        terminados em /sub/Actor1. Nomes que não casam com nada são ignorados.
+        """
+        if existing is None:
+            existing = self.existing_assets()
+
+        by_name = {}
+        for key in existing:
+            by_name.setdefault(key.rsplit('/', 1)[-1], []).append(key)
+
+        resolved = {}
+        for row in self.catalog.query("SELECT source_file, source, name FROM name_refs"):
+            name = row['name']
+            candidates = by_name.get(name.rsplit('/', 1)[-1], [])
+            if '/' in name:
+                candidates = [key for key in candidates if key.endswith('/' + name)]
+            for key in candidates:
+                resolved.setdefault(key, []).append((row['source_file'], row['source']))
+        return resolved
+
+    def referenced_assets(self):
+        referenced = {row['asset'] for row in self.catalog.query("SELECT DISTINCT asset FROM refs")}
+        return referenced | set(self.name_references())
+
+    def users_of(self, asset):
+        """Quem usa este asset -> [(arquivo, origem)]"""
+        key = asset_key(asset)
+        users = [
+            (row['source_file'], row['source'])
+            for row in self.catalog.query(
+                "SELECT source_file, source FROM refs WHERE asset = ? ORDER BY source_file, source",
+                (key,)
+            )
+        ]
+        return users + sorted(self.name_references().get(key, []))
+
+    def missing_assets(self):
+        """Assets referenciados que não existem no disco -> {asset: [origens]}"""
+        existing = self.existing_assets()
+        missing = {}
+        for row in self.catalog.query("SELECT asset, source FROM refs ORDER BY asset"):
+            if not any(a in existing for a in asset_alternatives(row['asset'])):
+                missing.setdefault(row['asset'], []).append(row['source'])
+        return missing
+
+
+def main():
+    options = [a for a in sys.argv[1:] if a.startswith('--')]
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+
+    if not args:
+        print("❌ Uso: python grafo_referencias.py /caminho/jogo [--quem-usa=img/pictures/Nome]")
+        sys.exit(1)
+
+    game_folder = args[0]
+
+    if not os.path.isdir(game_folder):
+        print(f"❌ Pasta não encontrada: {game_folder}")
+        sys.exit(1)
+
+    who_uses = None
+    for option in options:
+        if option.startswith('--quem-usa='):
+            who_uses = option.split('=', 1)[1]
+
+    print("="*70)
+    print("  GRAFO DE REFERÊNCIAS DE ASSETS")
+    print("="*70)
+    print(f"\n📁 Jogo: {game_folder}")
+
+    import time
+    start_time = time.time()
+
+    with ReferenceGraph(game_folder) as graph:
+        reparsed = graph.update()
+        elapsed = time.time() - start_time
+
+        print(f"\n🔄 Arquivos de dados relidos: {reparsed} ({elapsed:.2f}s)")
+        for relative, error in graph.errors:
+            print(f"   ⚠️  {relative}: {error}")
+
+        referenced = graph.referenced_assets()
+        print(f"🔗 Assets referenciados: {len(referenced)}")
+
+        if who_uses:
+            users = graph.users_of(who_uses)
+            print(f"\n🔍 Quem usa {who_uses}: {len(users)}")
+            for source_file, source in users:
+                print(f"   - {source}")
+        else:
+            missing = graph.missing_assets()
+            if missing:
+                print(f"\n❌ Assets faltando: {len(missing)}")
+                for asset, sources in list(missing.items())[:30]:
+                    print(f"   - {asset}")
+                    for source in sources[:3]:
+                        print(f"        ← {source}")
+                    if len(sources) > 3:
+                        print(f"        ... e mais {len(sources)-3} referências")
+                if len(missing) > 30:
+                    print(f"   ... e mais {len(missing)-30} assets")
+            else:
+                print(f"\n✅ Nenhum asset faltando!")
+
+    print(f"\n{'='*70}")
+
+
+if __name__ == "__main__":
+    main()
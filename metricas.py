@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Métricas de desempenho dos motores de descriptografia
+
+Cada fase (chave, descoberta, leitura, XOR, assinatura, escrita,
+verificação, System.json...) acumula tempo, chamadas, bytes e um
+histograma de latência em potências de 2 (microssegundos). No final dá
+para ver se a execução está presa em I/O (/sdcard) ou em CPU (Python).
+
+Uso nos motores:
+    metrics.record('leitura', segundos, nbytes)
+    with metrics.phase('descoberta'): ...
+    metrics.count('arquivos')
+
+--profile roda tudo dentro do cProfile e salva o .prof em _toolkit/.
+"""
+
+import json
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+# Fases por arquivo: I/O x CPU
+IO_PHASES = ('leitura', 'escrita', 'verificacao')
+CPU_PHASES = ('xor', 'assinatura')
+
+PROFILE_NAME = 'perfil.prof'
+
+
+def bucket_label(bucket):
+    """Rótulo do balde do histograma (limite superior)"""
+    limit = 1 << bucket
+    if limit < 1000:
+        return f"<={limit}us"
+    if limit < 1000000:
+        return f"<={limit / 1000:g}ms"
+    return f"<={limit / 1000000:g}s"
+
+
+class Metrics:
+    def __init__(self):
+        self.phases = {}
+        self.counters = {}
+        self.started = time.perf_counter()
+
+    def record(self, name, seconds, nbytes=0):
+        phase = self.phases.get(name)
+        if phase is None:
+            phase = self.phases[name] = {'seconds': 0.0, 'calls': 0, 'bytes': 0, 'histogram': {}}
+
+        phase['seconds'] += seconds
+        phase['calls'] += 1
+        phase['bytes'] += nbytes
+
+        bucket = int(seconds * 1000000).bit_length()
+        phase['histogram'][bucket] = phase['histogram'].get(bucket, 0) + 1
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def bottleneck(self):
+        """'I/O', 'CPU' ou None, comparando as fases por arquivo"""
+        io = sum(self.phases[p]['seconds'] for p in IO_PHASES if p in self.phases)
+        cpu = sum(self.phases[p]['seconds'] for p in CPU_PHASES if p in self.phases)
+        if not io and not cpu:
+            return None
+        return 'I/O' if io >= cpu else 'CPU'
+
+    def to_dict(self):
+        phases = {}
+        for name, phase in self.phases.items():
+            seconds = phase['seconds']
+            phases[name] = {
+                'seconds': round(seconds, 6),
+                'calls': phase['calls'],
+                'bytes': phase['bytes'],
+                'mb_per_s': round(phase['bytes'] / seconds / 1024 / 1024, 2) if seconds and phase['bytes'] else None,
+                'histogram': {
+                    bucket_label(b): n for b, n in sorted(phase['histogram'].items())
+                },
+            }
+
+        return {
+            'total_seconds': round(time.perf_counter() - self.started, 6),
+            'bottleneck': self.bottleneck(),
+            'counters': dict(self.counters),
+            'phases': phases,
+        }
+
+    def dump_json(self, path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+
+    def report(self):
+        data = self.to_dict()
+
+        print("\n" + "="*70)
+        print("📈 MÉTRICAS POR FASE")
+        print("="*70)
+        print(f"   {'fase':14s} {'tempo':>10s} {'chamadas':>9s} {'MB':>9s} {'MB/s':>8s}  latência mais comum")
+
+        for name, phase in data['phases'].items():
+            mb = phase['bytes'] / 1024 / 1024
+            speed = f"{phase['mb_per_s']:8.1f}" if phase['mb_per_s'] else f"{'-':>8s}"
+            common = max(phase['histogram'].items(), key=lambda x: x[1])[0] if phase['histogram'] else '-'
+            print(f"   {name:14s} {phase['seconds']:9.3f}s {phase['calls']:9d} {mb:9.1f} {speed}  {common}")
+
+        for name, value in data['counters'].items():
+            print(f"   #{name}: {value}")
+
+        print(f"\n⏱️  Total: {data['total_seconds']:.2f}s")
+        if data['bottleneck']:
+            print(f"🔎 Gargalo provável: {data['bottleneck']}")
+
+
+def run_profiled(func, output_path, top=20):
+    """Executa func() dentro do cProfile, salva o .prof e mostra as funções mais caras"""
+    import cProfile
+    import pstats
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        return func()
+    finally:
+        profiler.disable()
+
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        profiler.dump_stats(str(output_path))
+
+        print("\n" + "="*70)
+        print(f"🧪 cProfile ({top} funções por tempo acumulado)")
+        print("="*70)
+        pstats.Stats(profiler).sort_stats('cumulative').print_stats(top)
+        print(f"💾 Perfil salvo em: {output_path}")
+        print(f"💡 Abra com: python -m pstats {output_path}")
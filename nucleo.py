@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Núcleo compartilhado do formato RPG Maker MV/MZ
+
+Constantes e operações que os motores (rpgmaker_decrypter_FINAL.py,
+decrypt_all_in_one.py), a restauração de Live2D, o estado do jogo e o
+rpgmtk.py usam igual: extensões, header RPGMV, assinaturas, System.json,
+chave e o XOR dos 16 bytes.
+
+Só depende da biblioteca padrão leve (os, json, pathlib): importar este
+módulo não pode pesar no tempo de início do rpgmtk.py status.
+"""
+
+import os
+import json
+from pathlib import Path
+
+# Pasta do toolkit dentro do jogo (catálogo, caches, estados)
+TOOLKIT_DIR = '_toolkit'
+
+# Pastas do próprio toolkit (backup, quarentena, dados): não são o jogo em uso
+TOOLKIT_FOLDERS = ['_backup_encrypted', '_quarentena', TOOLKIT_DIR]
+
+# Extensão criptografada -> extensão original
+ENCRYPTED_EXTENSIONS = {
+    '.rpgmvp': '.png',
+    '.png_': '.png',
+    '.rpgmvo': '.ogg',
+    '.ogg_': '.ogg',
+    '.rpgmvm': '.m4a',
+    '.m4a_': '.m4a',
+}
+
+# Header RPGMV padrão (16 bytes)
+STANDARD_HEADER = bytes.fromhex("5250474d560000000003010000000000")
+
+# Assinaturas dos arquivos descriptografados (m4a: 'ftyp' nos bytes 4-7)
+SIGNATURES = {
+    '.png': b'\x89\x50\x4E\x47\x0D\x0A\x1A\x0A',
+    '.ogg': b'OggS',
+    '.m4a': b'ftyp',
+}
+
+
+def file_extension(name):
+    """Extensão em minúsculas (inclui as variantes criptografadas com '_')"""
+    return os.path.splitext(name)[1].lower()
+
+
+def system_json_paths(game_folder):
+    """Onde o System.json pode estar (MZ/MV desktop e MV com www/)"""
+    game_folder = Path(game_folder)
+    return [
+        game_folder / 'data' / 'System.json',
+        game_folder / 'www' / 'data' / 'System.json',
+    ]
+
+
+def find_system_json(game_folder):
+    for system_path in system_json_paths(game_folder):
+        if system_path.exists():
+            return system_path
+    return None
+
+
+def read_system_json(game_folder):
+    """-> (caminho, conteúdo) do primeiro System.json legível, ou (None, None)"""
+    for system_path in system_json_paths(game_folder):
+        if system_path.exists():
+            try:
+                with open(system_path, 'r', encoding='utf-8') as f:
+                    return system_path, json.load(f)
+            except (OSError, ValueError):
+                continue
+    return None, None
+
+
+def read_encryption_key(game_folder):
+    """encryptionKey do System.json ('' se não houver)"""
+    _, system_data = read_system_json(game_folder)
+    return (system_data or {}).get('encryptionKey', '')
+
+
+def signature_ok(output_ext, data):
+    """Confere a assinatura do arquivo descriptografado (extensão sem assinatura: ok)"""
+    signature = SIGNATURES.get(output_ext)
+    if output_ext == '.m4a':
+        # A caixa ftyp pode ter tamanhos diferentes de 0x20
+        return data[4:8] == signature
+    return signature is None or data.startswith(signature)
+
+
+def xor_header(data, key_bytes, offset=16):
+    """
+    Descriptografa (ou criptografa, é o mesmo XOR) os 16 bytes em offset
+    e devolve o arquivo sem o que vem antes deles
+    offset 16: header RPGMV + bytes 16-31 (padrão MV/MZ)
+    offset 0:  sem header, bytes 0-15
+    """
+    block = data[offset:offset + 16]
+    return bytes(a ^ b for a, b in zip(block, key_bytes)) + data[offset + 16:]
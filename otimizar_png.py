@@ -0,0 +1,395 @@
+#!/usr/bin/env python3
+"""
+Re-otimização sem perdas dos PNGs descriptografados
+
+Os PNGs que saem da descriptografia costumam ser exportações mal comprimidas.
+Este estágio (opcional) recomprime cada PNG em um pool de processos:
+  - busca do filtro de linha (None/Sub/Up/Average/Paeth/adaptativo)
+  - busca do nível/estratégia do zlib
+  - remove chunks auxiliares de metadados (texto, data, pHYs...)
+
+Os pixels continuam idênticos bit a bit: o resultado é descomprimido e
+comparado com o original antes de substituir o arquivo. Os chunks que
+afetam a aparência (tRNS, gAMA, cHRM, sRGB, iCCP, sBIT) são mantidos.
+
+Os hashes dos arquivos já otimizados ficam em _toolkit/png_cache.json,
+então execuções seguintes pulam tudo o que já foi processado.
+"""
+
+import os
+import sys
+import json
+import zlib
+import struct
+import hashlib
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+from catalogo_assets import TOOLKIT_DIR
+
+PNG_SIGNATURE = b'\x89\x50\x4E\x47\x0D\x0A\x1A\x0A'
+CACHE_NAME = 'png_cache.json'
+
+# Chunks mantidos além de IHDR/IDAT/IEND (alteram a imagem exibida)
+KEPT_CHUNKS = [b'PLTE', b'tRNS', b'gAMA', b'cHRM', b'sRGB', b'iCCP', b'sBIT']
+
+# Chunks de APNG: arquivo ignorado (quadros extras dependem da ordem)
+ANIMATION_CHUNKS = [b'acTL', b'fcTL', b'fdAT']
+
+CHANNELS = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}
+
+ZLIB_STRATEGIES = [zlib.Z_DEFAULT_STRATEGY, zlib.Z_FILTERED, zlib.Z_RLE]
+
+# Acima deste tamanho (pixels descomprimidos) só o zlib é re-otimizado:
+# a busca de filtros em Python puro ficaria lenta demais
+MAX_FILTER_BYTES = 4 * 1024 * 1024
+
+# Tabela para a heurística de soma dos valores absolutos (byte com sinal)
+ABS_TABLE = bytes(min(b, 256 - b) for b in range(256))
+
+
+def read_chunks(data):
+    """Lista de (tipo, conteúdo) dos chunks do PNG"""
+    chunks = []
+    pos = len(PNG_SIGNATURE)
+    while pos + 8 <= len(data):
+        length, chunk_type = struct.unpack('>I4s', data[pos:pos + 8])
+        chunks.append((chunk_type, data[pos + 8:pos + 8 + length]))
+        pos += 12 + length
+        if chunk_type == b'IEND':
+            break
+    return chunks
+
+
+def make_chunk(chunk_type, content):
+    crc = zlib.crc32(chunk_type + content) & 0xFFFFFFFF
+    return struct.pack('>I', len(content)) + chunk_type + content + struct.pack('>I', crc)
+
+
+def paeth(a, b, c):
+    p = a + b - c
+    pa, pb, pc = abs(p - a), abs(p - b), abs(p - c)
+    if pa <= pb and pa <= pc:
+        return a
+    if pb <= pc:
+        return b
+    return c
+
+
+def unfilter(data, row_bytes, bpp, height):
+    """Desfaz os filtros de linha -> pixels brutos (sem o byte de filtro)"""
+    raw = bytearray(row_bytes * height)
+    prev = bytearray(row_bytes)
+    pos = 0
+
+    for y in range(height):
+        filter_type = data[pos]
+        row = bytearray(data[pos + 1:pos + 1 + row_bytes])
+        pos += 1 + row_bytes
+
+        if filter_type == 1:
+            for i in range(bpp, row_bytes):
+                row[i] = (row[i] + row[i - bpp]) & 0xFF
+        elif filter_type == 2:
+            row = bytearray((a + b) & 0xFF for a, b in zip(row, prev))
+        elif filter_type == 3:
+            for i in range(row_bytes):
+                left = row[i - bpp] if i >= bpp else 0
+                row[i] = (row[i] + ((left + prev[i]) >> 1)) & 0xFF
+        elif filter_type == 4:
+            for i in range(row_bytes):
+                left = row[i - bpp] if i >= bpp else 0
+                upper_left = prev[i - bpp] if i >= bpp else 0
+                row[i] = (row[i] + paeth(left, prev[i], upper_left)) & 0xFF
+        elif filter_type != 0:
+            raise ValueError(f"Filtro PNG inválido: {filter_type}")
+
+        raw[y * row_bytes:(y + 1) * row_bytes] = row
+        prev = row
+
+    return bytes(raw)
+
+
+class RowFilter:
+    """Filtros de linha com aritmética byte a byte em inteiros grandes (SWAR)"""
+
+    def __init__(self, row_bytes, bpp):
+        self.row_bytes = row_bytes
+        self.shift = 8 * bpp
+        self.bpp = bpp
+        self.mask = (1 << (8 * row_bytes)) - 1
+        self.high = int.from_bytes(b'\x80' * row_bytes, 'big')
+        self.low = self.mask ^ self.high
+
+    def to_bytes(self, value):
+        return value.to_bytes(self.row_bytes, 'big')
+
+    def sub(self, x, y):
+        """(x - y) mod 256 em cada byte"""
+        return ((x | self.high) - (y & self.low)) ^ ((x ^ ~y) & self.high) & self.mask
+
+    def average(self, x, y):
+        """floor((x + y) / 2) em cada byte"""
+        return (x & y) + (((x ^ y) >> 1) & self.low)
+
+    def filter_row(self, filter_type, row, prev):
+        if filter_type == 0:
+            return row
+
+        x = int.from_bytes(row, 'big')
+        left = x >> self.shift
+
+        if filter_type == 1:
+            return self.to_bytes(self.sub(x, left))
+
+        up = int.from_bytes(prev, 'big')
+        if filter_type == 2:
+            return self.to_bytes(self.sub(x, up))
+        if filter_type == 3:
+            return self.to_bytes(self.sub(x, self.average(left, up)))
+
+        bpp = self.bpp
+        out = bytearray(row)
+        for i in range(len(row)):
+            a = row[i - bpp] if i >= bpp else 0
+            c = prev[i - bpp] if i >= bpp else 0
+            out[i] = (row[i] - paeth(a, prev[i], c)) & 0xFF
+        return bytes(out)
+
+
+def refilter(raw, row_bytes, bpp, height, strategy):
+    """Aplica um filtro fixo (0-4) ou o adaptativo ('adaptive') a todas as linhas"""
+    rf = RowFilter(row_bytes, bpp)
+    prev = bytes(row_bytes)
+    out = bytearray()
+
+    for y in range(height):
+        row = raw[y * row_bytes:(y + 1) * row_bytes]
+
+        if strategy == 'adaptive':
+            best = None
+            for filter_type in range(5):
+                candidate = rf.filter_row(filter_type, row, prev)
+                score = sum(candidate.translate(ABS_TABLE))
+                if best is None or score < best[0]:
+                    best = (score, filter_type, candidate)
+            _, filter_type, filtered = best
+        else:
+            filter_type = strategy
+            filtered = rf.filter_row(filter_type, row, prev)
+
+        out.append(filter_type)
+        out += filtered
+        prev = row
+
+    return bytes(out)
+
+
+def compress(data, strategy=zlib.Z_DEFAULT_STRATEGY):
+    compressor = zlib.compressobj(9, zlib.DEFLATED, 15, 9, strategy)
+    return compressor.compress(data) + compressor.flush()
+
+
+def optimize_png_bytes(data, max_filter_bytes=MAX_FILTER_BYTES):
+    """
+    Recomprime um PNG sem perdas
+    Retorna os novos bytes, ou None se não for possível / não compensar
+    """
+    if not data.startswith(PNG_SIGNATURE):
+        return None
+
+    chunks = read_chunks(data)
+    if not chunks or chunks[0][0] != b'IHDR':
+        return None
+    if any(chunk_type in ANIMATION_CHUNKS for chunk_type, _ in chunks):
+        return None
+
+    width, height, depth, color_type, _, _, interlace = struct.unpack('>IIBBBBB', chunks[0][1])
+    if color_type not in CHANNELS:
+        return None
+
+    bits_per_pixel = CHANNELS[color_type] * depth
+    bpp = max(1, bits_per_pixel // 8)
+    row_bytes = (width * bits_per_pixel + 7) // 8
+
+    filtered = zlib.decompress(b''.join(content for chunk_type, content in chunks if chunk_type == b'IDAT'))
+
+    # Candidatos: o fluxo filtrado original e, se viável, novos filtros
+    candidates = [filtered]
+    raw = None
+    if not interlace and row_bytes * height <= max_filter_bytes and len(filtered) == (row_bytes + 1) * height:
+        raw = unfilter(filtered, row_bytes, bpp, height)
+        for strategy in (0, 1, 2, 3, 4, 'adaptive'):
+            candidates.append(refilter(raw, row_bytes, bpp, height, strategy))
+
+    best_stream = None
+    best_idat = None
+    for stream in candidates:
+        idat = compress(stream)
+        if best_idat is None or len(idat) < len(best_idat):
+            best_stream, best_idat = stream, idat
+
+    for strategy in ZLIB_STRATEGIES[1:]:
+        idat = compress(best_stream, strategy)
+        if len(idat) < len(best_idat):
+            best_idat = idat
+
+    output = bytearray(PNG_SIGNATURE)
+    output += make_chunk(b'IHDR', chunks[0][1])
+    for chunk_type, content in chunks[1:]:
+        if chunk_type in KEPT_CHUNKS:
+            output += make_chunk(chunk_type, content)
+    output += make_chunk(b'IDAT', best_idat)
+    output += make_chunk(b'IEND', b'')
+
+    if len(output) >= len(data):
+        return None
+
+    # Confere que os pixels continuam idênticos
+    check = zlib.decompress(best_idat)
+    if raw is not None:
+        if unfilter(check, row_bytes, bpp, height) != raw:
+            return None
+    elif check != filtered:
+        return None
+
+    return bytes(output)
+
+
+# Hashes já otimizados; cada worker recebe o conjunto uma vez no initializer
+done_hashes = set()
+
+
+def init_worker(hashes):
+    global done_hashes
+    done_hashes = hashes
+
+
+def optimize_file(path):
+    """Worker do pool: caminho -> resultado"""
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+
+        digest = hashlib.sha256(data).hexdigest()
+        if digest in done_hashes:
+            return path, len(data), len(data), 'cache', [digest]
+
+        optimized = optimize_png_bytes(data)
+        if optimized is None:
+            return path, len(data), len(data), 'mantido', [digest]
+
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(optimized)
+        os.replace(tmp_path, path)
+
+        return path, len(data), len(optimized), 'otimizado', [digest, hashlib.sha256(optimized).hexdigest()]
+    except Exception as e:
+        return path, 0, 0, f"erro: {e}", []
+
+
+def load_cache(game_folder):
+    cache_path = Path(game_folder) / TOOLKIT_DIR / CACHE_NAME
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            return set(json.load(f))
+    except (OSError, ValueError):
+        return set()
+
+
+def save_cache(game_folder, hashes):
+    cache_path = Path(game_folder) / TOOLKIT_DIR / CACHE_NAME
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(cache_path, 'w', encoding='utf-8') as f:
+        json.dump(sorted(hashes), f)
+
+
+def optimize_pngs(game_folder, png_files, workers=None):
+    """
+    Otimiza a lista de PNGs em paralelo
+    Retorna (otimizados, bytes antes, bytes depois)
+    """
+    png_files = [str(p) for p in png_files]
+    if not png_files:
+        return 0, 0, 0
+
+    cached = load_cache(game_folder)
+
+    print(f"\n🗜️  Otimizando {len(png_files)} PNGs (sem perdas)...")
+
+    optimized = 0
+    before = 0
+    after = 0
+    skipped = 0
+
+    # Todos os hashes (processados, otimizados e mantidos) vão para o cache
+    new_hashes = set()
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(cached,)) as pool:
+        for i, (path, old_size, new_size, status, hashes) in enumerate(pool.map(optimize_file, png_files, chunksize=8), 1):
+            new_hashes.update(hashes)
+            before += old_size
+            after += new_size
+
+            if status == 'otimizado':
+                optimized += 1
+            elif status == 'cache':
+                skipped += 1
+            elif status.startswith('erro'):
+                print(f"   ❌ {Path(path).name}: {status}")
+
+            if i % 50 == 0:
+                print(f"   ⏳ Progresso: {i}/{len(png_files)}")
+
+    save_cache(game_folder, cached | new_hashes)
+
+    saved = before - after
+    print(f"   ✅ Otimizados: {optimized} | Já processados: {skipped}")
+    print(f"   💾 Economia: {saved:,} bytes ({saved / 1024 / 1024:.1f} MB)")
+
+    return optimized, before, after
+
+
+def main():
+    options = [a for a in sys.argv[1:] if a.startswith('--')]
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+
+    if not args:
+        print("❌ Uso: python otimizar_png.py /caminho/jogo [--todos]")
+        print("\nPor padrão só os PNGs gerados pela descriptografia são otimizados.")
+        print("Use --todos para otimizar todos os PNGs de img/.")
+        sys.exit(1)
+
+    game_folder = Path(args[0])
+
+    if not game_folder.is_dir():
+        print(f"❌ Pasta não encontrada: {game_folder}")
+        sys.exit(1)
+
+    print("="*70)
+    print("  OTIMIZAÇÃO DE PNG SEM PERDAS")
+    print("="*70)
+    print(f"\n📁 Jogo: {game_folder}")
+
+    if '--todos' in options:
+        png_files = [
+            path for folder in (game_folder / 'img', game_folder / 'www' / 'img') if folder.exists()
+            for path in folder.rglob('*.png')
+        ]
+    else:
+        from rpgmaker_decrypter_FINAL import RPGMakerDecrypter
+        decrypter = RPGMakerDecrypter(game_folder)
+        png_files = [p for p in decrypter.find_decrypted_outputs() if p.suffix == '.png']
+
+    if not png_files:
+        print("\n⚠️  Nenhum PNG encontrado")
+        sys.exit(0)
+
+    optimize_pngs(game_folder, png_files)
+
+    print(f"\n{'='*70}")
+
+
+if __name__ == "__main__":
+    main()
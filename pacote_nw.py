@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Jogos empacotados: package.nw, ZIP ou ZIP anexado ao Game.exe
+
+Muitas distribuições MV/MZ não têm www/ solto no disco: o nw.js lê tudo
+de um package.nw (um ZIP), de um .zip ou de um ZIP colado no fim do
+Game.exe (copy /b nw.exe+package.nw Game.exe). Em vez de extrair tudo
+para depois descriptografar:
+  1. procura o fim do diretório central do ZIP (EOCD) nos últimos 64 KB
+     do arquivo - funciona também dentro do .exe
+  2. lê o data/System.json (ou www/data/System.json) do próprio ZIP
+  3. descriptografa cada membro criptografado direto para a pasta de
+     saída; só a saída é gravada
+
+O ContainerDecrypter é o RPGMakerDecrypter lendo as origens do ZIP: perfis
+por pasta, --plan, --chave=, --offset=, lista de falhas e métricas
+funcionam igual. Com --espelhar os outros membros (js/, data/, fontes...)
+também são copiados e a saída vira o jogo completo.
+"""
+
+import os
+import json
+import shutil
+from pathlib import Path, PurePosixPath
+
+from rpgmaker_decrypter_FINAL import RPGMakerDecrypter
+
+# Fim do diretório central: assinatura + 18 bytes + comentário (até 64 KB)
+EOCD_SIGNATURE = b'PK\x05\x06'
+EOCD_SIZE = 22
+MAX_COMMENT = 0xFFFF
+
+# Onde o System.json fica dentro do pacote (MZ/MV e MV com www/)
+SYSTEM_MEMBERS = ('data/System.json', 'www/data/System.json')
+
+SEARCH_FOLDERS = ('img', 'audio', 'movies')
+CONTAINER_SUFFIXES = ('.nw', '.zip', '.exe')
+
+
+def find_eocd(path):
+    """Posição do EOCD no arquivo (ZIP puro ou anexado a um .exe) ou None"""
+    try:
+        with open(path, 'rb') as f:
+            size = f.seek(0, os.SEEK_END)
+            tail_size = min(size, EOCD_SIZE + MAX_COMMENT)
+            f.seek(size - tail_size)
+            tail = f.read(tail_size)
+    except OSError:
+        return None
+
+    # De trás para frente: o comprimento do comentário precisa fechar com o fim
+    position = tail.rfind(EOCD_SIGNATURE)
+    while position >= 0:
+        if position + EOCD_SIZE <= len(tail):
+            comment_length = int.from_bytes(tail[position + 20:position + 22], 'little')
+            if position + EOCD_SIZE + comment_length == len(tail):
+                return size - tail_size + position
+        position = tail.rfind(EOCD_SIGNATURE, 0, position)
+    return None
+
+
+def safe_member(name):
+    """Membro que cabe na pasta de saída (sem caminho absoluto nem '..')"""
+    path = PurePosixPath(name)
+    return not path.is_absolute() and '..' not in path.parts and not name.endswith('/')
+
+
+class GameContainer:
+    """ZIP do jogo aberto no lugar; o zipfile acha o início mesmo com o .exe na frente"""
+
+    def __init__(self, path):
+        import zipfile
+
+        self.path = Path(path)
+        self.zip = zipfile.ZipFile(self.path)
+        self.infos = {info.filename: info for info in self.zip.infolist()}
+
+        self.system_member = next((name for name in SYSTEM_MEMBERS if name in self.infos), None)
+        # Raiz do jogo dentro do pacote: '' ou 'www/'
+        self.root = self.system_member[:-len('data/System.json')] if self.system_member else ''
+
+    def read(self, name, size=-1):
+        with self.zip.open(self.infos[name]) as f:
+            return f.read(size)
+
+    def read_system_json(self):
+        if self.system_member is None:
+            return None
+        return json.loads(self.read(self.system_member).decode('utf-8-sig'))
+
+    def close(self):
+        self.zip.close()
+
+
+def open_container(path):
+    """GameContainer se o arquivo for um ZIP com System.json, senão None"""
+    import zipfile
+
+    if find_eocd(path) is None:
+        return None
+    try:
+        container = GameContainer(path)
+    except (OSError, zipfile.BadZipFile):
+        return None
+    if container.system_member is None:
+        container.close()
+        return None
+    return container
+
+
+def find_container(path):
+    """
+    Arquivo do pacote a partir do que o usuário passou -> Path ou None
+
+    Um arquivo é usado direto. Numa pasta com img/ ou audio/ soltos o jogo
+    não está empacotado; senão procura package.nw, .zip e .exe na raiz.
+    """
+    path = Path(path)
+    if path.is_file():
+        candidates = [path]
+    elif path.is_dir():
+        for root in (path, path / 'www'):
+            if any((root / name).is_dir() for name in SEARCH_FOLDERS):
+                return None
+        candidates = [path / 'package.nw'] + sorted(
+            p for p in path.iterdir() if p.suffix.lower() in CONTAINER_SUFFIXES and p.name != 'package.nw'
+        )
+    else:
+        return None
+
+    for candidate in candidates:
+        if candidate.is_file():
+            container = open_container(candidate)
+            if container is not None:
+                container.close()
+                return candidate
+    return None
+
+
+def default_output(container_path):
+    """Game.exe -> Game_descriptografado/ ao lado do pacote"""
+    container_path = Path(container_path)
+    return container_path.parent / f"{container_path.stem}_descriptografado"
+
+
+class ContainerDecrypter(RPGMakerDecrypter):
+    """
+    Motor com as origens dentro do pacote
+
+    game_folder é a pasta de saída: cada membro 'www/img/x.rpgmvp' vira o
+    caminho game_folder/www/img/x.rpgmvp (que nunca existe no disco) e a
+    saída sai ao lado dele, como no jogo solto.
+    """
+
+    def __init__(self, container_path, output_folder):
+        super().__init__(output_folder)
+        self.container = GameContainer(container_path)
+        # Não há pasta de origem para abrir com dir_fd
+        self.use_dir_fd = False
+
+        self.members = {}
+        prefixes = tuple(self.container.root + name + '/' for name in SEARCH_FOLDERS)
+        for name in self.container.infos:
+            if name.startswith(prefixes) and safe_member(name):
+                if PurePosixPath(name).suffix in self.encrypted_extensions:
+                    self.members[self.game_folder / name] = name
+
+    def load_encryption_key(self):
+        """Chave do System.json de dentro do pacote"""
+        try:
+            system_data = self.container.read_system_json() or {}
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Erro ao ler {self.container.system_member}: {e}")
+            system_data = {}
+
+        self.encryption_key = system_data.get('encryptionKey', '')
+        if self.encryption_key:
+            print(f"✅ Chave encontrada: {self.encryption_key}")
+            print(f"📍 Arquivo: {self.container.path.name}:{self.container.system_member}")
+            return True
+
+        print("❌ Chave de criptografia não encontrada no System.json do pacote!")
+        print("💡 Informe a chave com --chave=HEX")
+        return False
+
+    def find_encrypted_files(self):
+        return list(self.members)
+
+    def read_source(self, file_path, size=-1):
+        return self.container.read(self.members[file_path], size)
+
+    def source_size(self, file_path):
+        return self.container.infos[self.members[file_path]].file_size
+
+    def has_source(self, file_path):
+        return file_path in self.members
+
+    def copy_system_json(self):
+        """System.json do pacote -> saída (é ele que disable_encryption altera)"""
+        target = self.game_folder / self.container.system_member
+        target.parent.mkdir(parents=True, exist_ok=True)
+        with open(target, 'wb') as f:
+            f.write(self.container.read(self.container.system_member))
+
+    def mirror_game(self, mode):
+        """
+        Copia os membros não criptografados para a saída (jogo completo)
+
+        Não dá para linkar um membro de ZIP: o modo é ignorado e tudo é
+        copiado em streaming, sem arquivo temporário. Retorna (0, copiados).
+        """
+        self.copy_system_json()
+
+        copied = 0
+        for name, info in self.container.infos.items():
+            if not safe_member(name) or name == self.container.system_member:
+                continue
+            if PurePosixPath(name).suffix in self.encrypted_extensions:
+                continue
+
+            target = self.game_folder / name
+            try:
+                if target.stat().st_size == info.file_size:
+                    continue
+            except OSError:
+                pass
+
+            target.parent.mkdir(parents=True, exist_ok=True)
+            with self.container.zip.open(info) as source, open(target, 'wb') as f:
+                shutil.copyfileobj(source, f, 1024 * 1024)
+            copied += 1
+
+        return 0, copied
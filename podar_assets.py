@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Poda de assets não utilizados (reduz o jogo para celulares / JoiPlay)
+
+Usa o conjunto de assets referenciados por data/*.json e plugins
+(grafo_referencias.py) e encontra as imagens, áudios e vídeos - criptografados
+ou não - que nenhum evento, banco de dados ou plugin usa.
+
+Modos:
+  (padrão)       apenas relatório, nada é alterado
+  --quarentena   move os arquivos não usados para <jogo>/_quarentena/
+  --restaurar    devolve os arquivos da quarentena para o lugar original
+  --exportar=DIR copia o jogo para DIR sem os arquivos não usados
+
+Os assets de img/system (exigidos pelo motor) e as pastas Live2D nunca são
+removidos. Nomes que aparecem como texto no código de js/plugins/*.js, nos
+comandos Script dos eventos ou como valor de parâmetro em js/plugins.js
+(só o nome, sem pasta) também são mantidos, por segurança. Sem data/*.json
+ou com algum arquivo de dados ilegível nada é podado.
+"""
+
+import os
+import sys
+import json
+import shutil
+from pathlib import Path
+
+from backup_encrypted import walk_game_files
+from catalogo_assets import ENCRYPTED_EXTENSIONS
+from grafo_referencias import (
+    ReferenceGraph, find_www_root, asset_key, asset_alternatives, load_plugins, bare_names_from_strings,
+    STRING_LITERAL,
+)
+
+QUARANTINE_FOLDER = '_quarentena'
+MANIFEST_NAME = 'manifesto.json'
+
+PRUNABLE_FOLDERS = ['img', 'audio', 'movies']
+PROTECTED_FOLDERS = ['img/system']
+PRUNABLE_EXTENSIONS = ['.png', '.ogg', '.m4a', '.webm', '.mp4'] + list(ENCRYPTED_EXTENSIONS)
+
+
+def plugin_literals(www_root):
+    """
+    Strings literais do código dos plugins (nomes de arquivo fixos no JS)
+    e valores dos parâmetros em js/plugins.js, sem extensão
+    """
+    literals = set()
+
+    # Parâmetros @type file guardam só o nome: 'Boss1' protege img/*/Boss1.
+    # plugins.js ilegível propaga o erro: sem ele nada pode ser podado
+    plugins_js = Path(www_root) / 'js' / 'plugins.js'
+    if plugins_js.exists():
+        for _, parameters in load_plugins(plugins_js):
+            literals.update(bare_names_from_strings(parameters))
+
+    plugins_folder = Path(www_root) / 'js' / 'plugins'
+    if not plugins_folder.exists():
+        return literals
+
+    for js_file in plugins_folder.glob('*.js'):
+        try:
+            with open(js_file, 'r', encoding='utf-8', errors='ignore') as f:
+                literals.update(STRING_LITERAL.findall(f.read()))
+        except OSError:
+            pass
+
+    return literals
+
+
+def find_unused_assets(game_folder):
+    """
+    Procura assets não referenciados
+    Retorna lista de (caminho, relativo ao jogo, tamanho)
+
+    ValueError se o conjunto de referências estiver incompleto (sem
+    data/*.json ou com arquivos ilegíveis): aí tudo pareceria não usado.
+    """
+    game_folder = Path(game_folder)
+    www_root = find_www_root(game_folder)
+
+    with ReferenceGraph(game_folder) as graph:
+        graph.update()
+        if graph.errors:
+            failed = '\n'.join(f"   ⚠️  {relative}: {error}" for relative, error in graph.errors)
+            raise ValueError(f"arquivos de dados ilegíveis, referências incompletas:\n{failed}")
+        if not any(relative.endswith('.json') for relative in graph.source_files()):
+            raise ValueError(f"nenhum data/*.json em {www_root}")
+
+        referenced = set()
+        for asset in graph.referenced_assets():
+            referenced.update(asset_alternatives(asset))
+
+    literals = plugin_literals(www_root)
+    # 'sub/Boss1' protege só assets terminados em /sub/Boss1
+    literal_paths = [literal for literal in literals if '/' in literal]
+
+    unused = []
+    for root_path, file in walk_game_files(game_folder):
+        path = root_path / file
+
+        try:
+            relative_www = path.relative_to(www_root).as_posix()
+        except ValueError:
+            continue
+
+        folder = relative_www.split('/', 1)[0]
+        if folder not in PRUNABLE_FOLDERS:
+            continue
+        if any(relative_www.startswith(p + '/') for p in PROTECTED_FOLDERS):
+            continue
+        if 'live2d' in relative_www.lower():
+            continue
+        if os.path.splitext(file)[1].lower() not in PRUNABLE_EXTENSIONS:
+            continue
+
+        key = asset_key(relative_www)
+        if key in referenced:
+            continue
+
+        name = key.rsplit('/', 1)[-1]
+        if name in literals or key in literals:
+            continue
+        if any(key.endswith('/' + literal) for literal in literal_paths):
+            continue
+
+        unused.append((path, path.relative_to(game_folder), path.stat().st_size))
+
+    return unused
+
+
+def quarantine(game_folder, unused):
+    """Move os arquivos não usados para a quarentena (com manifesto)"""
+    game_folder = Path(game_folder)
+    quarantine_folder = game_folder / QUARANTINE_FOLDER
+    manifest_path = quarantine_folder / MANIFEST_NAME
+
+    manifest = []
+    if manifest_path.exists():
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+
+    moved = 0
+    for path, relative, size in unused:
+        destination = quarantine_folder / relative
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            shutil.move(str(path), str(destination))
+            manifest.append(relative.as_posix())
+            moved += 1
+        except Exception as e:
+            print(f"  ❌ {relative} - Erro: {e}")
+
+    quarantine_folder.mkdir(exist_ok=True)
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(sorted(set(manifest)), f, ensure_ascii=False, indent=2)
+
+    return moved
+
+
+def restore_quarantine(game_folder):
+    """Devolve os arquivos da quarentena para o jogo"""
+    game_folder = Path(game_folder)
+    quarantine_folder = game_folder / QUARANTINE_FOLDER
+    manifest_path = quarantine_folder / MANIFEST_NAME
+
+    if not manifest_path.exists():
+        print("❌ Nenhuma quarentena encontrada")
+        return 0
+
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+
+    restored = 0
+    remaining = []
+    for relative in manifest:
+        source = quarantine_folder / relative
+        destination = game_folder / relative
+        try:
+            destination.parent.mkdir(parents=True, exist_ok=True)
+            shutil.move(str(source), str(destination))
+            restored += 1
+        except Exception as e:
+            print(f"  ❌ {relative} - Erro: {e}")
+            remaining.append(relative)
+
+    if remaining:
+        with open(manifest_path, 'w', encoding='utf-8') as f:
+            json.dump(remaining, f, ensure_ascii=False, indent=2)
+    else:
+        shutil.rmtree(quarantine_folder, ignore_errors=True)
+
+    return restored
+
+
+def export_build(game_folder, export_folder, unused):
+    """Copia o jogo para outra pasta, deixando de fora os assets não usados"""
+    game_folder = Path(game_folder)
+    export_folder = Path(export_folder)
+    skipped = {path for path, _, _ in unused}
+
+    copied = 0
+    for root_path, file in walk_game_files(game_folder):
+        source = root_path / file
+        if source in skipped:
+            continue
+
+        destination = export_folder / source.relative_to(game_folder)
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy2(source, destination)
+        copied += 1
+
+    return copied
+
+
+def main():
+    options = [a for a in sys.argv[1:] if a.startswith('--')]
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+
+    if not args:
+        print("❌ Uso: python podar_assets.py /caminho/jogo [--quarentena | --restaurar | --exportar=DIR]")
+        sys.exit(1)
+
+    game_folder = Path(args[0])
+
+    if not game_folder.is_dir():
+        print(f"❌ Pasta não encontrada: {game_folder}")
+        sys.exit(1)
+
+    print("="*70)
+    print("  PODA DE ASSETS NÃO UTILIZADOS")
+    print("="*70)
+    print(f"\n📁 Jogo: {game_folder}")
+
+    if '--restaurar' in options:
+        restored = restore_quarantine(game_folder)
+        print(f"\n✅ Restaurados: {restored} arquivos")
+        return
+
+    export_folder = None
+    for option in options:
+        if option.startswith('--exportar='):
+            export_folder = option.split('=', 1)[1]
+
+    print("\n🔍 Calculando assets referenciados...")
+    try:
+        unused = find_unused_assets(game_folder)
+    except (OSError, ValueError) as e:
+        print(f"❌ Não foi possível calcular os assets referenciados: {e}")
+        print("💡 Nada foi alterado")
+        sys.exit(1)
+    total_bytes = sum(size for _, _, size in unused)
+
+    by_folder = {}
+    for _, relative, size in unused:
+        folder = str(relative.parent)
+        count, folder_bytes = by_folder.get(folder, (0, 0))
+        by_folder[folder] = (count + 1, folder_bytes + size)
+
+    print(f"\n📦 Assets não utilizados: {len(unused)}")
+    for folder, (count, folder_bytes) in sorted(by_folder.items(), key=lambda x: -x[1][1]):
+        print(f"   {folder:40s} {count:5d} arquivos ({folder_bytes / 1024 / 1024:8.1f} MB)")
+
+    print(f"\n{'='*70}")
+
+    if '--quarentena' in options:
+        moved = quarantine(game_folder, unused)
+        print(f"🗑️  Movidos para quarentena: {moved}")
+        print(f"💾 Economia: {total_bytes:,} bytes ({total_bytes / 1024 / 1024:.1f} MB)")
+        print(f"\n💡 Para desfazer: python podar_assets.py {game_folder} --restaurar")
+    elif export_folder:
+        copied = export_build(game_folder, export_folder, unused)
+        print(f"📤 Exportados: {copied} arquivos para {export_folder}")
+        print(f"💾 Economia: {total_bytes:,} bytes ({total_bytes / 1024 / 1024:.1f} MB)")
+    else:
+        print(f"💾 Economia possível: {total_bytes:,} bytes ({total_bytes / 1024 / 1024:.1f} MB)")
+        print(f"\n💡 Nada foi alterado. Use --quarentena ou --exportar=DIR para aplicar")
+
+    print(f"{'='*70}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+Variantes de resolução reduzida para imagens grandes (aparelhos com pouca RAM)
+
+PNGs enormes em img/pictures e img/parallaxes causam falta de memória e
+carregamento lento no JoiPlay em Androids antigos. Este script:
+  1. lê largura/altura direto do chunk IHDR (sem decodificar)
+  2. seleciona as imagens acima do orçamento de pixels
+  3. reduz cada uma em paralelo por um fator inteiro (média de blocos)
+  4. guarda o original e um mapeamento para poder reverter
+
+Só as imagens geradas pela descriptografia são tocadas. Se o Pillow estiver
+instalado ele é usado (mais rápido); senão a redução é feita em Python puro
+para PNGs de 8 bits.
+
+Atenção: o RPG Maker desenha a imagem no tamanho do arquivo, então a imagem
+reduzida aparece menor no jogo, a não ser que um plugin ou o evento a escale.
+"""
+
+import os
+import sys
+import json
+import math
+import shutil
+import struct
+import zlib
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+from catalogo_assets import TOOLKIT_DIR, read_png_size
+from otimizar_png import (
+    PNG_SIGNATURE, CHANNELS, read_chunks, make_chunk, unfilter, refilter, compress
+)
+
+TARGET_FOLDERS = ['img/pictures', 'img/parallaxes']
+DEFAULT_PIXEL_BUDGET = 1920 * 1080
+
+MAPPING_NAME = 'reducao_resolucao.json'
+ORIGINALS_FOLDER = 'originais_resolucao'
+
+
+def reduction_factor(width, height, budget):
+    """Menor fator inteiro que deixa a imagem dentro do orçamento"""
+    factor = max(2, math.ceil(math.sqrt(width * height / budget)))
+    while math.ceil(width / factor) * math.ceil(height / factor) > budget:
+        factor += 1
+    return factor
+
+
+def downsample_raw(raw, width, height, channels, factor, nearest=False):
+    """Média de blocos factor x factor (ou vizinho mais próximo para paleta)"""
+    row_bytes = width * channels
+    new_width = math.ceil(width / factor)
+    new_height = math.ceil(height / factor)
+    out = bytearray(new_width * new_height * channels)
+
+    pos = 0
+    for oy in range(new_height):
+        y0 = oy * factor
+        y1 = min(height, y0 + factor)
+
+        if nearest:
+            row = raw[y0 * row_bytes:(y0 + 1) * row_bytes]
+            for ox in range(new_width):
+                x = ox * factor * channels
+                out[pos:pos + channels] = row[x:x + channels]
+                pos += channels
+            continue
+
+        # Soma vertical das linhas do bloco
+        column_sums = [0] * row_bytes
+        for y in range(y0, y1):
+            row = raw[y * row_bytes:(y + 1) * row_bytes]
+            column_sums = [a + b for a, b in zip(column_sums, row)]
+
+        for ox in range(new_width):
+            x0 = ox * factor
+            x1 = min(width, x0 + factor)
+            count = (x1 - x0) * (y1 - y0)
+            for c in range(channels):
+                total = sum(column_sums[x * channels + c] for x in range(x0, x1))
+                out[pos] = (total + count // 2) // count
+                pos += 1
+
+    return bytes(out), new_width, new_height
+
+
+def reduce_png_python(data, factor):
+    """Reduz um PNG de 8 bits em Python puro -> novos bytes, ou None"""
+    if not data.startswith(PNG_SIGNATURE):
+        return None
+
+    chunks = read_chunks(data)
+    width, height, depth, color_type, _, _, interlace = struct.unpack('>IIBBBBB', chunks[0][1])
+    if depth != 8 or interlace or color_type not in CHANNELS:
+        return None
+
+    channels = CHANNELS[color_type]
+    row_bytes = width * channels
+    filtered = zlib.decompress(b''.join(c for t, c in chunks if t == b'IDAT'))
+    raw = unfilter(filtered, row_bytes, channels, height)
+
+    new_raw, new_width, new_height = downsample_raw(
+        raw, width, height, channels, factor, nearest=(color_type == 3)
+    )
+
+    new_row_bytes = new_width * channels
+    idat = compress(refilter(new_raw, new_row_bytes, channels, new_height, 2))
+
+    ihdr = struct.pack('>IIBBBBB', new_width, new_height, depth, color_type, 0, 0, 0)
+    output = bytearray(PNG_SIGNATURE)
+    output += make_chunk(b'IHDR', ihdr)
+    for chunk_type, content in chunks[1:]:
+        if chunk_type in (b'PLTE', b'tRNS', b'gAMA', b'sRGB', b'iCCP', b'cHRM'):
+            output += make_chunk(chunk_type, content)
+    output += make_chunk(b'IDAT', idat)
+    output += make_chunk(b'IEND', b'')
+    return bytes(output)
+
+
+def reduce_png(path, factor):
+    """Reduz o PNG (Pillow se disponível) -> novos bytes, ou None"""
+    try:
+        from PIL import Image
+    except ImportError:
+        Image = None
+
+    if Image is not None:
+        import io
+        with Image.open(path) as img:
+            size = (math.ceil(img.width / factor), math.ceil(img.height / factor))
+            resample = Image.NEAREST if img.mode == 'P' else Image.LANCZOS
+            buffer = io.BytesIO()
+            img.resize(size, resample).save(buffer, 'PNG', optimize=True)
+            return buffer.getvalue()
+
+    with open(path, 'rb') as f:
+        return reduce_png_python(f.read(), factor)
+
+
+def reduce_file(args):
+    """Worker do pool: guarda o original e grava a versão reduzida"""
+    path, backup_path, factor = args
+    try:
+        reduced = reduce_png(path, factor)
+        if reduced is None:
+            return path, None, "formato não suportado (instale o Pillow)"
+
+        os.makedirs(os.path.dirname(backup_path), exist_ok=True)
+        shutil.copy2(path, backup_path)
+
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(reduced)
+        os.replace(tmp_path, path)
+
+        return path, len(reduced), None
+    except Exception as e:
+        return path, None, str(e)
+
+
+def find_oversized(game_folder, budget):
+    """Imagens descriptografadas acima do orçamento -> [(caminho, largura, altura)]"""
+    from rpgmaker_decrypter_FINAL import RPGMakerDecrypter
+
+    game_folder = Path(game_folder)
+    decrypter = RPGMakerDecrypter(game_folder)
+
+    oversized = []
+    for path in decrypter.find_decrypted_outputs():
+        if path.suffix != '.png':
+            continue
+        relative = path.relative_to(game_folder).as_posix()
+        if relative.startswith('www/'):
+            relative = relative[4:]
+        if not any(relative.startswith(folder + '/') for folder in TARGET_FOLDERS):
+            continue
+
+        with open(path, 'rb') as f:
+            width, height, _ = read_png_size(f)
+
+        if width and height and width * height > budget:
+            oversized.append((path, width, height))
+
+    return oversized
+
+
+def load_mapping(game_folder):
+    mapping_path = Path(game_folder) / TOOLKIT_DIR / MAPPING_NAME
+    try:
+        with open(mapping_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_mapping(game_folder, mapping):
+    mapping_path = Path(game_folder) / TOOLKIT_DIR / MAPPING_NAME
+    mapping_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(mapping_path, 'w', encoding='utf-8') as f:
+        json.dump(mapping, f, ensure_ascii=False, indent=2)
+
+
+def reduce_images(game_folder, budget=DEFAULT_PIXEL_BUDGET, workers=None):
+    """Reduz as imagens grandes e registra o mapeamento reversível"""
+    game_folder = Path(game_folder)
+    mapping = load_mapping(game_folder)
+
+    oversized = [
+        item for item in find_oversized(game_folder, budget)
+        if item[0].relative_to(game_folder).as_posix() not in mapping
+    ]
+
+    if not oversized:
+        print("\n✅ Nenhuma imagem acima do orçamento")
+        return 0
+
+    print(f"\n📐 Imagens acima de {budget:,} pixels: {len(oversized)}")
+
+    jobs = []
+    info = {}
+    for path, width, height in oversized:
+        relative = path.relative_to(game_folder).as_posix()
+        factor = reduction_factor(width, height, budget)
+        backup_path = game_folder / TOOLKIT_DIR / ORIGINALS_FOLDER / relative
+        jobs.append((str(path), str(backup_path), factor))
+        info[str(path)] = (relative, width, height, factor, backup_path)
+
+    reduced = 0
+    saved = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for path, new_size, error in pool.map(reduce_file, jobs):
+            relative, width, height, factor, backup_path = info[path]
+            if error:
+                print(f"   ❌ {relative}: {error}")
+                continue
+
+            original_size = backup_path.stat().st_size
+            saved += original_size - new_size
+            reduced += 1
+
+            mapping[relative] = {
+                'original': backup_path.relative_to(game_folder).as_posix(),
+                'original_size': [width, height],
+                'reduced_size': [math.ceil(width / factor), math.ceil(height / factor)],
+                'factor': factor,
+            }
+            print(f"   ✅ {relative}: {width}x{height} → "
+                  f"{math.ceil(width / factor)}x{math.ceil(height / factor)}")
+
+    save_mapping(game_folder, mapping)
+
+    print(f"\n📦 Reduzidas: {reduced}")
+    print(f"💾 Economia em disco: {saved / 1024 / 1024:.1f} MB")
+    return reduced
+
+
+def revert_images(game_folder):
+    """Devolve os originais usando o mapeamento"""
+    game_folder = Path(game_folder)
+    mapping = load_mapping(game_folder)
+
+    reverted = 0
+    for relative, entry in list(mapping.items()):
+        backup_path = game_folder / entry['original']
+        if not backup_path.exists():
+            print(f"   ❌ Original não encontrado: {entry['original']}")
+            continue
+        shutil.move(str(backup_path), str(game_folder / relative))
+        del mapping[relative]
+        reverted += 1
+
+    save_mapping(game_folder, mapping)
+    print(f"\n✅ Revertidas: {reverted}")
+    return reverted
+
+
+def main():
+    options = [a for a in sys.argv[1:] if a.startswith('--')]
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+
+    if not args:
+        print("❌ Uso: python reduzir_imagens.py /caminho/jogo [--orcamento=PIXELS] [--reverter]")
+        print(f"\nOrçamento padrão: {DEFAULT_PIXEL_BUDGET:,} pixels (1920x1080)")
+        sys.exit(1)
+
+    game_folder = Path(args[0])
+
+    if not game_folder.is_dir():
+        print(f"❌ Pasta não encontrada: {game_folder}")
+        sys.exit(1)
+
+    budget = DEFAULT_PIXEL_BUDGET
+    for option in options:
+        if option.startswith('--orcamento='):
+            budget = int(option.split('=', 1)[1])
+
+    print("="*70)
+    print("  REDUÇÃO DE RESOLUÇÃO PARA POUCA RAM")
+    print("="*70)
+    print(f"\n📁 Jogo: {game_folder}")
+
+    if '--reverter' in options:
+        revert_images(game_folder)
+    else:
+        reduce_images(game_folder, budget)
+        print(f"\n💡 Para desfazer: python reduzir_imagens.py {game_folder} --reverter")
+
+    print(f"\n{'='*70}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+ETAPA 2: Restaura as imagens traduzidas para o jogo
+
+Versão Python (multiplataforma) do restoreImages.ps1. Lê o mesmo
+translation_config.json gerado pela coleta e compara o hash de cada imagem
+traduzida com o da imagem coletada: só as imagens que mudaram são
+gravadas de volta, então o tempo depende do número de arquivos traduzidos
+e não do total. Imagens agrupadas como duplicatas na coleta são gravadas
+em todos os caminhos originais.
+
+Com --criptografar as imagens são gravadas já criptografadas
+(.rpgmvp / .png_) com a chave do jogo.
+"""
+
+import os
+import sys
+import json
+import shutil
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+from coletar_imagens import CONFIG_NAME, IMAGE_EXTENSIONS, file_hash
+
+
+def find_game_root(source_dir):
+    """Sobe a partir da pasta de imagens até achar data/System.json"""
+    source_dir = Path(source_dir)
+    for folder in [source_dir] + list(source_dir.parents):
+        if (folder / 'data' / 'System.json').exists():
+            return folder
+    return None
+
+
+def encrypted_destination(original_path, game_root):
+    """Escolhe .rpgmvp ou .png_ conforme o que o jogo já usa"""
+    for ext in ('.rpgmvp', '.png_'):
+        candidate = original_path.with_suffix(ext)
+        if candidate.exists():
+            return candidate
+
+    # MZ usa .png_, MV usa .rpgmvp
+    if (game_root / 'js' / 'rmmz_core.js').exists():
+        return original_path.with_suffix('.png_')
+    return original_path.with_suffix('.rpgmvp')
+
+
+def restore_images(output_dir, use_translated=None, create_backup=False, encrypt=False, workers=8):
+    output_dir = Path(output_dir)
+    config_file = output_dir / CONFIG_NAME
+
+    if not config_file.exists():
+        print("\n✗ Arquivo de configuração não encontrado!")
+        print(f"✗ Esperado em: {config_file}")
+        print("\nCertifique-se de que:")
+        print("1. Este é o mesmo diretório usado na coleta")
+        print(f"2. O arquivo {CONFIG_NAME} não foi deletado")
+        return False
+
+    with open(config_file, 'r', encoding='utf-8-sig') as f:
+        config = json.load(f)
+
+    source_dir = Path(config['sourceDirectory'])
+    mapping = config['mapping']
+    collected_hashes = config.get('hashes', {})
+    duplicates = config.get('duplicates', {})
+
+    print("\n=== CONFIGURAÇÃO CARREGADA ===")
+    print(f"Diretório original do jogo: {source_dir}")
+    print(f"Total de imagens coletadas: {config.get('totalImages')}")
+    print(f"Data da coleta: {config.get('collectionDate')}")
+
+    if use_translated is None:
+        use_translated = (output_dir / 'translated').is_dir()
+
+    translated_dir = output_dir / 'translated' if use_translated else output_dir
+    if not translated_dir.is_dir():
+        print("\n✗ Pasta 'translated' não encontrada!")
+        print(f"✗ Esperado em: {translated_dir}")
+        return False
+
+    print(f"\n✓ Usando imagens de: {translated_dir}")
+
+    decrypter = None
+    game_root = None
+    if encrypt:
+        from rpgmaker_decrypter_FINAL import RPGMakerDecrypter
+        game_root = find_game_root(source_dir)
+        if game_root is None:
+            print("\n✗ System.json não encontrado acima de", source_dir)
+            return False
+        decrypter = RPGMakerDecrypter(game_root)
+        if not decrypter.load_encryption_key():
+            return False
+
+    translated_files = sorted(
+        p for p in translated_dir.iterdir()
+        if p.is_file() and p.suffix.lower() in IMAGE_EXTENSIONS
+    )
+
+    def write_target(data, relative):
+        # Mapeamentos do PowerShell usam '\\'
+        original_path = source_dir / Path(relative.replace('\\', '/'))
+
+        destination = original_path
+        if decrypter is not None and original_path.suffix.lower() == '.png':
+            destination = encrypted_destination(original_path, game_root)
+            data = decrypter.encrypt_data(data)
+
+        # Já restaurada numa execução anterior
+        if destination.exists() and destination.stat().st_size == len(data):
+            with open(destination, 'rb') as f:
+                if f.read() == data:
+                    return 'unchanged'
+
+        backed_up = False
+        if create_backup and destination.exists():
+            backup_path = Path(str(destination) + '.backup')
+            if not backup_path.exists():
+                shutil.copy2(destination, backup_path)
+                backed_up = True
+
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        with open(destination, 'wb') as f:
+            f.write(data)
+
+        return 'backup' if backed_up else 'restored'
+
+    def restore_one(file):
+        relative = mapping.get(file.name)
+        if not relative:
+            return file.name, ['not_found']
+
+        # Uma imagem traduzida volta para todos os caminhos com o mesmo conteúdo
+        targets = [relative] + duplicates.get(file.name, [])
+
+        # Sem alteração em relação à imagem coletada: nada a fazer
+        if collected_hashes.get(file.name) == file_hash(file):
+            return file.name, ['unchanged'] * len(targets)
+
+        with open(file, 'rb') as f:
+            data = f.read()
+
+        return file.name, [write_target(data, target) for target in targets]
+
+    print("\n=== RESTAURANDO IMAGENS ===")
+
+    restored = 0
+    unchanged = 0
+    backup_count = 0
+    not_found = []
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for name, statuses in pool.map(restore_one, translated_files):
+            for status in statuses:
+                if status == 'not_found':
+                    not_found.append(name)
+                elif status == 'unchanged':
+                    unchanged += 1
+                else:
+                    restored += 1
+                    if status == 'backup':
+                        backup_count += 1
+
+    print("\n=== CONCLUÍDO ===")
+    print(f"✓ Restauradas: {restored} imagens ({len(translated_files)} arquivos traduzidos)")
+    print(f"✓ Sem alteração (puladas): {unchanged}")
+
+    if create_backup:
+        print(f"✓ Backups criados: {backup_count} arquivos (.backup)")
+
+    if not_found:
+        print("\n⚠ ATENÇÃO: Arquivos não encontrados no mapeamento:")
+        for name in not_found:
+            print(f"  - {name}")
+        print("\nEstes arquivos não foram restaurados (não estavam na coleta original)")
+
+    print(f"\n✓ Imagens restauradas em: {source_dir}")
+    return True
+
+
+def main():
+    options = [a for a in sys.argv[1:] if a.startswith('--')]
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+
+    if not args:
+        print("❌ Uso: python restaurar_imagens.py <pasta_da_coleta> [--traduzidas | --originais] [--backup] [--criptografar]")
+        print("\nOpções:")
+        print("  --traduzidas    usa <pasta_da_coleta>/translated (padrão se existir)")
+        print("  --originais     usa as imagens direto de <pasta_da_coleta>")
+        print("  --backup        cria .backup das imagens originais antes de sobrescrever")
+        print("  --criptografar  grava como .rpgmvp/.png_ com a chave do jogo")
+        sys.exit(1)
+
+    output_dir = args[0]
+
+    if not os.path.isdir(output_dir):
+        print(f"❌ Pasta não encontrada: {output_dir}")
+        sys.exit(1)
+
+    use_translated = None
+    if '--traduzidas' in options:
+        use_translated = True
+    elif '--originais' in options:
+        use_translated = False
+
+    print("=== RESTAURADOR DE IMAGENS TRADUZIDAS ===")
+
+    success = restore_images(
+        output_dir,
+        use_translated=use_translated,
+        create_backup='--backup' in options,
+        encrypt='--criptografar' in options,
+    )
+    sys.exit(0 if success else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,29 @@
 #!/usr/bin/env python3
 """
-Restaura arquivos Live2D do arquivo original (ZIP, RAR ou 7Z)
+Restaura arquivos Live2D do arquivo original (ZIP, RAR, 7Z ou TAR)
 Suporta múltiplos formatos de compressão automaticamente
 """
 
 import sys
 import json
+import time
+import zlib
 import shutil
+import tarfile
+import subprocess
+import importlib.util
 from pathlib import Path
 
+from nucleo import system_json_paths, xor_header
+
+# Erros de um fluxo TAR/GZ/XZ truncado ou corrompido
+STREAM_ERRORS = (tarfile.TarError, EOFError, OSError, zlib.error)
+try:
+    import lzma
+    STREAM_ERRORS += (lzma.LZMAError,)
+except ImportError:
+    pass
+
 class Color:
     """Cores ANSI para terminal"""
     GREEN = '\033[92m'
@@ -36,7 +51,10 @@ def detect_archive_type(archive_path):
     
     # Verifica pela extensão
     ext = archive_path.suffix.lower()
-    if ext == '.zip':
+    name = archive_path.name.lower()
+    if name.endswith(('.tar', '.tar.gz', '.tgz', '.tar.xz', '.txz', '.tar.bz2', '.tbz2')):
+        return 'tar'
+    elif ext == '.zip':
         return 'zip'
     elif ext in ['.rar', '.cbr']:
         return 'rar'
@@ -46,7 +64,7 @@ def detect_archive_type(archive_path):
     # Se não conseguiu pela extensão, tenta pelos bytes mágicos
     try:
         with open(archive_path, 'rb') as f:
-            magic = f.read(8)
+            magic = f.read(512)
         
         # ZIP: PK\x03\x04
         if magic[:4] == b'PK\x03\x04':
@@ -57,6 +75,12 @@ def detect_archive_type(archive_path):
         # 7Z: 7z\xbc\xaf\x27\x1c
         elif magic[:6] == b'7z\xbc\xaf\x27\x1c':
             return '7z'
+        # TAR comprimido: GZIP (1F 8B), XZ (FD 37 7A 58 5A 00), BZIP2 (BZh)
+        elif magic[:2] == b'\x1f\x8b' or magic[:6] == b'\xfd7zXZ\x00' or magic[:3] == b'BZh':
+            return 'tar'
+        # TAR puro: texto "ustar" no offset 257
+        elif magic[257:262] == b'ustar':
+            return 'tar'
     except:
         pass
     
@@ -108,7 +132,332 @@ def extract_with_py7zr(archive_path):
         print_error(f"Erro ao abrir 7Z: {e}")
         return None, None, None
 
-def restore_live2d_universal(archive_path, game_folder, encryption_key=None):
+class TarStream:
+    """
+    Leitura sequencial de TAR / TAR.GZ / TAR.XZ (modo 'r|*')
+
+    Não há acesso aleatório: a lista de arquivos é um iterador que avança
+    pelo arquivo, e read() só pode ler o membro que acabou de ser listado.
+    Cada membro é filtrado, lido e gravado numa única passagem.
+    """
+    streaming = True
+
+    def __init__(self, archive_path=None, fileobj=None, process=None):
+        self.tf = tarfile.open(archive_path, 'r|*', fileobj=fileobj)
+        self.process = process
+        self.current = None
+
+    def names(self):
+        for member in self.tf:
+            if not member.isfile():
+                continue
+            self.current = member
+            yield member.name
+
+    def read(self, name):
+        if self.current is None or self.current.name != name:
+            raise ValueError(f"TAR em modo streaming: membro fora de ordem ({name})")
+        return self.tf.extractfile(self.current).read()
+
+    def close(self):
+        self.tf.close()
+        if self.process is not None:
+            self.process.stdout.close()
+            self.process.kill()
+            self.process.wait()
+
+def extract_with_tarfile(archive_path):
+    """Extrai usando tarfile em modo streaming (TAR, TAR.GZ, TAR.XZ, TAR.BZ2)"""
+    try:
+        ts = TarStream(archive_path)
+        return ts.names(), ts.read, ts
+    except (tarfile.TarError, OSError) as e:
+        print_error(f"Erro ao abrir TAR: {e}")
+        return None, None, None
+
+# ===== BACKENDS NATIVOS (7z / unrar / bsdtar) =====
+
+# Nomes alternativos de cada ferramenta nativa
+NATIVE_TOOLS = {
+    '7z': ['7z', '7zz', '7za'],
+    'unrar': ['unrar'],
+    'bsdtar': ['bsdtar'],
+}
+
+# Ordem de preferência por tipo de arquivo (nativos primeiro)
+BACKEND_PREFERENCE = {
+    'zip': ['bsdtar', '7z', 'zipfile'],
+    'rar': ['unrar', 'bsdtar', '7z', 'rarfile'],
+    '7z': ['7z', 'bsdtar', 'py7zr'],
+    'tar': ['tarfile', 'bsdtar'],
+}
+
+# Módulo Python exigido por cada backend Python
+PYTHON_BACKENDS = {
+    'zipfile': 'zipfile',
+    'rarfile': 'rarfile',
+    'py7zr': 'py7zr',
+    'tarfile': 'tarfile',
+}
+
+BENCHMARK_CACHE = Path.home() / '.rpgmaker_toolkit' / 'backends.json'
+
+def find_native_tool(tool):
+    """Retorna o caminho do executável nativo, ou None se não instalado"""
+    for name in NATIVE_TOOLS.get(tool, []):
+        path = shutil.which(name)
+        if path:
+            return path
+    return None
+
+def backend_available(backend):
+    """Verifica se um backend (nativo ou Python) pode ser usado"""
+    if backend in NATIVE_TOOLS:
+        return find_native_tool(backend) is not None
+    module = PYTHON_BACKENDS.get(backend)
+    return module is not None and importlib.util.find_spec(module) is not None
+
+def available_backends(archive_type):
+    """Backends disponíveis para o tipo de arquivo, em ordem de preferência"""
+    return [b for b in BACKEND_PREFERENCE.get(archive_type, []) if backend_available(b)]
+
+class NativeArchive:
+    """
+    Lê membros de um arquivo através de um binário nativo (7z / unrar)
+
+    A listagem é feita uma vez, com o tamanho de cada membro. Um único
+    processo despeja todos os membros em sequência no stdout (na ordem da
+    listagem) e read() corta o fluxo pelos tamanhos, pulando os membros
+    não pedidos - num arquivo sólido cada bloco é descomprimido uma vez só.
+    Um membro que já passou é lido por um processo próprio.
+    """
+    def __init__(self, archive_path, tool, exe):
+        self.archive_path = str(archive_path)
+        self.tool = tool
+        self.exe = exe
+        self.entries = []
+        self.position = 0
+        self.process = None
+
+    def namelist(self):
+        if self.tool == '7z':
+            cmd = [self.exe, 'l', '-slt', '-ba', self.archive_path]
+        else:
+            cmd = [self.exe, 'lt', '-p-', self.archive_path]
+        
+        output = subprocess.run(cmd, capture_output=True, check=True).stdout
+        output = output.decode('utf-8', errors='replace')
+        
+        # Ambas as listagens técnicas são blocos "Chave: valor" / "Chave = valor"
+        entries = []
+        name = None
+        size = 0
+        is_dir = False
+        for line in output.splitlines() + ['']:
+            line = line.strip()
+            if not line:
+                if name and not is_dir:
+                    entries.append((name.replace('\\', '/'), size))
+                name = None
+                size = 0
+                is_dir = False
+                continue
+            
+            sep = ' = ' if self.tool == '7z' else ': '
+            if sep not in line:
+                continue
+            field, value = line.split(sep, 1)
+            
+            if field in ('Path', 'Name'):
+                if name and not is_dir:
+                    entries.append((name.replace('\\', '/'), size))
+                name = value
+                size = 0
+                is_dir = False
+            elif field == 'Size' and value.isdigit():
+                size = int(value)
+            elif field == 'Folder' and value == '+':
+                is_dir = True
+            elif field == 'Type' and value == 'Directory':
+                is_dir = True
+            elif field == 'Attributes' and value.startswith('D'):
+                is_dir = True
+        
+        self.entries = entries
+        return [name for name, size in entries]
+
+    def open_stream(self):
+        """Processo que despeja todos os membros, em ordem, no stdout"""
+        if self.tool == '7z':
+            cmd = [self.exe, 'e', '-so', '-bd', '-spd', self.archive_path]
+        else:
+            cmd = [self.exe, 'p', '-inul', '-p-', self.archive_path]
+        self.process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        self.position = 0
+
+    def read_exact(self, size):
+        data = self.process.stdout.read(size)
+        if len(data) != size:
+            raise IOError(f"{self.tool}: fluxo terminou antes do fim do membro")
+        return data
+
+    def read(self, name):
+        if self.process is None:
+            self.open_stream()
+        
+        # Avança pelo fluxo até o membro pedido, descartando os do meio
+        for index in range(self.position, len(self.entries)):
+            if self.entries[index][0] == name:
+                break
+        else:
+            self.close()
+            return self.read_member(name)
+        
+        for skipped, size in self.entries[self.position:index]:
+            while size:
+                size -= len(self.read_exact(min(size, 1024 * 1024)))
+        
+        self.position = index + 1
+        return self.read_exact(self.entries[index][1])
+
+    def read_member(self, name):
+        """Um processo só para este membro (membro fora da ordem do fluxo)"""
+        if self.tool == '7z':
+            cmd = [self.exe, 'e', '-so', '-bd', '-spd', self.archive_path, name]
+        else:
+            cmd = [self.exe, 'p', '-inul', '-p-', self.archive_path, name]
+        
+        result = subprocess.run(cmd, capture_output=True)
+        if result.returncode != 0:
+            raise IOError(f"{self.tool} retornou código {result.returncode}")
+        return result.stdout
+
+    def close(self):
+        if self.process is not None:
+            self.process.stdout.close()
+            self.process.kill()
+            self.process.wait()
+            self.process = None
+        self.position = 0
+
+def extract_with_native(archive_path, tool):
+    """Extrai usando um binário nativo via pipes (7z, unrar ou bsdtar)"""
+    exe = find_native_tool(tool)
+    if not exe:
+        print_error(f"Ferramenta '{tool}' não encontrada no PATH")
+        return None, None, None
+    
+    try:
+        if tool == 'bsdtar':
+            # bsdtar converte qualquer formato suportado em um fluxo TAR:
+            # um único processo, lido sequencialmente pelo TarStream
+            process = subprocess.Popen(
+                [exe, '-c', '-f', '-', '@' + str(archive_path)],
+                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+            )
+            ts = TarStream(fileobj=process.stdout, process=process)
+            return ts.names(), ts.read, ts
+        
+        na = NativeArchive(archive_path, tool, exe)
+        return na.namelist(), na.read, na
+    except (subprocess.CalledProcessError, tarfile.TarError, OSError) as e:
+        print_error(f"Erro ao abrir com {tool}: {e}")
+        return None, None, None
+
+def open_with_backend(archive_path, backend):
+    """Abre o arquivo com o backend escolhido -> (file_list, read_func, handle)"""
+    if backend in NATIVE_TOOLS:
+        return extract_with_native(archive_path, backend)
+    elif backend == 'zipfile':
+        return extract_with_zipfile(archive_path)
+    elif backend == 'rarfile':
+        return extract_with_rarfile(archive_path)
+    elif backend == 'py7zr':
+        return extract_with_py7zr(archive_path)
+    elif backend == 'tarfile':
+        return extract_with_tarfile(archive_path)
+    
+    print_error(f"Backend desconhecido: {backend}")
+    return None, None, None
+
+def load_benchmark_cache():
+    """Lê o backend mais rápido medido anteriormente para cada tipo"""
+    try:
+        with open(BENCHMARK_CACHE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def select_backend(archive_type):
+    """Escolhe o backend: resultado do benchmark, senão a ordem de preferência"""
+    available = available_backends(archive_type)
+    if not available:
+        return None
+    
+    cached = load_benchmark_cache().get(archive_type)
+    if cached in available:
+        return cached
+    
+    return available[0]
+
+def benchmark_backends(archive_path, archive_type, sample_size=50):
+    """
+    Mede a velocidade de cada backend disponível lendo os primeiros
+    membros do arquivo, e salva o mais rápido para este tipo de arquivo
+    """
+    results = {}
+    
+    print_info(f"Benchmark de backends para {archive_type.upper()} ({sample_size} arquivos)...")
+    
+    for backend in available_backends(archive_type):
+        start = time.perf_counter()
+        file_list, read_func, handle = open_with_backend(archive_path, backend)
+        if file_list is None:
+            continue
+        
+        total_bytes = 0
+        count = 0
+        try:
+            for name in file_list:
+                if name.endswith('/'):
+                    continue
+                total_bytes += len(read_func(name))
+                count += 1
+                if count >= sample_size:
+                    break
+        except Exception as e:
+            print_warning(f"{backend}: falhou ({e})")
+            continue
+        finally:
+            try:
+                handle.close()
+            except:
+                pass
+        
+        elapsed = time.perf_counter() - start
+        results[backend] = elapsed
+        speed = total_bytes / 1024 / 1024 / elapsed if elapsed > 0 else 0
+        print(f"   {backend:10s}: {elapsed:7.3f}s  ({count} arquivos, {speed:.1f} MB/s)")
+    
+    if not results:
+        print_error("Nenhum backend funcionou")
+        return None
+    
+    fastest = min(results, key=results.get)
+    print_success(f"Backend mais rápido: {fastest}")
+    
+    cache = load_benchmark_cache()
+    cache[archive_type] = fastest
+    try:
+        BENCHMARK_CACHE.parent.mkdir(parents=True, exist_ok=True)
+        with open(BENCHMARK_CACHE, 'w', encoding='utf-8') as f:
+            json.dump(cache, f, indent=2)
+    except OSError as e:
+        print_warning(f"Não foi possível salvar o resultado: {e}")
+    
+    return fastest
+
+def restore_live2d_universal(archive_path, game_folder, encryption_key=None, backend=None):
     """Restaura arquivos Live2D de qualquer formato de arquivo"""
     
     archive_path = Path(archive_path)
@@ -136,19 +485,14 @@ def restore_live2d_universal(archive_path, game_folder, encryption_key=None):
     
     if not archive_type:
         print_error("Não foi possível detectar o tipo de arquivo!")
-        print_info("Extensões suportadas: .zip, .rar, .7z")
+        print_info("Extensões suportadas: .zip, .rar, .7z, .tar, .tar.gz, .tar.xz")
         return False
     
     print_success(f"Tipo detectado: {archive_type.upper()}")
     
     # Carrega chave de criptografia se não fornecida
     if not encryption_key:
-        system_paths = [
-            game_folder / 'data' / 'System.json',
-            game_folder / 'www' / 'data' / 'System.json'
-        ]
-        
-        for system_path in system_paths:
+        for system_path in system_json_paths(game_folder):
             if system_path.exists():
                 try:
                     with open(system_path, 'r', encoding='utf-8') as f:
@@ -165,43 +509,56 @@ def restore_live2d_universal(archive_path, game_folder, encryption_key=None):
         print_info("Arquivos criptografados não serão descriptografados")
     
     # Seleciona método de extração
-    print_info(f"Abrindo arquivo {archive_type.upper()}...")
-    
-    archive_handle = None
-    
-    if archive_type == 'zip':
-        file_list, read_func, archive_handle = extract_with_zipfile(archive_path)
-    elif archive_type == 'rar':
-        file_list, read_func, archive_handle = extract_with_rarfile(archive_path)
-    elif archive_type == '7z':
-        file_list, read_func, archive_handle = extract_with_py7zr(archive_path)
-    else:
+    if archive_type not in BACKEND_PREFERENCE:
         print_error(f"Formato não suportado: {archive_type}")
         return False
     
-    if file_list is None or read_func is None:
+    if not backend:
+        backend = select_backend(archive_type)
+    
+    if not backend:
+        print_error(f"Nenhum backend disponível para {archive_type.upper()}!")
+        print_info(f"Instale um de: {', '.join(BACKEND_PREFERENCE[archive_type])}")
         return False
     
-    # Filtra arquivos Live2D
-    live2d_files = [f for f in file_list if 'live2d' in f.lower() and not f.endswith('/')]
+    print_info(f"Abrindo arquivo {archive_type.upper()} (backend: {backend})...")
     
-    if not live2d_files:
-        print_error("Nenhum arquivo Live2D encontrado no arquivo!")
+    archive_handle = None
+    file_list, read_func, archive_handle = open_with_backend(archive_path, backend)
+    
+    if file_list is None or read_func is None:
         return False
     
-    print_success(f"{len(live2d_files)} arquivos Live2D encontrados")
+    # Backends em streaming (TAR) não conhecem a lista completa de antemão
+    streaming = getattr(archive_handle, 'streaming', False)
+    
+    # Filtra arquivos Live2D
+    if streaming:
+        live2d_files = (f for f in file_list if 'live2d' in f.lower() and not f.endswith('/'))
+        total = None
+        print_info("Modo streaming: filtragem, descriptografia e gravação em uma única passagem")
+    else:
+        live2d_files = [f for f in file_list if 'live2d' in f.lower() and not f.endswith('/')]
+        total = len(live2d_files)
+        
+        if not live2d_files:
+            print_error("Nenhum arquivo Live2D encontrado no arquivo!")
+            return False
+        
+        print_success(f"{total} arquivos Live2D encontrados")
     
     # Agrupa por tipo
     by_extension = {}
-    for f in live2d_files:
-        ext = Path(f).suffix.lower()
-        if ext not in by_extension:
-            by_extension[ext] = []
-        by_extension[ext].append(f)
-    
-    print(f"\n📊 Tipos de arquivo encontrados:")
-    for ext, files in sorted(by_extension.items()):
-        print(f"   {ext:20s}: {len(files):4d} arquivos")
+    if not streaming:
+        for f in live2d_files:
+            ext = Path(f).suffix.lower()
+            if ext not in by_extension:
+                by_extension[ext] = []
+            by_extension[ext].append(f)
+        
+        print(f"\n📊 Tipos de arquivo encontrados:")
+        for ext, files in sorted(by_extension.items()):
+            print(f"   {ext:20s}: {len(files):4d} arquivos")
     
     # Processa arquivos
     print(f"\n📤 Extraindo e processando arquivos...")
@@ -213,73 +570,91 @@ def restore_live2d_universal(archive_path, game_folder, encryption_key=None):
     
     key_bytes = bytes.fromhex(encryption_key) if encryption_key else None
     
-    for i, file_path in enumerate(live2d_files, 1):
-        try:
-            # Determina caminho de destino
-            parts = Path(file_path).parts
-            if 'img' in parts:
-                idx = parts.index('img')
-                relative_path = Path(*parts[idx:])
-            elif 'www' in parts and 'img' in parts:
-                idx = parts.index('www')
-                relative_path = Path(*parts[idx+1:])
-            else:
-                relative_path = Path(file_path)
-            
-            output_path = game_folder / relative_path
-            
-            # Cria diretórios
-            output_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            # Lê arquivo
-            data = read_func(file_path)
-            extracted += 1
-            
-            # Verifica se precisa descriptografar
-            needs_decrypt = False
-            if len(data) > 32 and data[:5] == b'RPGMV':
-                needs_decrypt = True
-            
-            # Descriptografa se necessário
-            if needs_decrypt and key_bytes:
-                # XOR nos bytes 16-31
-                encrypted_header = data[16:32]
-                unencrypted_body = data[32:]
+    # Em streaming a própria iteração lê o arquivo: um TAR truncado ou
+    # corrompido falha no for, fora do try de cada membro
+    try:
+        for i, file_path in enumerate(live2d_files, 1):
+            try:
+                # Determina caminho de destino
+                parts = Path(file_path).parts
+                if 'img' in parts:
+                    idx = parts.index('img')
+                    relative_path = Path(*parts[idx:])
+                elif 'www' in parts and 'img' in parts:
+                    idx = parts.index('www')
+                    relative_path = Path(*parts[idx+1:])
+                else:
+                    relative_path = Path(file_path)
                 
-                decrypted_header = bytes([encrypted_header[i] ^ key_bytes[i] for i in range(16)])
-                final_data = decrypted_header + unencrypted_body
+                output_path = game_folder / relative_path
                 
-                # Ajusta extensão
-                if output_path.suffix in ['.json_', '.rpgmvj']:
-                    output_path = output_path.with_suffix('.json')
-                elif output_path.suffix in ['.png_', '.rpgmvp']:
-                    output_path = output_path.with_suffix('.png')
-                elif output_path.suffix in ['.moc_', '.moc3_']:
-                    output_path = output_path.with_suffix('.moc3')
+                # Cria diretórios
+                output_path.parent.mkdir(parents=True, exist_ok=True)
                 
-                data = final_data
-                decrypted += 1
-            
-            # Salva arquivo
-            with open(output_path, 'wb') as f:
-                f.write(data)
-            
-            copied += 1
+                # Lê arquivo
+                data = read_func(file_path)
+                extracted += 1
+                
+                # Verifica se precisa descriptografar
+                needs_decrypt = False
+                if len(data) > 32 and data[:5] == b'RPGMV':
+                    needs_decrypt = True
+                
+                # Descriptografa se necessário
+                if needs_decrypt and key_bytes:
+                    # XOR nos bytes 16-31
+                    final_data = xor_header(data, key_bytes)
+                    
+                    # Ajusta extensão
+                    if output_path.suffix in ['.json_', '.rpgmvj']:
+                        output_path = output_path.with_suffix('.json')
+                    elif output_path.suffix in ['.png_', '.rpgmvp']:
+                        output_path = output_path.with_suffix('.png')
+                    elif output_path.suffix in ['.moc_', '.moc3_']:
+                        output_path = output_path.with_suffix('.moc3')
+                    
+                    data = final_data
+                    decrypted += 1
+                
+                # Salva arquivo
+                with open(output_path, 'wb') as f:
+                    f.write(data)
+                
+                copied += 1
+                
+                if streaming:
+                    by_extension.setdefault(Path(file_path).suffix.lower(), []).append(file_path)
+                
+                # Mostra progresso a cada 50 arquivos
+                if copied % 50 == 0:
+                    if total:
+                        progress = (i / total) * 100
+                        print(f"   ⏳ Progresso: {progress:.1f}% ({copied}/{total})")
+                    else:
+                        print(f"   ⏳ Progresso: {copied} arquivos")
             
-            # Mostra progresso a cada 50 arquivos
-            if copied % 50 == 0:
-                progress = (i / len(live2d_files)) * 100
-                print(f"   ⏳ Progresso: {progress:.1f}% ({copied}/{len(live2d_files)})")
+            except Exception as e:
+                errors.append((file_path, str(e)))
         
-        except Exception as e:
-            errors.append((file_path, str(e)))
-    
-    # Fecha o arquivo compactado
-    if archive_handle is not None:
-        try:
-            archive_handle.close()
-        except:
-            pass
+    except STREAM_ERRORS as e:
+        errors.append((archive_path.name, f"leitura interrompida: {e}"))
+        print_error(f"Arquivo truncado ou corrompido, leitura interrompida: {e}")
+    finally:
+        # Fecha o arquivo compactado (e encerra o bsdtar/7z/unrar)
+        if archive_handle is not None:
+            try:
+                archive_handle.close()
+            except:
+                pass
+    
+    if streaming:
+        if not extracted and not errors:
+            print_error("Nenhum arquivo Live2D encontrado no arquivo!")
+            return False
+        
+        print(f"\n📊 Tipos de arquivo encontrados:")
+        for ext, files in sorted(by_extension.items()):
+            print(f"   {ext:20s}: {len(files):4d} arquivos")
     
     # Resultados
     print(f"\n{'='*70}")
@@ -311,44 +686,56 @@ def restore_live2d_universal(archive_path, game_folder, encryption_key=None):
 def main():
     print(f"{Color.BOLD}{Color.CYAN}")
     print("╔═══════════════════════════════════════════════════════════════════╗")
-    print("║           RESTAURAR LIVE2D - UNIVERSAL (ZIP/RAR/7Z)              ║")
+    print("║         RESTAURAR LIVE2D - UNIVERSAL (ZIP/RAR/7Z/TAR)            ║")
     print("╚═══════════════════════════════════════════════════════════════════╝")
     print(f"{Color.ENDC}")
     
-    if len(sys.argv) < 3:
-        print("Uso: python restaurar_live2d_universal.py <arquivo> <pasta_jogo> [chave]")
+    # Opções: --backend=NOME força um backend, --benchmark mede e salva o mais rápido
+    options = [a for a in sys.argv[1:] if a.startswith('--')]
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    
+    backend = None
+    run_benchmark = False
+    for option in options:
+        if option.startswith('--backend='):
+            backend = option.split('=', 1)[1]
+        elif option == '--benchmark':
+            run_benchmark = True
+    
+    if len(args) < 2:
+        print("Uso: python restaurar_live2d_universal.py <arquivo> <pasta_jogo> [chave] [--backend=NOME] [--benchmark]")
         print("\nExemplos:")
         print("  python restaurar_live2d_universal.py deathzone.zip /sdcard/joiplay/deathzone")
         print("  python restaurar_live2d_universal.py deathzone.rar ~/deathzone")
         print("  python restaurar_live2d_universal.py deathzone.7z /storage/emulated/0/deathzone")
-        print("\nFormatos suportados: ZIP, RAR, 7Z")
+        print("  python restaurar_live2d_universal.py deathzone.tar.xz ~/deathzone")
+        print("  python restaurar_live2d_universal.py deathzone.rar ~/deathzone --benchmark")
+        print("\nFormatos suportados: ZIP, RAR, 7Z, TAR (.tar, .tar.gz, .tar.xz, .tar.bz2)")
+        print("Backends: 7z, unrar, bsdtar (nativos) ou zipfile, rarfile, py7zr, tarfile (Python)")
         print("A chave é opcional - será lida do System.json se não fornecida")
         sys.exit(1)
     
-    archive_path = sys.argv[1]
-    game_folder = sys.argv[2]
-    encryption_key = sys.argv[3] if len(sys.argv) > 3 else None
+    archive_path = args[0]
+    game_folder = args[1]
+    encryption_key = args[2] if len(args) > 2 else None
     
     # Verifica dependências
     archive_type = detect_archive_type(archive_path)
     
-    if archive_type == 'rar':
-        try:
-            import rarfile
-        except ImportError:
-            print_error("Biblioteca 'rarfile' necessária para arquivos RAR!")
-            print_info("Instale com: pip install rarfile --break-system-packages")
-            sys.exit(1)
+    if archive_type and not available_backends(archive_type):
+        print_error(f"Nenhum backend disponível para arquivos {archive_type.upper()}!")
+        if archive_type == 'rar':
+            print_info("Instale 'unrar' ou 'bsdtar' (pkg install unrar / pkg install libarchive)")
+            print_info("Ou: pip install rarfile --break-system-packages")
+        elif archive_type == '7z':
+            print_info("Instale '7z' (pkg install p7zip)")
+            print_info("Ou: pip install py7zr --break-system-packages")
+        sys.exit(1)
     
-    elif archive_type == '7z':
-        try:
-            import py7zr
-        except ImportError:
-            print_error("Biblioteca 'py7zr' necessária para arquivos 7Z!")
-            print_info("Instale com: pip install py7zr --break-system-packages")
-            sys.exit(1)
+    if archive_type and run_benchmark and not backend:
+        backend = benchmark_backends(archive_path, archive_type)
     
-    success = restore_live2d_universal(archive_path, game_folder, encryption_key)
+    success = restore_live2d_universal(archive_path, game_folder, encryption_key, backend)
     
     if success:
         print(f"\n💡 DICA: Se o jogo ainda não funcionar:")
@@ -110,29 +110,37 @@ foreach ($file in $translatedFiles) {
     $originalRelativePath = $mappingHash[$file.Name]
     
     if ($originalRelativePath) {
-        $originalFullPath = Join-Path $sourceDir $originalRelativePath
-        
-        # Cria backup se necessário
-        if ($createBackup -and (Test-Path $originalFullPath)) {
-            $backupPath = "$originalFullPath.backup"
-            
-            # Se já existe backup, não sobrescreve
-            if (-not (Test-Path $backupPath)) {
-                Copy-Item -Path $originalFullPath -Destination $backupPath -Force
-                $backupCount++
-            }
+        # Imagens duplicadas agrupadas na coleta (coletar_imagens.py) voltam para todos os caminhos
+        $targetPaths = @($originalRelativePath)
+        if ($config.duplicates -and $config.duplicates.($file.Name)) {
+            $targetPaths += $config.duplicates.($file.Name)
         }
-        
-        # Garante que o diretório de destino existe
-        $destDir = Split-Path -Parent $originalFullPath
-        if (-not (Test-Path $destDir)) {
-            New-Item -ItemType Directory -Force -Path $destDir | Out-Null
+
+        foreach ($targetRelativePath in $targetPaths) {
+            $originalFullPath = Join-Path $sourceDir $targetRelativePath
+
+            # Cria backup se necessário
+            if ($createBackup -and (Test-Path $originalFullPath)) {
+                $backupPath = "$originalFullPath.backup"
+
+                # Se já existe backup, não sobrescreve
+                if (-not (Test-Path $backupPath)) {
+                    Copy-Item -Path $originalFullPath -Destination $backupPath -Force
+                    $backupCount++
+                }
+            }
+
+            # Garante que o diretório de destino existe
+            $destDir = Split-Path -Parent $originalFullPath
+            if (-not (Test-Path $destDir)) {
+                New-Item -ItemType Directory -Force -Path $destDir | Out-Null
+            }
+
+            # Copia o arquivo traduzido de volta
+            Copy-Item -Path $file.FullName -Destination $originalFullPath -Force
+            $restored++
         }
         
-        # Copia o arquivo traduzido de volta
-        Copy-Item -Path $file.FullName -Destination $originalFullPath -Force
-        $restored++
-        
         Write-Progress -Activity "Restaurando imagens" -Status "$counter de $($translatedFiles.Count)" -PercentComplete (($counter / $translatedFiles.Count) * 100)
     } else {
         $notFound += $file.Name
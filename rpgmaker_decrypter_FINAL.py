@@ -14,8 +14,51 @@ Este script implementa a descriptografia correta conforme documentação oficial
 import os
 import sys
 import json
+import time
 from pathlib import Path
 
+from metricas import Metrics
+from nucleo import (
+    TOOLKIT_DIR, ENCRYPTED_EXTENSIONS, STANDARD_HEADER, SIGNATURES,
+    system_json_paths, signature_ok, xor_header,
+)
+
+# Conjunto de falhas da última execução (para --repetir-falhas)
+FAILURES_NAME = 'falhas.json'
+
+# open() relativo a um descritor de pasta (Linux/Android; não existe no Windows)
+DIR_FD_SUPPORTED = os.open in os.supports_dir_fd
+
+# Diário do modo --consumir (origens removidas, reconstruíveis pelas saídas)
+CONSUME_JOURNAL = 'consumo.jsonl'
+
+# Folga de espaço livre que a descriptografia nunca consome
+SPACE_MARGIN = 64 * 1024 * 1024
+
+# Leitura de calibração do --plan
+CALIBRATION_FILES = 16
+CALIBRATION_BYTES = 16 * 1024 * 1024
+
+# Modos de --espelhar: arquivos não criptografados na raiz de saída
+MIRROR_MODES = ('symlink', 'hardlink')
+
+# Classe de erro a partir da mensagem de decrypt_file
+FAILURE_CLASSES = [
+    ('Arquivo muito pequeno', 'tamanho'),
+    ('Chave inválida', 'chave'),
+    ('Assinatura inválida', 'assinatura'),
+]
+
+def dir_opener(dir_fd):
+    """opener de open() que abre o nome relativo à pasta dir_fd"""
+    return lambda name, flags: os.open(name, flags, 0o666, dir_fd=dir_fd)
+
+def write_all(f, data):
+    """Grava tudo: um arquivo sem buffer pode aceitar só parte dos bytes por write()"""
+    view = memoryview(data)
+    while view:
+        view = view[f.write(view):]
+
 class RPGMakerDecrypter:
     def __init__(self, game_folder):
         self.game_folder = Path(game_folder)
@@ -25,32 +68,45 @@ class RPGMakerDecrypter:
             'failed': 0,
             'skipped': 0
         }
+        self.started = None
+        self.finished = None
         
-        # Mapeamento de extensões
-        self.encrypted_extensions = {
-            '.rpgmvp': '.png',
-            '.png_': '.png',
-            '.rpgmvo': '.ogg',
-            '.ogg_': '.ogg',
-            '.rpgmvm': '.m4a',
-            '.m4a_': '.m4a',
-        }
+        # Outras chaves encontradas nos scripts (pastas com chave própria)
+        self.extra_keys = []
         
-        # Assinaturas de arquivo
-        self.signatures = {
-            '.png': b'\x89\x50\x4E\x47\x0D\x0A\x1A\x0A',
-            '.ogg': b'OggS',
-            '.m4a': b'\x00\x00\x00\x20\x66\x74\x79\x70'  # ftyp
-        }
+        # Offset do XOR forçado (--offset=), ignora a detecção de perfil
+        self.forced_offset = None
+        
+        # Raiz de saída (--saida=): espelha o layout do jogo em outro lugar
+        self.output_root = None
+        
+        # Modo --consumir: remove cada origem assim que a saída é confirmada
+        self.consume = False
+        self.journal = None
+        
+        # Falhas da execução atual -> _toolkit/falhas.json
+        self.failures = []
+        
+        # Pastas de saída já criadas nesta execução e uso de dir_fd
+        self.created_dirs = set()
+        self.use_dir_fd = DIR_FD_SUPPORTED
+        
+        # Tempo, bytes e latência por fase (metricas.py)
+        self.metrics = Metrics()
+        
+        # Servidor de jobs (servidor.py): perfis que sobrevivem entre
+        # execuções, pedido de cancelamento e progresso (feitos, total)
+        self.profiles = None
+        self.cancel_event = None
+        self.on_progress = None
+        
+        # Mapeamento de extensões e assinaturas (nucleo.py)
+        self.encrypted_extensions = ENCRYPTED_EXTENSIONS
+        self.signatures = SIGNATURES
     
     def load_encryption_key(self):
         """Carrega chave do System.json"""
-        system_paths = [
-            self.game_folder / 'data' / 'System.json',
-            self.game_folder / 'www' / 'data' / 'System.json'
-        ]
-        
-        for system_path in system_paths:
+        for system_path in system_json_paths(self.game_folder):
             if system_path.exists():
                 try:
                     with open(system_path, 'r', encoding='utf-8') as f:
@@ -65,6 +121,17 @@ class RPGMakerDecrypter:
                 except Exception as e:
                     print(f"⚠️  Erro ao ler {system_path}: {e}")
         
+        print("❌ Chave de criptografia não encontrada no System.json!")
+        
+        # Chave fixa nos scripts (plugins, rpg_core.js, main.js)
+        print("🔍 Procurando candidatas nos scripts do jogo...")
+        from buscar_chave import find_encryption_key
+        found = find_encryption_key(self.game_folder)
+        if found:
+            self.encryption_key = found[0]
+            print(f"✅ Chave encontrada: {self.encryption_key}")
+            return True
+        
         print("❌ Chave de criptografia não encontrada!")
         return False
     
@@ -73,8 +140,6 @@ class RPGMakerDecrypter:
         Verifica se o arquivo tem header RPGMV padrão
         Header padrão: 52 50 47 4D 56 00 00 00 00 03 01 00 00 00 00 00
         """
-        standard_header = bytes.fromhex("5250474d56000000000301000000000000")
-        
         if len(data) < 16:
             return False, "Arquivo muito pequeno"
         
@@ -85,75 +150,297 @@ class RPGMakerDecrypter:
             return False, f"Header não é RPGMV: {header[:8].hex()}"
         
         # Avisa se não é o header padrão
-        if header != standard_header:
+        if header != STANDARD_HEADER:
             print(f"      ⚠️  Header customizado: {header.hex()}")
         
         return True, "OK"
     
-    def decrypt_file(self, input_path, output_path):
+    def signature_matches(self, output_ext, data):
+        """Confere a assinatura esperada para a extensão de saída"""
+        return signature_ok(output_ext, data)
+    
+    def candidate_keys(self):
+        """Chaves testadas na detecção de perfil (System.json + literais dos scripts)"""
+        keys = [self.encryption_key] if self.encryption_key else []
+        return keys + [k for k in self.extra_keys if k not in keys]
+    
+    def apply_profile(self, data, profile):
+        """
+        Descriptografa conforme o perfil
+        offset 16: header de 16 bytes + XOR nos bytes 16-31 (padrão MV/MZ)
+        offset 0:  sem header, XOR nos bytes 0-15
+        offset None: arquivo não criptografado (só a extensão)
+        """
+        offset = profile['offset']
+        if offset is None:
+            return data
+        
+        return xor_header(data, bytes.fromhex(profile['key']), offset)
+    
+    def detect_profile(self, head, output_ext):
+        """
+        Descobre o perfil de um arquivo a partir dos primeiros 32 bytes
+        (mesmos testes de offset 0/16 do analyze_file_deep)
+        """
+        if self.signature_matches(output_ext, head):
+            return {'offset': None, 'key': None, 'header': None}
+        
+        for key in self.candidate_keys():
+            for offset in (16, 0):
+                profile = {'offset': offset, 'key': key, 'header': head[:offset].hex() or None}
+                if self.signature_matches(output_ext, self.apply_profile(head, profile)):
+                    return profile
+        
+        return None
+    
+    def learn_profiles(self, files_by_folder, samples=3):
+        """
+        Aprende o perfil de cada pasta com alguns arquivos de amostra
+        Retorna {pasta: perfil}; pastas sem perfil reconhecido ficam de fora
+        """
+        from collections import Counter
+        
+        profiles = {}
+        for folder, files in files_by_folder.items():
+            found = Counter()
+            by_key = {}
+            for file_path in files[:samples]:
+                try:
+                    head = self.read_source(file_path, 32)
+                except OSError:
+                    continue
+                
+                profile = self.detect_profile(head, self.encrypted_extensions[file_path.suffix])
+                if profile:
+                    key = (profile['offset'], profile['key'], profile['header'])
+                    found[key] += 1
+                    by_key[key] = profile
+            
+            if found:
+                profiles[folder] = by_key[found.most_common(1)[0][0]]
+        
+        return profiles
+    
+    def describe_profile(self, profile):
+        if profile is None:
+            return "desconhecido (cada arquivo será testado)"
+        if self.forced_offset is not None:
+            return f"forçado: XOR no byte {self.forced_offset}"
+        if profile['offset'] is None:
+            return "sem criptografia (só a extensão)"
+        if profile['offset'] == 0:
+            return "sem header, XOR nos bytes 0-15"
+        if bytes.fromhex(profile['header']) != STANDARD_HEADER:
+            return f"header customizado {profile['header']}"
+        return "padrão RPGMV"
+    
+    def read_source(self, file_path, size=-1):
+        """
+        Lê a origem (inteira ou só os primeiros size bytes)
+        
+        read_source, source_size e has_source são os únicos acessos à
+        origem fora do caminho com dir_fd: pacote_nw.py os troca para ler
+        de dentro do package.nw/Game.exe.
+        """
+        with open(file_path, 'rb') as f:
+            return f.read(size)
+    
+    def source_size(self, file_path):
+        return file_path.stat().st_size
+    
+    def has_source(self, file_path):
+        return file_path.exists()
+    
+    def open_folder(self, folder, files):
+        """
+        Prepara uma pasta para decrypt_file -> (fd da origem, fd da saída) ou None
+        
+        A pasta de saída é criada uma única vez por execução. Com os
+        descritores abertos cada arquivo é aberto só pelo nome, sem o FUSE
+        do /sdcard resolver o caminho inteiro a cada leitura e escrita.
+        Se algo falhar aqui, decrypt_file volta a usar caminhos (e registra
+        o erro por arquivo).
+        """
+        output_dir = self.output_path_for(files[0]).parent
+        try:
+            if output_dir not in self.created_dirs:
+                output_dir.mkdir(parents=True, exist_ok=True)
+                self.created_dirs.add(output_dir)
+            
+            if not self.use_dir_fd:
+                return None
+            
+            flags = os.O_RDONLY | getattr(os, 'O_DIRECTORY', 0)
+            source_fd = os.open(folder, flags)
+        except OSError:
+            return None
+        
+        try:
+            output_fd = os.open(output_dir, flags)
+        except OSError:
+            os.close(source_fd)
+            return None
+        return source_fd, output_fd
+    
+    def decrypt_file(self, input_path, output_path, profile=None, dirs=None):
         """
         Descriptografa arquivo RPG Maker MV/MZ
         
         IMPLEMENTAÇÃO CORRETA:
         1. Lê arquivo inteiro
-        2. Verifica header RPGMV (bytes 0-15)
-        3. Extrai bytes 16-31 (header original criptografado)
-        4. Faz XOR APENAS desses 16 bytes com a chave
-        5. Junta: [header descriptografado] + [resto do arquivo não criptografado]
+        2. Aplica o perfil da pasta (padrão: header de 16 bytes + XOR nos bytes 16-31)
+        3. Faz XOR APENAS de 16 bytes com a chave
+        4. Junta: [header descriptografado] + [resto do arquivo não criptografado]
+        5. Se a assinatura não conferir, detecta o perfil do próprio arquivo
+        
+        Com dirs (de open_folder) origem e saída são abertas pelo nome,
+        relativas às pastas, sem buffer: uma leitura e uma escrita do
+        arquivo inteiro.
         """
+        metrics = self.metrics
         try:
             # Lê arquivo
-            with open(input_path, 'rb') as f:
-                encrypted_data = f.read()
+            start = time.perf_counter()
+            if dirs:
+                with open(input_path.name, 'rb', buffering=0, opener=dir_opener(dirs[0])) as f:
+                    encrypted_data = f.read()
+            else:
+                encrypted_data = self.read_source(input_path)
+            metrics.record('leitura', time.perf_counter() - start, len(encrypted_data))
             
             if len(encrypted_data) < 32:
                 return False, "Arquivo muito pequeno"
             
-            # Verifica header RPGMV
-            is_valid, msg = self.verify_rpgmv_header(encrypted_data)
-            if not is_valid:
-                return False, msg
+            if profile is None:
+                profile = {'offset': 16, 'key': self.encryption_key, 'header': None}
             
-            # Converte chave hex para bytes
-            key_bytes = bytes.fromhex(self.encryption_key)
+            if profile['key'] and len(bytes.fromhex(profile['key'])) != 16:
+                return False, f"Chave inválida (tamanho: {len(bytes.fromhex(profile['key']))})"
             
-            if len(key_bytes) != 16:
-                return False, f"Chave inválida (tamanho: {len(key_bytes)})"
-            
-            # CRÍTICO: Extrai APENAS os 16 bytes criptografados
-            rpgmv_header = encrypted_data[0:16]      # Header RPGMV (não usar)
-            encrypted_header = encrypted_data[16:32]  # 16 bytes criptografados
-            unencrypted_body = encrypted_data[32:]    # Resto (não criptografado)
-            
-            # XOR nos 16 bytes criptografados
-            decrypted_header = bytearray()
-            for i in range(16):
-                decrypted_header.append(encrypted_header[i] ^ key_bytes[i])
+            expected_ext = output_path.suffix
+            start = time.perf_counter()
+            final_data = self.apply_profile(encrypted_data, profile)
+            metrics.record('xor', time.perf_counter() - start, len(final_data))
             
-            # Reconstrói arquivo: header descriptografado + corpo não criptografado
-            final_data = bytes(decrypted_header) + unencrypted_body
+            # Verifica assinatura; arquivo fora do perfil da pasta é detectado sozinho
+            start = time.perf_counter()
+            valid = self.signature_matches(expected_ext, final_data)
+            if not valid:
+                own_profile = self.detect_profile(encrypted_data[:32], expected_ext)
+                if own_profile is not None:
+                    metrics.count('perfil_proprio')
+                    final_data = self.apply_profile(encrypted_data, own_profile)
+                    valid = True
+            metrics.record('assinatura', time.perf_counter() - start)
             
-            # Verifica assinatura
-            expected_ext = output_path.suffix
-            if expected_ext in self.signatures:
-                expected_sig = self.signatures[expected_ext]
-                sig_len = len(expected_sig)
-                
-                if not final_data[:sig_len].startswith(expected_sig):
-                    actual_sig = final_data[:sig_len].hex()
-                    expected_sig_hex = expected_sig.hex()
-                    return False, f"Assinatura inválida: {actual_sig} != {expected_sig_hex}"
+            if not valid:
+                actual_sig = final_data[:8].hex()
+                expected_sig_hex = self.signatures.get(expected_ext, b'').hex()
+                return False, f"Assinatura inválida: {actual_sig} != {expected_sig_hex}"
             
             # Salva arquivo
-            output_path.parent.mkdir(parents=True, exist_ok=True)
-            with open(output_path, 'wb') as f:
-                f.write(final_data)
+            start = time.perf_counter()
+            if dirs:
+                f = open(output_path.name, 'wb', buffering=0, opener=dir_opener(dirs[1]))
+            else:
+                output_path.parent.mkdir(parents=True, exist_ok=True)
+                f = open(output_path, 'wb')
+            with f:
+                write_all(f, final_data)
+                # --consumir: a origem só pode sumir com a saída no disco
+                if self.consume:
+                    f.flush()
+                    os.fsync(f.fileno())
+            metrics.record('escrita', time.perf_counter() - start, len(final_data))
             
             return True, f"{len(final_data)} bytes"
             
         except Exception as e:
             return False, str(e)
     
+    def encrypt_data(self, data):
+        """
+        Criptografa no formato RPG Maker MV/MZ (operação inversa de decrypt_file)
+        Header RPGMV padrão + XOR nos primeiros 16 bytes + resto sem alteração
+        """
+        return STANDARD_HEADER + xor_header(data, bytes.fromhex(self.encryption_key), 0)
+    
+    def output_path_for(self, file_path, relative=None):
+        """
+        Saída de um arquivo criptografado
+        
+        Padrão: ao lado da origem. Com output_root, o mesmo caminho relativo
+        dentro da raiz de saída (outro disco, tmpfs, memória interna).
+        """
+        output_ext = self.encrypted_extensions[file_path.suffix]
+        if self.output_root is None:
+            return (self.game_folder / relative if relative else file_path).with_suffix(output_ext)
+        
+        if relative is None:
+            relative = file_path.relative_to(self.game_folder)
+        return self.output_root / relative.with_suffix(output_ext)
+    
+    def mirror_game(self, mode):
+        """
+        Espelha os arquivos não criptografados na raiz de saída
+        
+        symlink aponta para a origem; hardlink só funciona no mesmo sistema
+        de arquivos e cai para cópia nos outros casos. O System.json é
+        sempre copiado: ele é alterado por disable_encryption e um link
+        alteraria o do jogo original.
+        Retorna (linkados, copiados).
+        """
+        import shutil
+        from backup_encrypted import TOOLKIT_FOLDERS
+        
+        output_root = self.output_root.resolve()
+        linked = 0
+        copied = 0
+        
+        for root, dirs, files in os.walk(self.game_folder):
+            root_path = Path(root)
+            # Não desce nas pastas do toolkit nem na própria raiz de saída
+            dirs[:] = [
+                d for d in dirs
+                if d not in TOOLKIT_FOLDERS and (root_path / d).resolve() != output_root
+            ]
+            
+            relative_root = root_path.relative_to(self.game_folder)
+            target_root = self.output_root / relative_root
+            target_root.mkdir(parents=True, exist_ok=True)
+            
+            for file in files:
+                source = root_path / file
+                target = target_root / file
+                if Path(file).suffix in self.encrypted_extensions or os.path.lexists(target):
+                    continue
+                
+                if file in ('System.json', 'System.json.backup'):
+                    shutil.copy2(source, target)
+                    copied += 1
+                elif mode == 'symlink':
+                    os.symlink(source.resolve(), target)
+                    linked += 1
+                else:
+                    try:
+                        os.link(source, target)
+                        linked += 1
+                    except OSError:
+                        shutil.copy2(source, target)
+                        copied += 1
+        
+        return linked, copied
+    
+    def copy_system_json(self):
+        """Copia só o System.json para a raiz de saída (sem --espelhar)"""
+        import shutil
+        
+        for source in system_json_paths(self.game_folder):
+            if source.exists():
+                target = self.output_root / source.relative_to(self.game_folder)
+                target.parent.mkdir(parents=True, exist_ok=True)
+                shutil.copy2(source, target)
+    
     def find_encrypted_files(self):
         """Encontra todos os arquivos criptografados"""
         encrypted_files = []
@@ -173,12 +460,181 @@ class RPGMakerDecrypter:
         
         return encrypted_files
     
-    def decrypt_all(self):
-        """Descriptografa todos os arquivos"""
-        import time
+    def find_decrypted_outputs(self):
+        """
+        Encontra os arquivos gerados pela descriptografia
+        
+        Usa os próprios arquivos criptografados (inclusive os já movidos
+        para _backup_encrypted ou compactados no ZIP de backup) para saber
+        quais saídas são nossas.
+        """
+        outputs = []
+        sources = [(f, f.relative_to(self.game_folder)) for f in self.find_encrypted_files()]
+        
+        backup_folder = self.game_folder / '_backup_encrypted'
+        if backup_folder.exists():
+            for root, dirs, files in os.walk(backup_folder):
+                for file in files:
+                    file_path = Path(root) / file
+                    if file_path.suffix in self.encrypted_extensions:
+                        sources.append((file_path, file_path.relative_to(backup_folder)))
+            
+            # Backup compactado (backup_encrypted.py --compactado)
+            archive_path = backup_folder / 'backup_encrypted.zip'
+            if archive_path.exists():
+                import zipfile
+                with zipfile.ZipFile(archive_path) as zf:
+                    for name in zf.namelist():
+                        relative = Path(name)
+                        if relative.suffix in self.encrypted_extensions:
+                            sources.append((relative, relative))
+        
+        # Origens já removidas pelo --consumir
+        for entry in self.load_journal():
+            relative = Path(entry['source'])
+            sources.append((relative, relative))
+        
+        seen = set()
+        for file_path, relative in sources:
+            output_path = self.output_path_for(file_path, relative)
+            if output_path not in seen and output_path.exists():
+                seen.add(output_path)
+                outputs.append(output_path)
+        
+        return outputs
+    
+    def plan(self, encrypted_files, calibrate=False):
+        """
+        Plano da execução só com dados de diretório e stat
         
-        print("\n🔍 Procurando arquivos criptografados...")
-        encrypted_files = self.find_encrypted_files()
+        Cada saída tem o tamanho da origem - 16 (sem o header RPGMV); saídas
+        que já existem serão sobrescritas e só contam a diferença.
+        Com calibrate, lê alguns arquivos para estimar o tempo.
+        """
+        import random
+        
+        input_bytes = 0
+        output_bytes = 0
+        needed_bytes = 0
+        by_folder = {}
+        output_sizes = []
+        
+        for file_path in encrypted_files:
+            size = self.source_size(file_path)
+            output_size = max(0, size - 16)
+            output_sizes.append(output_size)
+            output_path = self.output_path_for(file_path)
+            try:
+                existing = output_path.stat().st_size
+            except OSError:
+                existing = 0
+            
+            input_bytes += size
+            output_bytes += output_size
+            needed_bytes += max(0, output_size - existing)
+            
+            folder = file_path.parent.relative_to(self.game_folder).as_posix()
+            by_folder[folder] = by_folder.get(folder, 0) + output_size
+        
+        free_bytes = self.free_space()
+        
+        # --consumir: cada origem sai logo depois da sua saída, o pico extra
+        # é a maior saída em andamento e não o jogo inteiro
+        if self.consume and encrypted_files:
+            needed_bytes = max(output_sizes)
+        
+        plan = {
+            'files': len(encrypted_files),
+            'input_bytes': input_bytes,
+            'output_bytes': output_bytes,
+            'needed_bytes': needed_bytes,
+            'free_bytes': free_bytes,
+            'fits': needed_bytes + SPACE_MARGIN <= free_bytes,
+            'by_folder': by_folder,
+            'estimated_seconds': None,
+        }
+        
+        if calibrate and encrypted_files:
+            # Lê alguns arquivos sorteados; a escrita é estimada com a mesma taxa
+            sample = random.sample(encrypted_files, min(CALIBRATION_FILES, len(encrypted_files)))
+            read_bytes = 0
+            files_read = 0
+            start = time.perf_counter()
+            for file_path in sample:
+                read_bytes += len(self.read_source(file_path, CALIBRATION_BYTES - read_bytes))
+                files_read += 1
+                if read_bytes >= CALIBRATION_BYTES:
+                    break
+            elapsed = time.perf_counter() - start
+            
+            if elapsed > 0 and read_bytes:
+                per_byte = elapsed / read_bytes
+                plan['estimated_seconds'] = (input_bytes + output_bytes) * per_byte
+                plan['calibration'] = {'files': files_read, 'bytes': read_bytes, 'seconds': round(elapsed, 4)}
+        
+        return plan
+    
+    def free_space(self):
+        """Espaço livre de onde as saídas vão ser gravadas"""
+        import shutil
+        
+        # A raiz de saída pode ainda não existir: usa o primeiro ancestral que existe
+        target = (self.output_root or self.game_folder).absolute()
+        while not target.exists() and target != target.parent:
+            target = target.parent
+        return shutil.disk_usage(target).free
+    
+    def fits_upper_bound(self, encrypted_files):
+        """
+        Confere o espaço com um stat por origem, sem olhar as saídas
+        
+        Conta toda saída como nova (limite superior do plan): se cabe assim,
+        cabe de verdade. Só quando não cabe o plan completo é necessário.
+        """
+        output_sizes = [max(0, self.source_size(f) - 16) for f in encrypted_files]
+        needed_bytes = max(output_sizes, default=0) if self.consume else sum(output_sizes)
+        return needed_bytes + SPACE_MARGIN <= self.free_space()
+    
+    def print_plan(self, plan):
+        mb = lambda n: n / 1024 / 1024
+        
+        print("\n" + "="*70)
+        print("📋 PLANO (sem alterar nada)")
+        print("="*70)
+        print(f"📦 Arquivos: {plan['files']}")
+        print(f"📥 Criptografados: {mb(plan['input_bytes']):.1f} MB")
+        print(f"📤 Saída (origem - 16 bytes por arquivo): {mb(plan['output_bytes']):.1f} MB")
+        print(f"💾 Espaço novo necessário: {mb(plan['needed_bytes']):.1f} MB")
+        print(f"🆓 Livre no destino: {mb(plan['free_bytes']):.1f} MB (folga mantida: {mb(SPACE_MARGIN):.0f} MB)")
+        
+        print("\n📂 Maiores pastas:")
+        for folder, size in sorted(plan['by_folder'].items(), key=lambda x: -x[1])[:5]:
+            print(f"   {folder:40s} {mb(size):8.1f} MB")
+        
+        if plan['estimated_seconds'] is not None:
+            seconds = plan['estimated_seconds']
+            print(f"\n⏱️  Tempo estimado: {seconds:.0f}s ({seconds / 60:.1f} min)")
+            print(f"   (calibração: {plan['calibration']['files']} arquivos, "
+                  f"{mb(plan['calibration']['bytes']):.1f} MB em {plan['calibration']['seconds']:.2f}s)")
+        
+        print("\n" + "="*70)
+        if plan['fits']:
+            print("✅ Cabe no espaço livre")
+        else:
+            print("❌ NÃO cabe: a descriptografia pararia no meio por falta de espaço")
+        print("="*70)
+    
+    def decrypt_all(self, encrypted_files=None):
+        """
+        Descriptografa todos os arquivos
+        
+        Com encrypted_files (ex.: conjunto de falhas) só esses são processados,
+        sem varrer o jogo.
+        """
+        if encrypted_files is None:
+            print("\n🔍 Procurando arquivos criptografados...")
+            with self.metrics.phase('descoberta'):
+                encrypted_files = self.find_encrypted_files()
         
         if not encrypted_files:
             print("❌ Nenhum arquivo criptografado encontrado!")
@@ -186,6 +642,15 @@ class RPGMakerDecrypter:
         
         print(f"📦 Encontrados: {len(encrypted_files)} arquivos")
         
+        # Recusa começar se o espaço acabaria no meio da execução; o plan
+        # completo (que também olha as saídas existentes) só quando está apertado
+        with self.metrics.phase('plano'):
+            plan = None if self.fits_upper_bound(encrypted_files) else self.plan(encrypted_files)
+        if plan is not None and not plan['fits']:
+            self.print_plan(plan)
+            print("💡 Libere espaço (ou use backup_encrypted.py --compactado) e tente de novo")
+            return False
+        
         # Agrupa por pasta
         files_by_folder = {}
         for file_path in encrypted_files:
@@ -195,41 +660,104 @@ class RPGMakerDecrypter:
             files_by_folder[folder].append(file_path)
         
         print(f"📂 Pastas: {len(files_by_folder)}")
+        
+        # Perfil (header, offset do XOR, chave) aprendido por pasta
+        if self.forced_offset is not None:
+            forced = {'offset': self.forced_offset, 'key': self.encryption_key, 'header': None}
+            profiles = {folder: forced for folder in files_by_folder}
+        else:
+            # Pastas com perfil já conhecido (self.profiles) não são amostradas de novo
+            known = self.profiles if self.profiles is not None else {}
+            profiles = {f: known[f] for f in files_by_folder if f in known}
+            missing = {f: files for f, files in files_by_folder.items() if f not in known}
+            if missing:
+                with self.metrics.phase('perfis'):
+                    profiles.update(self.learn_profiles(missing))
+            if self.profiles is not None:
+                self.profiles.update(profiles)
+        
+        # Pastas que a chave do System.json não abre: tenta as chaves dos scripts
+        unknown = {f: files for f, files in files_by_folder.items() if f not in profiles}
+        if unknown:
+            from buscar_chave import scan_key_literals, key_sources
+            self.extra_keys = sorted(scan_key_literals(key_sources(self.game_folder)))
+            if self.extra_keys:
+                print(f"🔑 {len(unknown)} pastas sem perfil: testando {len(self.extra_keys)} chaves dos scripts")
+                profiles.update(self.learn_profiles(unknown))
+        
         print("\n" + "="*70)
         print("🔓 DESCRIPTOGRAFIA CORRETA: XOR apenas nos primeiros 16 bytes")
         print("="*70)
         
         start_time = time.time()
+        self.started = time.strftime('%Y-%m-%dT%H:%M:%S')
         current_file = 0
         
         for folder, files in files_by_folder.items():
+            if self.cancelled():
+                break
+            
             relative_folder = folder.relative_to(self.game_folder)
             print(f"\n📁 {relative_folder} ({len(files)} arquivos)")
             
-            for file_path in files:
-                current_file += 1
-                
-                # Define arquivo de saída
-                output_ext = self.encrypted_extensions[file_path.suffix]
-                output_path = file_path.with_suffix(output_ext)
-                
-                # Progresso
-                progress = (current_file / len(encrypted_files)) * 100
-                print(f"  [{current_file}/{len(encrypted_files)}] ({progress:.1f}%) ", end='')
-                print(f"{file_path.name[:40]:40s} ", end='', flush=True)
-                
-                # Descriptografa
-                success, message = self.decrypt_file(file_path, output_path)
-                
-                if success:
-                    print(f"✅ {message}")
-                    self.stats['success'] += 1
-                else:
-                    print(f"❌ {message}")
-                    self.stats['failed'] += 1
+            profile = profiles.get(folder)
+            description = self.describe_profile(profile)
+            if description != "padrão RPGMV":
+                print(f"   🧬 Perfil: {description}")
+            
+            # Uma pasta por vez: cria a pasta de saída uma vez e abre as duas
+            # pastas uma vez; os arquivos são abertos pelo nome (dir_fd)
+            dirs = self.open_folder(folder, files)
+            try:
+                for file_path in files:
+                    if self.cancelled():
+                        break
+                    current_file += 1
+                    
+                    # Define arquivo de saída
+                    output_path = self.output_path_for(file_path)
+                    
+                    # Progresso
+                    progress = (current_file / len(encrypted_files)) * 100
+                    print(f"  [{current_file}/{len(encrypted_files)}] ({progress:.1f}%) ", end='')
+                    print(f"{file_path.name[:40]:40s} ", end='', flush=True)
+                    
+                    # Descriptografa
+                    success, message = self.decrypt_file(file_path, output_path, profile, dirs)
+                    
+                    if success and self.consume:
+                        start = time.perf_counter()
+                        consumed, note = self.consume_source(file_path, output_path)
+                        self.metrics.record('consumo', time.perf_counter() - start)
+                        message += f" | {note}"
+                        if consumed:
+                            self.metrics.count('consumidos')
+                    
+                    if success:
+                        print(f"✅ {message}")
+                        self.stats['success'] += 1
+                        self.metrics.count('sucesso')
+                    else:
+                        print(f"❌ {message}")
+                        self.stats['failed'] += 1
+                        self.metrics.count('falha')
+                        self.record_failure(file_path, message)
+                    
+                    if self.on_progress is not None:
+                        self.on_progress(current_file, len(encrypted_files))
+            finally:
+                if dirs:
+                    for fd in dirs:
+                        os.close(fd)
+        
+        self.write_failures()
+        if self.journal is not None:
+            self.journal.close()
+            self.journal = None
         
         # Resumo final
         total_time = time.time() - start_time
+        self.finished = time.strftime('%Y-%m-%dT%H:%M:%S')
         
         print("\n" + "="*70)
         print(f"⏱️  Tempo total: {total_time:.2f}s ({total_time/60:.1f} min)")
@@ -238,20 +766,215 @@ class RPGMakerDecrypter:
         print(f"⏭️  Ignorados: {self.stats['skipped']}")
         print("="*70)
         
+        # Cancelado: as saídas já gravadas ficam, System.json fica como está
+        if self.cancelled():
+            print(f"\n⏹️  Cancelado em {current_file}/{len(encrypted_files)}")
+            return False
+        
         if self.stats['failed'] > 0:
-            print("\n⚠️  Arquivos com falha podem ter:")
-            print("   - Header customizado (verifique rpg_core.js)")
-            print("   - Criptografia não-padrão (plugins)")
-            print("   - Chave incorreta")
+            by_class = {}
+            for failure in self.failures:
+                by_class[failure['error']] = by_class.get(failure['error'], 0) + 1
+            
+            print("\n⚠️  Falhas por tipo:")
+            for error_class, count in sorted(by_class.items(), key=lambda x: -x[1]):
+                print(f"   - {error_class}: {count}")
+            print(f"\n💾 Lista salva em: {self.failures_path().relative_to(self.game_folder)}")
+            print("💡 Repita só as falhas (ex.: com outra chave ou offset):")
+            print(f"   python rpgmaker_decrypter_FINAL.py {self.game_folder} --repetir-falhas [--chave=HEX] [--offset=0|16]")
+    
+    def cancelled(self):
+        return self.cancel_event is not None and self.cancel_event.is_set()
+    
+    def failures_path(self):
+        return self.game_folder / TOOLKIT_DIR / FAILURES_NAME
+    
+    def record_failure(self, file_path, message):
+        """Guarda caminho, classe do erro e os primeiros 32 bytes"""
+        error_class = 'erro'
+        for prefix, name in FAILURE_CLASSES:
+            if message.startswith(prefix):
+                error_class = name
+                break
+        
+        try:
+            head = self.read_source(file_path, 32).hex()
+        except OSError:
+            head = None
+        
+        self.failures.append({
+            'path': file_path.relative_to(self.game_folder).as_posix(),
+            'error': error_class,
+            'message': message,
+            'head': head,
+        })
+    
+    def write_failures(self):
+        """Grava o conjunto de falhas (ou apaga o anterior se não houve falhas)"""
+        path = self.failures_path()
+        if not self.failures:
+            if path.exists():
+                path.unlink()
+            return
+        
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'encryption_key': self.encryption_key,
+                'failures': self.failures,
+            }, f, ensure_ascii=False, indent=2)
+    
+    def load_failures(self):
+        """Arquivos do último conjunto de falhas que ainda existem"""
+        try:
+            with open(self.failures_path(), 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        
+        files = [self.game_folder / failure['path'] for failure in data.get('failures', [])]
+        return [f for f in files if self.has_source(f)]
+    
+    def journal_path(self):
+        return self.game_folder / TOOLKIT_DIR / CONSUME_JOURNAL
+    
+    def load_journal(self):
+        """Entradas do diário de consumo (vazio se não houver)"""
+        try:
+            with open(self.journal_path(), 'r', encoding='utf-8') as f:
+                return [json.loads(line) for line in f if line.strip()]
+        except (OSError, ValueError):
+            return []
+    
+    def consume_source(self, file_path, output_path):
+        """
+        Remove a origem de uma saída já gravada -> (removida, observação)
+        
+        Antes de remover: confere tamanho e assinatura da saída relida do
+        disco e grava no diário os bytes iniciais da origem. A origem é
+        prefixo + saída[16:] (só os 16 primeiros bytes da saída diferem),
+        então --desfazer-consumo reconstrói cada arquivo exatamente.
+        """
+        try:
+            source_size = file_path.stat().st_size
+            output_size = output_path.stat().st_size
+            with open(output_path, 'rb') as f:
+                head = f.read(16)
+            if not self.signature_matches(output_path.suffix, head):
+                return False, "origem mantida (saída não confere)"
+            
+            prefix_size = source_size - output_size + 16
+            with open(file_path, 'rb') as f:
+                prefix = f.read(prefix_size)
+                f.seek(prefix_size)
+                if f.read(64) != self.read_at(output_path, 16, 64):
+                    return False, "origem mantida (conteúdo difere)"
+            
+            if self.journal is None:
+                self.journal_path().parent.mkdir(parents=True, exist_ok=True)
+                self.journal = open(self.journal_path(), 'a', encoding='utf-8')
+            
+            # O diário vai para o disco antes da origem sumir
+            self.journal.write(json.dumps({
+                'source': file_path.relative_to(self.game_folder).as_posix(),
+                'output': str(output_path),
+                'prefix': prefix.hex(),
+                'size': source_size,
+            }) + '\n')
+            self.journal.flush()
+            os.fsync(self.journal.fileno())
+            
+            os.remove(file_path)
+            return True, "origem removida"
+            
+        except OSError as e:
+            return False, f"origem mantida ({e})"
+    
+    def read_at(self, path, offset, size):
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            return f.read(size)
+    
+    def rollback_consume(self):
+        """
+        Desfaz o --consumir: reconstrói cada origem (prefixo do diário +
+        saída[16:]), e só então remove a saída, na ordem inversa - o espaço
+        extra continua limitado a um arquivo. Retorna (restaurados, erros).
+        """
+        entries = self.load_journal()
+        restored = 0
+        pending = []
+        
+        for entry in reversed(entries):
+            source = self.game_folder / entry['source']
+            output = Path(entry['output'])
+            try:
+                if not source.exists():
+                    with open(output, 'rb') as f:
+                        f.seek(16)
+                        tail = f.read()
+                    data = bytes.fromhex(entry['prefix']) + tail
+                    if len(data) != entry['size']:
+                        raise ValueError(f"tamanho {len(data)} != {entry['size']}")
+                    
+                    tmp_path = source.with_name(source.name + '.tmp')
+                    source.parent.mkdir(parents=True, exist_ok=True)
+                    with open(tmp_path, 'wb') as f:
+                        f.write(data)
+                        f.flush()
+                        os.fsync(f.fileno())
+                    os.replace(tmp_path, source)
+                
+                if output.exists():
+                    os.remove(output)
+                restored += 1
+            except (OSError, ValueError) as e:
+                print(f"  ❌ {entry['source']} - Erro: {e}")
+                pending.append(entry)
+        
+        # Mantém no diário só o que não foi restaurado
+        path = self.journal_path()
+        if pending:
+            with open(path, 'w', encoding='utf-8') as f:
+                for entry in reversed(pending):
+                    f.write(json.dumps(entry) + '\n')
+        elif path.exists():
+            path.unlink()
+        
+        # Flags de criptografia voltam com o backup do System.json
+        if restored and not pending:
+            import shutil
+            for system_path in system_json_paths(self.game_folder):
+                backup_path = system_path.with_suffix('.json.backup')
+                if backup_path.exists():
+                    shutil.copy2(backup_path, system_path)
+                    print(f"✅ {system_path.name} restaurado do backup")
+        
+        return restored, len(pending)
+    
+    def write_state(self):
+        """Grava _toolkit/estado.json para a verificação rápida de status"""
+        from estado_jogo import write_state
+        
+        write_state(
+            self.output_root or self.game_folder,
+            engine='rpgmaker_decrypter_FINAL',
+            encryption_key=self.encryption_key,
+            started=self.started,
+            finished=self.finished,
+            success=self.stats['success'],
+            failed=self.stats['failed'],
+        )
     
     def disable_encryption(self):
-        """Desativa flags de criptografia no System.json"""
-        system_paths = [
-            self.game_folder / 'data' / 'System.json',
-            self.game_folder / 'www' / 'data' / 'System.json'
-        ]
+        """
+        Desativa flags de criptografia no System.json
         
-        for system_path in system_paths:
+        Com output_root só a cópia da raiz de saída é alterada: o jogo
+        original continua criptografado e jogável.
+        """
+        target = self.output_root or self.game_folder
+        for system_path in system_json_paths(target):
             if system_path.exists():
                 try:
                     with open(system_path, 'r', encoding='utf-8') as f:
@@ -277,45 +1000,184 @@ class RPGMakerDecrypter:
                     print(f"⚠️  Erro ao atualizar {system_path}: {e}")
 
 
+def usage():
+    print("\n❌ Uso: python rpgmaker_decrypter_FINAL.py /caminho/para/jogo [opções]")
+    print("\nExemplo:")
+    print("  python rpgmaker_decrypter_FINAL.py /sdcard/joiplay/deathzone")
+    print("  python rpgmaker_decrypter_FINAL.py /sdcard/joiplay/jogo/Game.exe --espelhar=symlink")
+    print("\nO jogo pode estar empacotado (package.nw, .zip ou ZIP anexado ao Game.exe):")
+    print("o pacote é lido no lugar e a saída vai para <pacote>_descriptografado/ (ou --saida=).")
+    print("\nOpções:")
+    print("  --otimizar-png     recomprime os PNGs gerados (sem perdas) após descriptografar")
+    print("  --repetir-falhas   reprocessa só os arquivos de _toolkit/falhas.json (alias: --retry-failed)")
+    print("  --chave=HEX        usa esta chave em vez da do System.json")
+    print("  --offset=0|16      força a posição do XOR (sem detecção de perfil)")
+    print("  --plan             só mostra espaço necessário/livre e tempo estimado")
+    print("  --consumir         remove cada origem assim que a saída é gravada e conferida (alias: --consume)")
+    print("  --desfazer-consumo reconstrói as origens removidas pelo --consumir (alias: --rollback)")
+    print("  --saida=PASTA      grava as saídas em outra pasta, mesmo layout do jogo (alias: --output-root=)")
+    print("  --espelhar=MODO    com --saida, espelha o resto do jogo: symlink ou hardlink (alias: --mirror=)")
+    print("                     (pacote: copia os outros membros, o modo é ignorado)")
+    print("  --metricas         mostra tempo, bytes e latência por fase")
+    print("  --metrics-json=ARQ salva as métricas em JSON")
+    print("  --profile          roda dentro do cProfile (salva _toolkit/perfil.prof)")
+
+
 def main():
     print("="*70)
     print("  RPG Maker MV/MZ Decrypter - VERSÃO FINAL")
     print("  Implementação correta: XOR apenas nos primeiros 16 bytes")
     print("="*70)
     
-    if len(sys.argv) < 2:
-        print("\n❌ Uso: python rpgmaker_decrypter_FINAL.py /caminho/para/jogo")
-        print("\nExemplo:")
-        print("  python rpgmaker_decrypter_FINAL.py /sdcard/joiplay/deathzone")
+    options = [a for a in sys.argv[1:] if a.startswith('--')]
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    
+    if len(args) < 1:
+        usage()
         sys.exit(1)
     
-    game_folder = sys.argv[1]
+    game_folder = args[0]
     
-    if not os.path.isdir(game_folder):
+    # package.nw, .zip ou Game.exe com ZIP anexado: lido no lugar
+    from pacote_nw import find_container
+    container = find_container(game_folder)
+    
+    if container is None and not os.path.isdir(game_folder):
         print(f"❌ Pasta não encontrada: {game_folder}")
         sys.exit(1)
     
     print(f"\n📁 Jogo: {game_folder}\n")
     
-    decrypter = RPGMakerDecrypter(game_folder)
+    key_override = None
+    metrics_json = None
+    mirror_mode = None
+    forced_offset = None
+    output_root = None
+    for option in options:
+        if option.startswith('--chave='):
+            key_override = option.split('=', 1)[1].strip().lower()
+        elif option.startswith('--offset='):
+            value = option.split('=', 1)[1]
+            if value not in ('0', '16'):
+                print(f"\n❌ --offset inválido: {value!r} (use 0 ou 16)")
+                usage()
+                sys.exit(1)
+            forced_offset = int(value)
+        elif option.startswith('--metrics-json='):
+            metrics_json = option.split('=', 1)[1]
+        elif option.startswith(('--saida=', '--output-root=')):
+            output_root = Path(option.split('=', 1)[1]).expanduser()
+        elif option.startswith(('--espelhar=', '--mirror=')):
+            mirror_mode = option.split('=', 1)[1]
     
-    # Carrega chave
-    if not decrypter.load_encryption_key():
-        print("\n💡 Procure por 'encryptionKey' no arquivo data/System.json")
-        sys.exit(1)
+    if container is not None:
+        # A saída faz o papel da pasta do jogo; as origens vêm do pacote
+        from pacote_nw import ContainerDecrypter, default_output
+        if '--consumir' in options or '--consume' in options or '--desfazer-consumo' in options or '--rollback' in options:
+            print("❌ --consumir/--desfazer-consumo não se aplicam a um pacote (o ZIP não é alterado)")
+            sys.exit(1)
+        
+        output_folder = output_root or default_output(container)
+        decrypter = ContainerDecrypter(container, output_folder)
+        print(f"📦 Pacote: {container} (raiz '{decrypter.container.root or '/'}', {len(decrypter.members)} criptografados)")
+        print(f"📤 Saída: {output_folder}\n")
+        if mirror_mode and mirror_mode not in MIRROR_MODES:
+            print(f"❌ Modo de --espelhar inválido: {' | '.join(MIRROR_MODES)}")
+            sys.exit(1)
+    else:
+        decrypter = RPGMakerDecrypter(game_folder)
+        decrypter.output_root = output_root
+        if mirror_mode and (output_root is None or mirror_mode not in MIRROR_MODES):
+            print(f"❌ --espelhar precisa de --saida=PASTA e um modo: {' | '.join(MIRROR_MODES)}")
+            sys.exit(1)
+        
+        if output_root is not None:
+            print(f"📤 Saída: {output_root}\n")
+    
+    metrics = decrypter.metrics
+    decrypter.forced_offset = forced_offset
+    decrypter.consume = '--consumir' in options or '--consume' in options
     
-    # Descriptografa
-    decrypter.decrypt_all()
+    if '--desfazer-consumo' in options or '--rollback' in options:
+        print("↩️  Reconstruindo origens do diário de consumo...")
+        restored, errors = decrypter.rollback_consume()
+        print(f"\n✅ Restaurados: {restored} arquivos")
+        if errors:
+            print(f"❌ Erros: {errors} (mantidos em _toolkit/{CONSUME_JOURNAL})")
+        sys.exit(1 if errors else 0)
     
-    # Desativa criptografia
-    print()
-    decrypter.disable_encryption()
+    if '--plan' in options:
+        print("🔍 Procurando arquivos criptografados...")
+        plan = decrypter.plan(decrypter.find_encrypted_files(), calibrate=True)
+        decrypter.print_plan(plan)
+        sys.exit(0 if plan['fits'] else 1)
+    
+    def run():
+        # Carrega chave
+        with metrics.phase('chave'):
+            if key_override:
+                decrypter.encryption_key = key_override
+                print(f"🔑 Chave informada: {key_override}")
+            elif not decrypter.load_encryption_key():
+                print("\n💡 Procure por 'encryptionKey' no arquivo data/System.json")
+                sys.exit(1)
+        
+        # Descriptografa (tudo ou só o conjunto de falhas da última execução)
+        if '--repetir-falhas' in options or '--retry-failed' in options:
+            failed_files = decrypter.load_failures()
+            if failed_files is None:
+                print("❌ Nenhum conjunto de falhas encontrado (_toolkit/falhas.json)")
+                sys.exit(1)
+            print(f"🔁 Repetindo {len(failed_files)} arquivos com falha")
+            completed = decrypter.decrypt_all(failed_files)
+        else:
+            completed = decrypter.decrypt_all()
+        
+        # Sem espaço (nada gravado) ou cancelado: System.json fica como está
+        if completed is False:
+            sys.exit(1)
+        
+        # Raiz de saída (ou pacote): System.json sempre copiado e, com --espelhar, o resto do jogo
+        if decrypter.output_root is not None or container is not None:
+            with metrics.phase('espelho'):
+                if mirror_mode:
+                    linked, copied = decrypter.mirror_game(mirror_mode)
+                    print(f"\n🪞 Espelho ({mirror_mode}): {linked} linkados, {copied} copiados")
+                else:
+                    decrypter.copy_system_json()
+        
+        # Estágio opcional: recompressão sem perdas dos PNGs gerados
+        if '--otimizar-png' in options:
+            from otimizar_png import optimize_pngs
+            with metrics.phase('otimizar_png'):
+                png_files = [p for p in decrypter.find_decrypted_outputs() if p.suffix == '.png']
+                optimize_pngs(decrypter.game_folder, png_files)
+        
+        # Desativa criptografia
+        print()
+        with metrics.phase('system_json'):
+            decrypter.disable_encryption()
+        
+        # Estado para o teste_rapido.py (depois de tudo que altera o disco)
+        with metrics.phase('estado'):
+            decrypter.write_state()
+    
+    if '--profile' in options:
+        from metricas import run_profiled, PROFILE_NAME
+        run_profiled(run, decrypter.game_folder / TOOLKIT_DIR / PROFILE_NAME)
+    else:
+        run()
+    
+    if '--metricas' in options or '--profile' in options:
+        metrics.report()
+    if metrics_json:
+        metrics.dump_json(metrics_json)
+        print(f"💾 Métricas salvas em: {metrics_json}")
     
     print("\n🎉 Processo concluído!")
     print("🎮 Agora teste o jogo no JoiPlay")
     print("\n💡 Se ainda houver erros, execute:")
-    print("   python verificar_integridade.py /caminho/para/jogo")
-
+    print("   python rpgmtk.py verify /caminho/para/jogo")
 
 if __name__ == "__main__":
     main()
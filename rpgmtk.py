@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+rpgmtk - ponto de entrada único do toolkit
+
+    python rpgmtk.py <comando> [argumentos do comando]
+
+Cada comando é o main() de um dos scripts, importado só quando o comando
+é chamado: 'status' não carrega os motores de descriptografia, o SQLite
+nem as bibliotecas de RAR/7Z. Os scripts continuam funcionando sozinhos.
+
+--medir-inicio mede quanto a importação do comando (padrão: status) soma
+ao início do interpretador e falha se passar do orçamento.
+"""
+
+import os
+import sys
+import importlib
+
+# comando -> (módulo:função, descrição)
+COMMANDS = {
+    'decrypt': ('rpgmaker_decrypter_FINAL:main', 'descriptografa o jogo (--plan, --saida=, --consumir, ...)'),
+    'verify': ('rpgmtk:verify_main', 'confere a assinatura de todos os PNG/OGG descriptografados'),
+    'status': ('teste_rapido:main', 'verificação rápida: criptografado, parcial ou pronto'),
+    'diagnose': ('rpgmtk:diagnose_main', 'diagnóstico de um jogo (pasta) ou de um arquivo compactado'),
+    'restore': ('restaurar_live2d_universal:main', 'restaura Live2D de um ZIP/RAR/7Z/TAR original'),
+    'backup': ('backup_encrypted:main', 'backup dos criptografados (--hardlink, --compactado, --restaurar)'),
+    'watch': ('vigiar:main', 'vigia o jogo e descriptografa arquivos novos ou alterados'),
+    'update': ('atualizar_versao:main', 'atualiza de uma versão do jogo para outra só com o patch'),
+    'serve': ('servidor:main', 'servidor local de jobs (enviar, jobs, cancelar) com workers quentes'),
+}
+
+# Orçamento do que as importações do comando somam ao início do Python
+STARTUP_BUDGET = 0.100
+STARTUP_RUNS = 5
+
+
+def load_command(name):
+    """Importa o módulo do comando e devolve a função (sem executar)"""
+    module_name, function_name = COMMANDS[name][0].split(':')
+    if module_name == 'rpgmtk':
+        return globals()[function_name]
+    return getattr(importlib.import_module(module_name), function_name)
+
+
+def verify_main():
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    if not args:
+        print("❌ Uso: python rpgmtk.py verify /caminho/jogo")
+        sys.exit(1)
+
+    if not os.path.isdir(args[0]):
+        print(f"❌ Pasta não encontrada: {args[0]}")
+        sys.exit(1)
+
+    from decrypt_all_in_one import RPGMakerDecrypterAllInOne
+    checker = RPGMakerDecrypterAllInOne(args[0])
+    checker.verify_integrity()
+    sys.exit(1 if checker.stats['corrupted'] else 0)
+
+
+def diagnose_main():
+    """Pasta: diagnostico_avancado.py | arquivo: diagnostico_arquivo.py"""
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    if args and os.path.isfile(args[0]):
+        from diagnostico_arquivo import main
+    else:
+        from diagnostico_avancado import main
+    main()
+
+
+def median_run(command, runs):
+    import subprocess
+    import time
+
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, check=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+        times.append(time.perf_counter() - start)
+    return sorted(times)[len(times) // 2]
+
+
+def top_level_imports(command):
+    """-X importtime -> {módulo de primeiro nível: tempo acumulado em s}"""
+    import subprocess
+
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime'] + command,
+        capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)),
+    )
+    imports = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        _, cumulative, name = line.split('|')
+        if cumulative.strip().isdigit() and not name[1:].startswith(' '):
+            imports[name.strip()] = int(cumulative) / 1000000
+    return imports
+
+
+def measure_startup(name='status', runs=STARTUP_RUNS):
+    """
+    Tempo que o comando soma ao início do interpretador (mediana de runs)
+    -> (tempo extra, importações mais caras)
+    """
+    baseline = ['-c', 'pass']
+    command = ['-c', f'import rpgmtk; rpgmtk.load_command({name!r})']
+
+    extra = median_run([sys.executable] + command, runs) - median_run([sys.executable] + baseline, runs)
+
+    base_imports = top_level_imports(baseline)
+    imports = top_level_imports(command)
+    heaviest = sorted(
+        ((module, seconds) for module, seconds in imports.items() if module not in base_imports),
+        key=lambda item: -item[1],
+    )[:5]
+
+    return max(0.0, extra), heaviest
+
+
+def usage():
+    print("❌ Uso: python rpgmtk.py <comando> [argumentos]")
+    print("\nComandos:")
+    for name, (_, description) in COMMANDS.items():
+        print(f"  {name:10s} {description}")
+    print("\nOpções:")
+    print(f"  --medir-inicio[=COMANDO]  mede o custo de importação (padrão: status, orçamento {STARTUP_BUDGET * 1000:.0f} ms)")
+    print("\nExemplo:")
+    print("  python rpgmtk.py status /sdcard/joiplay/deathzone")
+
+
+def main():
+    if len(sys.argv) < 2:
+        usage()
+        sys.exit(1)
+
+    first = sys.argv[1]
+
+    if first.startswith(('--medir-inicio', '--startup')):
+        name = first.split('=', 1)[1] if '=' in first else 'status'
+        if name not in COMMANDS:
+            usage()
+            sys.exit(1)
+
+        extra, heaviest = measure_startup(name)
+        print(f"⏱️  Importação de '{name}': {extra * 1000:.1f} ms (orçamento: {STARTUP_BUDGET * 1000:.0f} ms)")
+        for module, seconds in heaviest:
+            print(f"   {module:30s} {seconds * 1000:7.1f} ms")
+
+        if extra > STARTUP_BUDGET:
+            print("❌ Acima do orçamento: mova importações pesadas para dentro das funções")
+            sys.exit(1)
+        print("✅ Dentro do orçamento")
+        return
+
+    if first not in COMMANDS:
+        usage()
+        sys.exit(1)
+
+    # O comando vê os próprios argumentos como se fosse chamado direto
+    command = load_command(first)
+    sys.argv = [f"rpgmtk {first}"] + sys.argv[2:]
+    command()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,669 @@
+#!/usr/bin/env python3
+"""
+Servidor local de jobs: descriptografa, verifica e restaura sem abrir um
+interpretador novo por jogo
+
+    python servidor.py [--porta=8765 | --socket=/caminho/rpgmtk.sock] [--workers=2]
+
+Os motores são importados uma vez, na partida, e os workers ficam vivos
+entre os jobs. Por jogo ficam em memória:
+  - a chave (relida só se o System.json mudar)
+  - os perfis aprendidos por pasta (a próxima execução não amostra de novo)
+  - o índice de criptografados por pasta, revalidado pelo mtime da pasta:
+    só pastas alteradas são listadas de novo
+Dois jobs do mesmo jogo nunca rodam ao mesmo tempo.
+
+API (JSON, só em 127.0.0.1 ou num socket Unix com permissão 0600). Para
+que uma página aberta no navegador não consiga enfileirar jobs: pedidos
+com Origin ou com Host que não seja 127.0.0.1/localhost são recusados, o
+POST exige Content-Type: application/json e, na porta TCP, cada requisição
+leva o token desta execução (Authorization: Bearer, lido pelo cliente de
+~/.rpgmaker_toolkit/servidor-<porta>.token, permissão 0600).
+
+    POST   /jobs               {"tipo": "decrypt|verify|restore", "jogo": ..., ...}
+    GET    /jobs               todos os jobs
+    GET    /jobs/<id>          estado, progresso e fim do log
+    DELETE /jobs/<id>          cancela (na fila: não roda; decrypt: para no próximo arquivo)
+    GET    /cache              jogos em memória
+
+Cliente na linha de comando (mesmas opções --porta/--socket):
+    python servidor.py enviar decrypt /jogo [--saida=PASTA] [--chave=HEX] [--offset=0|16] [--esperar]
+    python servidor.py enviar verify /jogo
+    python servidor.py enviar restore arquivo.zip /jogo
+    python servidor.py jobs [ID]
+    python servidor.py cancelar ID
+"""
+
+import os
+import sys
+import json
+import time
+import threading
+from pathlib import Path
+from collections import deque
+
+DEFAULT_PORT = 8765
+TOKEN_FOLDER = Path.home() / '.rpgmaker_toolkit'
+DEFAULT_WORKERS = 2
+JOB_TYPES = ('decrypt', 'verify', 'restore')
+
+# Pedaços de saída guardados por job e linhas devolvidas em GET /jobs/<id>
+LOG_CHUNKS = 2000
+LOG_TAIL = 20
+
+
+class JobOutput:
+    """
+    sys.stdout do servidor: o que um job imprime vai para o log dele
+
+    Os motores imprimem o progresso com print(); cada worker marca a thread
+    com o log do job atual e o resto (o próprio servidor) vai para o
+    terminal.
+    """
+
+    def __init__(self, terminal):
+        self.terminal = terminal
+        self.local = threading.local()
+
+    def write(self, text):
+        log = getattr(self.local, 'log', None)
+        if log is None:
+            return self.terminal.write(text)
+        log.append(text)
+        return len(text)
+
+    def flush(self):
+        if getattr(self.local, 'log', None) is None:
+            self.terminal.flush()
+
+    def __getattr__(self, name):
+        # encoding, isatty, fileno... do terminal
+        return getattr(self.terminal, name)
+
+
+def scan_cached(decrypter, index, profiles=None):
+    """
+    find_encrypted_files com índice em memória
+
+    index: {pasta: (mtime_ns, subpastas, criptografados)}. Uma pasta cujo
+    mtime não mudou não é listada de novo (criar ou apagar um arquivo
+    sempre muda o mtime da pasta). Com profiles, o perfil de uma pasta
+    listada de novo (ou que sumiu) é descartado e volta a ser amostrado.
+    """
+    encrypted_files = []
+    stack = [decrypter.game_folder / name for name in ('img', 'audio', 'movies')]
+    seen = set()
+
+    while stack:
+        folder = stack.pop()
+        try:
+            mtime = folder.stat().st_mtime_ns
+        except OSError:
+            continue
+        seen.add(folder)
+
+        cached = index.get(folder)
+        if cached is None or cached[0] != mtime:
+            subfolders = []
+            files = []
+            try:
+                with os.scandir(folder) as it:
+                    for entry in it:
+                        if entry.is_dir():
+                            subfolders.append(Path(entry.path))
+                        elif os.path.splitext(entry.name)[1] in decrypter.encrypted_extensions:
+                            files.append(Path(entry.path))
+            except OSError:
+                continue
+            cached = (mtime, subfolders, sorted(files))
+            index[folder] = cached
+            if profiles is not None:
+                profiles.pop(folder, None)
+
+        stack.extend(cached[1])
+        encrypted_files.extend(cached[2])
+
+    for folder in [f for f in index if f not in seen]:
+        del index[folder]
+        if profiles is not None:
+            profiles.pop(folder, None)
+    return encrypted_files
+
+
+class JobServer:
+    def __init__(self, workers=DEFAULT_WORKERS):
+        from concurrent.futures import ThreadPoolExecutor
+
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='job')
+        self.workers = workers
+        self.jobs = {}
+        self.games = {}
+        self.lock = threading.Lock()
+        self.next_id = 1
+        self.output = None
+
+    def warm_up(self):
+        """Importa os motores antes do primeiro job"""
+        import rpgmaker_decrypter_FINAL
+        import pacote_nw
+        import decrypt_all_in_one
+        import restaurar_live2d_universal
+
+    # --- jobs ---------------------------------------------------------------
+
+    def submit(self, request):
+        job_type = request.get('tipo')
+        if job_type not in JOB_TYPES:
+            raise ValueError(f"tipo inválido: {job_type!r} (use {', '.join(JOB_TYPES)})")
+        if not request.get('jogo'):
+            raise ValueError("falta 'jogo'")
+        if job_type == 'restore' and not request.get('arquivo'):
+            raise ValueError("restore precisa de 'arquivo'")
+        if request.get('offset') is not None and str(request['offset']) not in ('0', '16'):
+            raise ValueError(f"offset inválido: {request['offset']!r} (use 0 ou 16)")
+
+        with self.lock:
+            job_id = str(self.next_id)
+            self.next_id += 1
+            job = {
+                'id': job_id,
+                'tipo': job_type,
+                'jogo': str(Path(request['jogo']).expanduser().absolute()),
+                'pedido': request,
+                'estado': 'fila',
+                'feitos': 0,
+                'total': None,
+                'resultado': None,
+                'erro': None,
+                'criado': time.time(),
+                'inicio': None,
+                'fim': None,
+                'cancel': threading.Event(),
+                'log': deque(maxlen=LOG_CHUNKS),
+            }
+            self.jobs[job_id] = job
+
+        print(f"📥 Job {job_id}: {job_type} {job['jogo']}")
+        self.pool.submit(self.run_job, job)
+        return job
+
+    def cancel(self, job_id):
+        job = self.jobs.get(job_id)
+        if job is None:
+            return None
+        if job['estado'] in ('fila', 'rodando'):
+            job['cancel'].set()
+        return job
+
+    def game_cache(self, game_folder):
+        with self.lock:
+            return self.games.setdefault(game_folder, {
+                'lock': threading.Lock(),
+                'key': None,
+                'system_mtime': None,
+                'profiles': {},
+                'index': {},
+                'jobs': 0,
+            })
+
+    def run_job(self, job):
+        if job['cancel'].is_set():
+            job['estado'] = 'cancelado'
+            job['fim'] = time.time()
+            return
+
+        cache = self.game_cache(job['jogo'])
+        self.output.local.log = job['log']
+        try:
+            with cache['lock']:
+                if job['cancel'].is_set():
+                    job['estado'] = 'cancelado'
+                    return
+                job['estado'] = 'rodando'
+                job['inicio'] = time.time()
+                handler = getattr(self, f"run_{job['tipo']}")
+                job['resultado'] = handler(job, cache)
+                cache['jobs'] += 1
+                job['estado'] = 'cancelado' if job['cancel'].is_set() else 'concluido'
+        except SystemExit as e:
+            job['estado'] = 'falhou'
+            job['erro'] = f"saída {e.code}"
+        except Exception as e:
+            job['estado'] = 'falhou'
+            job['erro'] = f"{type(e).__name__}: {e}"
+        finally:
+            self.output.local.log = None
+            job['fim'] = time.time()
+            print(f"📤 Job {job['id']}: {job['estado']}")
+
+    def cached_key(self, decrypter, cache):
+        """Chave da memória; relida se o System.json mudou"""
+        from nucleo import find_system_json
+
+        system_path = find_system_json(decrypter.game_folder)
+        mtime = system_path.stat().st_mtime_ns if system_path else None
+
+        if cache['key'] is None or cache['system_mtime'] != mtime:
+            if not decrypter.load_encryption_key():
+                return False
+            # Chave nova: perfis da chave antiga não valem mais
+            if cache['key'] not in (None, decrypter.encryption_key):
+                cache['profiles'].clear()
+            cache['key'] = decrypter.encryption_key
+            cache['system_mtime'] = mtime
+        else:
+            decrypter.encryption_key = cache['key']
+            print(f"🔑 Chave em memória: {cache['key']}")
+        return True
+
+    def run_decrypt(self, job, cache):
+        from rpgmaker_decrypter_FINAL import RPGMakerDecrypter
+        from pacote_nw import find_container, ContainerDecrypter, default_output
+
+        request = job['pedido']
+        output_root = Path(request['saida']).expanduser() if request.get('saida') else None
+
+        container = find_container(job['jogo'])
+        if container is not None:
+            decrypter = ContainerDecrypter(container, output_root or default_output(container))
+        else:
+            decrypter = RPGMakerDecrypter(job['jogo'])
+            decrypter.output_root = output_root
+
+        if request.get('offset') is not None:
+            decrypter.forced_offset = int(request['offset'])
+        decrypter.profiles = cache['profiles']
+        decrypter.cancel_event = job['cancel']
+
+        def progress(done, total):
+            job['feitos'] = done
+            job['total'] = total
+        decrypter.on_progress = progress
+
+        if request.get('chave'):
+            decrypter.encryption_key = request['chave'].strip().lower()
+            decrypter.profiles = {}
+        elif not self.cached_key(decrypter, cache):
+            raise RuntimeError("chave de criptografia não encontrada")
+
+        if container is None:
+            with decrypter.metrics.phase('descoberta'):
+                files = scan_cached(decrypter, cache['index'], cache['profiles'])
+        else:
+            files = decrypter.find_encrypted_files()
+        job['total'] = len(files)
+
+        if not files:
+            print("❌ Nenhum arquivo criptografado encontrado!")
+            return {'sucesso': 0, 'falhas': 0}
+
+        completed = decrypter.decrypt_all(files)
+        # Pasta com falha: o perfil em memória pode ser o culpado, amostra de novo
+        for failure in decrypter.failures:
+            cache['profiles'].pop((decrypter.game_folder / failure['path']).parent, None)
+        if completed is not False:
+            if decrypter.output_root is not None or container is not None:
+                decrypter.copy_system_json()
+            print()
+            decrypter.disable_encryption()
+            decrypter.write_state()
+
+        return {'sucesso': decrypter.stats['success'], 'falhas': decrypter.stats['failed']}
+
+    def run_verify(self, job, cache):
+        from decrypt_all_in_one import RPGMakerDecrypterAllInOne
+
+        checker = RPGMakerDecrypterAllInOne(job['jogo'])
+        checker.verify_integrity()
+        return {'corrompidos': checker.stats['corrupted']}
+
+    def run_restore(self, job, cache):
+        from restaurar_live2d_universal import restore_live2d_universal
+
+        request = job['pedido']
+        # A chave do jogo já carregada por um decrypt serve de padrão
+        key = request.get('chave') or cache['key']
+        success = restore_live2d_universal(request['arquivo'], job['jogo'], key, request.get('backend'))
+        return {'restaurado': bool(success)}
+
+    # --- respostas ----------------------------------------------------------
+
+    def describe(self, job, log=False):
+        info = {name: job[name] for name in ('id', 'tipo', 'jogo', 'estado', 'feitos', 'total', 'resultado', 'erro')}
+        info['cancelamento'] = job['cancel'].is_set()
+        for name in ('criado', 'inicio', 'fim'):
+            info[name] = time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(job[name])) if job[name] else None
+        if job['inicio']:
+            info['segundos'] = round((job['fim'] or time.time()) - job['inicio'], 2)
+        if log:
+            info['log'] = ''.join(list(job['log'])).splitlines()[-LOG_TAIL:]
+        return info
+
+    def describe_cache(self):
+        return {
+            game: {
+                'chave': cache['key'],
+                'perfis': len(cache['profiles']),
+                'pastas_indexadas': len(cache['index']),
+                'jobs': cache['jobs'],
+            }
+            for game, cache in self.games.items()
+        }
+
+    def shutdown(self):
+        for job in self.jobs.values():
+            job['cancel'].set()
+        self.pool.shutdown(wait=True)
+
+
+def token_path(port):
+    return TOKEN_FOLDER / f'servidor-{port}.token'
+
+
+def write_token(port):
+    """Token novo a cada execução, legível só pelo usuário"""
+    import secrets
+
+    token = secrets.token_hex(32)
+    TOKEN_FOLDER.mkdir(parents=True, exist_ok=True)
+    path = token_path(port)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    os.fchmod(fd, 0o600)
+    with os.fdopen(fd, 'w') as f:
+        f.write(token)
+    return token
+
+
+def make_handler(server, allowed_hosts, token=None):
+    import hmac
+    from http.server import BaseHTTPRequestHandler
+
+    class Handler(BaseHTTPRequestHandler):
+        def reply(self, status, data):
+            body = json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def refuse(self):
+            """
+            Resposta de recusa (ou None se o pedido pode seguir)
+
+            Navegadores mandam Origin em pedidos de outra página e o Host do
+            nome que resolveram (DNS rebinding); o cliente da linha de
+            comando não manda Origin e conhece o token.
+            """
+            if self.headers.get('Origin') is not None:
+                return self.reply(403, {'erro': 'pedidos de navegador (Origin) são recusados'})
+            if self.headers.get('Host') not in allowed_hosts:
+                return self.reply(403, {'erro': f"Host recusado: {self.headers.get('Host')!r}"})
+            if token is not None:
+                sent = self.headers.get('Authorization', '')
+                if not hmac.compare_digest(sent.encode('utf-8'), f'Bearer {token}'.encode('utf-8')):
+                    return self.reply(401, {'erro': 'token ausente ou inválido'})
+            return None
+
+        def job_id(self):
+            parts = self.path.strip('/').split('/')
+            return parts[1] if len(parts) == 2 and parts[0] == 'jobs' else None
+
+        def do_GET(self):
+            if self.refuse() is not None:
+                return
+            if self.path.rstrip('/') == '/jobs':
+                return self.reply(200, [server.describe(job) for job in server.jobs.values()])
+            if self.path.rstrip('/') == '/cache':
+                return self.reply(200, server.describe_cache())
+
+            job = server.jobs.get(self.job_id())
+            if job is None:
+                return self.reply(404, {'erro': 'não encontrado'})
+            self.reply(200, server.describe(job, log=True))
+
+        def do_POST(self):
+            if self.refuse() is not None:
+                return
+            if self.path.rstrip('/') != '/jobs':
+                return self.reply(404, {'erro': 'não encontrado'})
+            if self.headers.get_content_type() != 'application/json':
+                return self.reply(415, {'erro': 'use Content-Type: application/json'})
+            try:
+                length = int(self.headers.get('Content-Length', 0))
+                request = json.loads(self.rfile.read(length) or b'{}')
+                job = server.submit(request)
+            except (ValueError, AttributeError) as e:
+                return self.reply(400, {'erro': str(e)})
+            self.reply(202, server.describe(job))
+
+        def do_DELETE(self):
+            if self.refuse() is not None:
+                return
+            job = server.cancel(self.job_id())
+            if job is None:
+                return self.reply(404, {'erro': 'não encontrado'})
+            self.reply(200, server.describe(job))
+
+        def log_message(self, format, *args):
+            # Os jobs já são anunciados pelo servidor; sem log por requisição
+            pass
+
+    return Handler
+
+
+def serve(port=DEFAULT_PORT, socket_path=None, workers=DEFAULT_WORKERS):
+    import socketserver
+    from http.server import ThreadingHTTPServer
+
+    server = JobServer(workers)
+    server.output = JobOutput(sys.stdout)
+    sys.stdout = server.output
+
+    print("="*70)
+    print("  SERVIDOR DE JOBS - RPG Maker Toolkit")
+    print("="*70)
+
+    start = time.perf_counter()
+    server.warm_up()
+    print(f"\n🔥 Motores carregados em {(time.perf_counter() - start) * 1000:.0f} ms, {workers} workers")
+
+    token = None
+    if socket_path:
+        class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+            daemon_threads = True
+
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        # O socket 0600 já restringe ao usuário: sem token
+        handler = make_handler(server, {'localhost'})
+        old_umask = os.umask(0o077)
+        try:
+            httpd = UnixHTTPServer(socket_path, handler)
+        finally:
+            os.umask(old_umask)
+        print(f"🔌 Socket: {socket_path}")
+    else:
+        token = write_token(port)
+        handler = make_handler(server, {f'127.0.0.1:{port}', f'localhost:{port}'}, token)
+        httpd = ThreadingHTTPServer(('127.0.0.1', port), handler)
+        print(f"🌐 http://127.0.0.1:{port}")
+        print(f"🔑 Token: {token_path(port)}")
+
+    # kill (SIGTERM) para como Ctrl+C: cancela os jobs e remove o socket
+    import signal
+
+    def stop(signum, frame):
+        raise KeyboardInterrupt
+    signal.signal(signal.SIGTERM, stop)
+
+    print("⏹️  Ctrl+C para parar\n")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        print("\n⏹️  Parando: cancelando jobs em andamento...")
+    finally:
+        httpd.server_close()
+        server.shutdown()
+        if socket_path and os.path.exists(socket_path):
+            os.unlink(socket_path)
+        if token is not None:
+            try:
+                token_path(port).unlink()
+            except OSError:
+                pass
+
+
+def request(method, path, data=None, port=DEFAULT_PORT, socket_path=None):
+    """
+    Chamada à API -> (status, resposta JSON)
+
+    PermissionError se o servidor recusar (token de outra execução...)
+    """
+    import http.client
+
+    if socket_path:
+        import socket
+
+        class UnixConnection(http.client.HTTPConnection):
+            def connect(self):
+                self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                self.sock.connect(socket_path)
+
+        connection = UnixConnection('localhost')
+        headers = {}
+    else:
+        connection = http.client.HTTPConnection('127.0.0.1', port)
+        try:
+            headers = {'Authorization': f'Bearer {token_path(port).read_text().strip()}'}
+        except OSError:
+            headers = {}
+
+    body = json.dumps(data).encode('utf-8') if data is not None else None
+    if body:
+        headers['Content-Type'] = 'application/json'
+    try:
+        connection.request(method, path, body=body, headers=headers)
+        response = connection.getresponse()
+        status, answer = response.status, json.loads(response.read() or b'null')
+    finally:
+        connection.close()
+
+    if status in (401, 403):
+        raise PermissionError(answer.get('erro') if isinstance(answer, dict) else status)
+    return status, answer
+
+
+def print_job(job):
+    progress = f"{job['feitos']}/{job['total']}" if job['total'] else '-'
+    print(f"  #{job['id']:4s} {job['tipo']:8s} {job['estado']:10s} {progress:>11s}  {job['jogo']}")
+
+
+def client(command, args, options, connection):
+    try:
+        if command == 'enviar':
+            if len(args) < 2 or args[0] not in JOB_TYPES:
+                print(f"❌ Uso: python servidor.py enviar <{'|'.join(JOB_TYPES)}> ...")
+                return 1
+
+            job_type = args[0]
+            data = {'tipo': job_type}
+            if job_type == 'restore':
+                if len(args) < 3:
+                    print("❌ Uso: python servidor.py enviar restore arquivo.zip /jogo [chave]")
+                    return 1
+                data['arquivo'] = os.path.abspath(args[1])
+                data['jogo'] = os.path.abspath(args[2])
+                if len(args) > 3:
+                    data['chave'] = args[3]
+            else:
+                data['jogo'] = os.path.abspath(args[1])
+
+            for option in options:
+                for name in ('saida', 'chave', 'offset', 'backend'):
+                    if option.startswith(f'--{name}='):
+                        value = option.split('=', 1)[1]
+                        data[name] = os.path.abspath(os.path.expanduser(value)) if name == 'saida' else value
+
+            status, job = request('POST', '/jobs', data, **connection)
+            if status != 202:
+                print(f"❌ {job.get('erro')}")
+                return 1
+            print(f"✅ Job {job['id']} na fila")
+
+            if '--esperar' not in options:
+                return 0
+
+            # Acompanha até terminar
+            while job['estado'] in ('fila', 'rodando'):
+                time.sleep(0.5)
+                _, job = request('GET', f"/jobs/{job['id']}", **connection)
+                if job['total']:
+                    print(f"\r  ⏳ {job['estado']} {job['feitos']}/{job['total']}", end='', flush=True)
+            print()
+            for line in job.get('log', []):
+                print(f"  | {line}")
+            print(f"{'✅' if job['estado'] == 'concluido' else '❌'} Job {job['id']}: {job['estado']} {job['resultado'] or job['erro'] or ''}")
+            return 0 if job['estado'] == 'concluido' else 1
+
+        if command == 'jobs':
+            if args:
+                status, job = request('GET', f'/jobs/{args[0]}', **connection)
+                if status != 200:
+                    print(f"❌ Job {args[0]} não encontrado")
+                    return 1
+                print(json.dumps(job, ensure_ascii=False, indent=2))
+                return 0
+            _, jobs = request('GET', '/jobs', **connection)
+            if not jobs:
+                print("📭 Nenhum job")
+            for job in jobs:
+                print_job(job)
+            return 0
+
+        if command == 'cancelar':
+            if not args:
+                print("❌ Uso: python servidor.py cancelar ID")
+                return 1
+            status, job = request('DELETE', f'/jobs/{args[0]}', **connection)
+            if status != 200:
+                print(f"❌ Job {args[0]} não encontrado")
+                return 1
+            print(f"⏹️  Job {job['id']}: cancelamento pedido ({job['estado']})")
+            return 0
+
+    except PermissionError as e:
+        print(f"❌ Servidor recusou o pedido: {e}")
+        return 1
+    except (ConnectionError, FileNotFoundError) as e:
+        print(f"❌ Servidor não respondeu: {e}")
+        print("💡 Inicie com: python servidor.py [--porta=N | --socket=CAMINHO]")
+        return 1
+
+    print(f"❌ Comando desconhecido: {command} (use enviar, jobs ou cancelar)")
+    return 1
+
+
+def main():
+    options = [a for a in sys.argv[1:] if a.startswith('--')]
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+
+    port = DEFAULT_PORT
+    socket_path = None
+    workers = DEFAULT_WORKERS
+    for option in options:
+        if option.startswith('--porta='):
+            port = int(option.split('=', 1)[1])
+        elif option.startswith('--socket='):
+            socket_path = os.path.expanduser(option.split('=', 1)[1])
+        elif option.startswith('--workers='):
+            workers = max(1, int(option.split('=', 1)[1]))
+
+    if args:
+        sys.exit(client(args[0], args[1:], options, {'port': port, 'socket_path': socket_path}))
+
+    serve(port, socket_path, workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,10 +5,17 @@ Teste Rápido - Verifica se o jogo já foi descriptografado
 
 import sys
 from pathlib import Path
-import json
 
-def check_game_status(game_folder):
-    """Verifica status de criptografia do jogo"""
+from nucleo import read_system_json
+from estado_jogo import load_state, verify_state, write_state
+
+def check_game_status(game_folder, full_scan=False):
+    """
+    Verifica status de criptografia do jogo
+    
+    Usa _toolkit/estado.json (gravado pela descriptografia) quando ele
+    confere com o disco; senão faz a contagem completa pelo catálogo.
+    """
     game_folder = Path(game_folder)
     
     print("="*70)
@@ -17,26 +24,14 @@ def check_game_status(game_folder):
     print(f"\n📁 Jogo: {game_folder}\n")
     
     # Verifica System.json
-    system_paths = [
-        game_folder / 'data' / 'System.json',
-        game_folder / 'www' / 'data' / 'System.json'
-    ]
-    
-    system_data = None
-    for system_path in system_paths:
-        if system_path.exists():
-            try:
-                with open(system_path, 'r', encoding='utf-8') as f:
-                    system_data = json.load(f)
-                print(f"✅ System.json encontrado")
-                break
-            except:
-                pass
+    _, system_data = read_system_json(game_folder)
     
     if not system_data:
         print("❌ System.json não encontrado!")
         return
     
+    print(f"✅ System.json encontrado")
+    
     # Status de criptografia
     has_encrypted_images = system_data.get('hasEncryptedImages', False)
     has_encrypted_audio = system_data.get('hasEncryptedAudio', False)
@@ -49,22 +44,35 @@ def check_game_status(game_folder):
     if encryption_key:
         print(f"   Chave: {encryption_key}")
     
-    # Conta arquivos
-    encrypted_count = 0
-    decrypted_count = 0
-    
-    encrypted_exts = ['.png_', '.ogg_', '.rpgmvp', '.rpgmvo', '.rpgmvm']
-    decrypted_exts = ['.png', '.ogg', '.m4a']
+    # Estado gravado pela descriptografia: confirmado por amostragem
+    counts = None
+    state = None if full_scan else load_state(game_folder)
     
-    print(f"\n🔍 Contando arquivos...")
-    
-    for root, dirs, files in game_folder.rglob('*'):
-        if root.is_file():
-            if any(str(root).endswith(ext) for ext in encrypted_exts):
-                encrypted_count += 1
-            elif any(str(root).endswith(ext) for ext in decrypted_exts):
-                if 'img/' in str(root) or 'audio/' in str(root):
-                    decrypted_count += 1
+    if state:
+        print(f"\n⚡ Conferindo estado salvo ({state['written']})...")
+        reason, checked = verify_state(game_folder, state, encryption_key)
+        if reason:
+            print(f"   ⚠️  Estado desatualizado: {reason}")
+        else:
+            counts = state['counts']
+            print(f"   ✅ Confirmado: {len(state['folders'])} pastas, {checked} arquivos amostrados")
+    
+    if counts is None:
+        # Conta arquivos (consulta indexada no catálogo incremental)
+        # sqlite3 só é importado aqui: o caminho rápido não paga por ele
+        from catalogo_assets import AssetCatalog
+        
+        print(f"\n🔍 Contando arquivos...")
+        
+        with AssetCatalog(game_folder) as catalog:
+            catalog.update()
+            counts = catalog.media_counts()
+        
+        # Próximas verificações voltam a ser instantâneas
+        write_state(game_folder)
+    
+    encrypted_count = counts['encrypted']
+    decrypted_count = counts['decrypted']
     
     print(f"\n📦 Arquivos encontrados:")
     print(f"   Criptografados: {encrypted_count}")
@@ -95,17 +103,21 @@ def check_game_status(game_folder):
 
 
 def main():
-    if len(sys.argv) < 2:
-        print("❌ Uso: python teste_rapido.py /caminho/para/jogo")
+    options = [a for a in sys.argv[1:] if a.startswith('--')]
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    
+    if not args:
+        print("❌ Uso: python teste_rapido.py /caminho/para/jogo [--completo]")
+        print("\n  --completo   ignora o estado salvo e conta todos os arquivos")
         sys.exit(1)
     
-    game_folder = sys.argv[1]
+    game_folder = args[0]
     
     if not Path(game_folder).is_dir():
         print(f"❌ Pasta não encontrada: {game_folder}")
         sys.exit(1)
     
-    check_game_status(game_folder)
+    check_game_status(game_folder, full_scan='--completo' in options)
 
 
 if __name__ == "__main__":
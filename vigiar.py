@@ -0,0 +1,381 @@
+#!/usr/bin/env python3
+"""
+Modo vigia: descriptografa arquivos novos ou alterados assim que chegam
+
+Para atualizações copiadas para o aparelho ou ferramentas que gravam
+.png_/.ogg_ novos no jogo. Em vez de repetir a descriptografia inteira:
+  1. carrega a chave uma vez e põe em dia o que já está desatualizado
+     (saída ausente ou mais antiga que a origem)
+  2. vigia img/, audio/ e movies/ com inotify (Linux/Android, via ctypes)
+     ou, se não houver inotify, comparando tamanho/mtime a cada intervalo
+  3. agrupa os eventos de cada arquivo (debounce) e só descriptografa
+     depois que ele foi fechado após a escrita e ficou parado
+
+Usa o RPGMakerDecrypter (chave, encrypted_extensions, perfis por pasta,
+--saida=) e só trabalha nos arquivos que de fato mudaram.
+"""
+
+import os
+import sys
+import json
+import errno
+import time
+import select
+import struct
+from pathlib import Path
+
+from rpgmaker_decrypter_FINAL import RPGMakerDecrypter
+
+# Espera sem novos eventos antes de processar um arquivo (segundos)
+DEBOUNCE = 0.5
+POLL_INTERVAL = 2.0
+
+SEARCH_FOLDERS = ('img', 'audio', 'movies')
+
+# Constantes de <sys/inotify.h>
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = getattr(os, 'O_CLOEXEC', 0)
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+
+EVENT_HEADER = struct.Struct('iIII')
+
+
+def load_libc():
+    """libc com inotify (glibc ou bionic do Android) ou None"""
+    import ctypes
+    import ctypes.util
+
+    for name in (ctypes.util.find_library('c'), 'libc.so.6', 'libc.so'):
+        if not name:
+            continue
+        try:
+            libc = ctypes.CDLL(name, use_errno=True)
+            libc.inotify_init1.argtypes = [ctypes.c_int]
+            libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+            return libc
+        except (OSError, AttributeError):
+            continue
+    return None
+
+
+class InotifyWatcher:
+    """Uma vigia por pasta; pastas novas entram sozinhas"""
+
+    def __init__(self, roots):
+        import ctypes
+
+        self.libc = load_libc()
+        if self.libc is None:
+            raise OSError("inotify indisponível")
+
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 falhou")
+
+        self.folders = {}
+        for root in roots:
+            self.add_tree(root)
+
+    def add_tree(self, folder):
+        """
+        Vigia a pasta e as subpastas -> arquivos que já estavam nelas
+
+        Pasta que sumiu (ou foi renomeada) antes da vigia é ignorada - os
+        extratores fazem isso com as temporárias. Outros erros (ENOSPC:
+        limite de vigias) sobem como OSError.
+        """
+        import ctypes
+
+        existing = []
+        for root, dirs, files in os.walk(folder):
+            wd = self.libc.inotify_add_watch(self.fd, os.fsencode(root), WATCH_MASK)
+            if wd < 0:
+                error = ctypes.get_errno()
+                if error in (errno.ENOENT, errno.ENOTDIR):
+                    dirs[:] = []
+                    continue
+                raise OSError(error, f"inotify_add_watch falhou: {root}")
+            self.folders[wd] = Path(root)
+            existing.extend(Path(root) / file for file in files)
+        return existing
+
+    def wait(self, timeout):
+        """-> (caminhos alterados, fila estourou)"""
+        changed = []
+        overflow = False
+
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return changed, overflow
+
+        try:
+            buffer = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return changed, overflow
+
+        offset = 0
+        while offset < len(buffer):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(buffer, offset)
+            name = buffer[offset + EVENT_HEADER.size:offset + EVENT_HEADER.size + length].rstrip(b'\0')
+            offset += EVENT_HEADER.size + length
+
+            if mask & IN_Q_OVERFLOW:
+                overflow = True
+                continue
+
+            folder = self.folders.get(wd)
+            if folder is None or not name:
+                continue
+
+            path = folder / os.fsdecode(name)
+            if mask & IN_ISDIR:
+                # Pasta nova (ou movida para dentro): vigia e pega o que já chegou
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    changed.extend(self.add_tree(path))
+            elif mask & (IN_CLOSE_WRITE | IN_MOVED_TO):
+                changed.append(path)
+
+        return changed, overflow
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    """Sem inotify: compara tamanho e mtime dos criptografados a cada intervalo"""
+
+    def __init__(self, roots, extensions, interval=POLL_INTERVAL):
+        self.roots = roots
+        self.extensions = tuple(extensions)
+        self.interval = interval
+        self.snapshot = self.scan()
+
+    def scan(self):
+        snapshot = {}
+        stack = list(self.roots)
+        while stack:
+            folder = stack.pop()
+            try:
+                with os.scandir(folder) as it:
+                    for entry in it:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.name.endswith(self.extensions):
+                            st = entry.stat()
+                            snapshot[entry.path] = (st.st_size, st.st_mtime_ns)
+            except OSError:
+                continue
+        return snapshot
+
+    def wait(self, timeout):
+        time.sleep(max(timeout, self.interval))
+        current = self.scan()
+        changed = [Path(p) for p, info in current.items() if self.snapshot.get(p) != info]
+        self.snapshot = current
+        return changed, False
+
+    def close(self):
+        pass
+
+
+def is_stale(decrypter, file_path):
+    """Saída ausente ou mais antiga que a origem"""
+    try:
+        source_mtime = file_path.stat().st_mtime_ns
+    except OSError:
+        return False
+    try:
+        return decrypter.output_path_for(file_path).stat().st_mtime_ns < source_mtime
+    except OSError:
+        return True
+
+
+def merge_failures(decrypter, decrypted):
+    """
+    Junta as falhas da vigia com o _toolkit/falhas.json que já existe
+
+    A vigia só vê os arquivos que mudaram: as falhas de uma execução
+    completa continuam na lista (para o --repetir-falhas) até o arquivo ser
+    descriptografado aqui ou deixar de existir.
+    """
+    try:
+        with open(decrypter.failures_path(), 'r', encoding='utf-8') as f:
+            previous = json.load(f).get('failures', [])
+    except (OSError, ValueError):
+        previous = []
+
+    current = {failure['path'] for failure in decrypter.failures}
+    kept = [
+        failure for failure in previous
+        if failure['path'] not in current and failure['path'] not in decrypted
+        and decrypter.has_source(decrypter.game_folder / failure['path'])
+    ]
+    decrypter.failures = kept + decrypter.failures
+
+
+def watch(game_folder, polling=False, interval=POLL_INTERVAL, output_root=None):
+    decrypter = RPGMakerDecrypter(game_folder)
+    decrypter.output_root = output_root
+
+    print("="*70)
+    print("  MODO VIGIA - descriptografa o que chegar")
+    print("="*70)
+    print(f"\n📁 Jogo: {game_folder}")
+    if output_root is not None:
+        print(f"📤 Saída: {output_root}")
+
+    # Chave carregada uma vez só
+    if not decrypter.load_encryption_key():
+        return False
+
+    roots = [decrypter.game_folder / name for name in SEARCH_FOLDERS
+             if (decrypter.game_folder / name).is_dir()]
+    if not roots:
+        print("❌ Nenhuma pasta img/, audio/ ou movies/ para vigiar")
+        return False
+
+    extensions = decrypter.encrypted_extensions
+    profiles = {}
+    pending = {}
+    # Caminhos (relativos, como em falhas.json) descriptografados nesta sessão
+    decrypted = set()
+
+    def queue_stale():
+        for file_path in decrypter.find_encrypted_files():
+            if is_stale(decrypter, file_path):
+                pending.setdefault(file_path, 0.0)
+
+    def process(file_path):
+        if not file_path.exists():
+            return
+
+        # Perfil aprendido na primeira vez que a pasta aparece
+        folder = file_path.parent
+        if folder not in profiles:
+            learned = decrypter.learn_profiles({folder: [file_path]}, samples=1)
+            if folder in learned:
+                profiles[folder] = learned[folder]
+
+        relative = file_path.relative_to(decrypter.game_folder)
+        success, message = decrypter.decrypt_file(
+            file_path, decrypter.output_path_for(file_path), profiles.get(folder)
+        )
+
+        # Só a última tentativa de cada arquivo vale
+        decrypter.failures = [f for f in decrypter.failures if f['path'] != relative.as_posix()]
+
+        stamp = time.strftime('%H:%M:%S')
+        if success:
+            decrypter.stats['success'] += 1
+            decrypted.add(relative.as_posix())
+            print(f"  [{stamp}] ✅ {relative} ({message})")
+        else:
+            decrypter.stats['failed'] += 1
+            decrypted.discard(relative.as_posix())
+            decrypter.record_failure(file_path, message)
+            print(f"  [{stamp}] ❌ {relative} - {message}")
+
+    print("\n🔍 Pondo em dia arquivos novos ou alterados...")
+    queue_stale()
+    print(f"📦 Desatualizados: {len(pending)}")
+
+    watcher = None
+    if not polling:
+        try:
+            watcher = InotifyWatcher(roots)
+            print(f"👀 inotify: {len(watcher.folders)} pastas vigiadas")
+        except OSError as e:
+            print(f"⚠️  {e}: usando varredura periódica")
+
+    debounce = DEBOUNCE
+    if watcher is None:
+        watcher = PollingWatcher(roots, extensions, interval)
+        # Um arquivo só está pronto depois de uma varredura sem mudar
+        debounce = max(DEBOUNCE, interval)
+        print(f"👀 Varredura a cada {interval:g}s: {len(watcher.snapshot)} arquivos")
+
+    print("⏹️  Ctrl+C para parar\n")
+
+    try:
+        while True:
+            now = time.monotonic()
+            if pending:
+                timeout = max(0.0, min(t + debounce for t in pending.values()) - now)
+            else:
+                timeout = 1.0
+
+            try:
+                changed, overflow = watcher.wait(min(timeout, 1.0))
+            except OSError as e:
+                # Ex.: limite de vigias do inotify (ENOSPC) numa pasta nova
+                print(f"⚠️  {e}: usando varredura periódica")
+                watcher.close()
+                watcher = PollingWatcher(roots, extensions, interval)
+                debounce = max(DEBOUNCE, interval)
+                queue_stale()
+                changed, overflow = [], False
+            now = time.monotonic()
+
+            # Fila do kernel estourou: eventos perdidos, confere tudo por stat
+            if overflow:
+                print("⚠️  Fila do inotify cheia: conferindo todos os arquivos")
+                queue_stale()
+
+            for file_path in changed:
+                if file_path.suffix in extensions:
+                    pending[file_path] = now
+
+            ready = sorted(p for p, t in pending.items() if now - t >= debounce)
+            for file_path in ready:
+                del pending[file_path]
+                process(file_path)
+
+    except KeyboardInterrupt:
+        print("\n\n⏹️  Vigia encerrada")
+    finally:
+        watcher.close()
+        merge_failures(decrypter, decrypted)
+        decrypter.write_failures()
+
+    print(f"✅ Descriptografados: {decrypter.stats['success']}")
+    if decrypter.stats['failed']:
+        print(f"❌ Falhas: {decrypter.stats['failed']} (lista em _toolkit/falhas.json)")
+    return True
+
+
+def main():
+    options = [a for a in sys.argv[1:] if a.startswith('--')]
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+
+    if not args:
+        print("❌ Uso: python vigiar.py /caminho/jogo [--polling] [--intervalo=SEG] [--saida=PASTA]")
+        print("\n  --polling        não usa inotify: compara tamanho/mtime a cada intervalo")
+        print(f"  --intervalo=SEG  intervalo da varredura (padrão: {POLL_INTERVAL:g}s)")
+        print("  --saida=PASTA    grava as saídas em outra pasta (mesmo layout do jogo)")
+        sys.exit(1)
+
+    game_folder = args[0]
+
+    if not os.path.isdir(game_folder):
+        print(f"❌ Pasta não encontrada: {game_folder}")
+        sys.exit(1)
+
+    interval = POLL_INTERVAL
+    output_root = None
+    for option in options:
+        if option.startswith('--intervalo='):
+            interval = float(option.split('=', 1)[1])
+        elif option.startswith(('--saida=', '--output-root=')):
+            output_root = Path(option.split('=', 1)[1]).expanduser()
+
+    success = watch(game_folder, polling='--polling' in options, interval=interval, output_root=output_root)
+    sys.exit(0 if success else 1)
+
+
+if __name__ == "__main__":
+    main()